@@ -1,7 +1,15 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import sqlite3
-import re
+import database
+from dates import date_affichage, date_depuis_affichage
+import booking
+import validation
+import exportation
+import securite
+import references
+from taches import ExecuteurTaches
+from notifications import Surveillant
 
 class EspaceAdministrateur:
     def __init__(self, root):
@@ -16,6 +24,9 @@ class EspaceAdministrateur:
         # Initialiser la base de données
         self.init_database()
         
+        # Le bouton de fermeture libère aussi threads et connexions
+        self.root.protocol("WM_DELETE_WINDOW", self.quitter)
+        
         # Admin connecté
         self.admin_connecte = False
         
@@ -31,118 +42,20 @@ class EspaceAdministrateur:
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
     def init_database(self):
-        self.conn = sqlite3.connect('hopital.db')
-        self.cursor = self.conn.cursor()
-        
-        # Créer les tables si elles n'existent pas
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS medecins (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nom_complet TEXT NOT NULL,
-                specialite TEXT NOT NULL,
-                nom_utilisateur TEXT UNIQUE NOT NULL,
-                mot_de_passe TEXT NOT NULL
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nom_utilisateur TEXT UNIQUE NOT NULL,
-                mot_de_passe TEXT NOT NULL
-            )
-        ''')
-        
-        self.conn.commit()
+        # Connexion du pool partagé (WAL) ; les migrations sont appliquées à sa création
+        self.conn = database.connexion()
+        # Requêtes de consultation exécutées hors du thread Tk
+        self.taches = ExecuteurTaches(self.root)
+        # Modifications faites par les autres processus (liste des rendez-vous ouverte)
+        self.surveillant = Surveillant(self.root)
     
     # ============ VALIDATION DES DONNÉES ============
-    def valider_nom_complet(self, nom):
-        """Valider le nom complet (lettres, espaces, tirets uniquement)"""
-        if not nom or not nom.strip():
-            return False, "Le nom complet ne peut pas être vide"
-        
-        nom = nom.strip()
-        if len(nom) < 2:
-            return False, "Le nom complet doit contenir au moins 2 caractères"
-        
-        if len(nom) > 50:
-            return False, "Le nom complet ne peut pas dépasser 50 caractères"
-        
-        # Seules lettres, espaces, tirets et apostrophes autorisés
-        if not re.match(r"^[a-zA-ZÀ-ÿ\s\-']+$", nom):
-            return False, "Le nom ne peut contenir que des lettres, espaces, tirets et apostrophes"
-        
-        return True, nom
-    
-    def valider_nom_utilisateur(self, username):
-        """Valider le nom d'utilisateur (lettres et chiffres uniquement)"""
-        if not username or not username.strip():
-            return False, "Le nom d'utilisateur ne peut pas être vide"
-        
-        username = username.strip()
-        if len(username) < 3:
-            return False, "Le nom d'utilisateur doit contenir au moins 3 caractères"
-        
-        if len(username) > 20:
-            return False, "Le nom d'utilisateur ne peut pas dépasser 20 caractères"
-        
-        # Seules lettres et chiffres autorisés
-        if not re.match(r"^[a-zA-Z0-9]+$", username):
-            return False, "Le nom d'utilisateur ne peut contenir que des lettres et chiffres"
-        
-        return True, username.lower()
-    
-    def valider_mot_de_passe(self, password):
-        """Valider le mot de passe (minimum 4 caractères)"""
-        if not password:
-            return False, "Le mot de passe ne peut pas être vide"
-        
-        if len(password) < 4:
-            return False, "Le mot de passe doit contenir au moins 4 caractères"
-        
-        if len(password) > 30:
-            return False, "Le mot de passe ne peut pas dépasser 30 caractères"
-        
-        return True, password
-    
-    def valider_specialite(self, specialite):
-        """Valider la spécialité médicale"""
-        specialites_valides = [
-            "Radiologue",
-            "Anesthésiste réanimateur", 
-            "Cardiologue",
-            "Dentiste"
-        ]
-        
-        if specialite not in specialites_valides:
-            return False, f"Spécialité non valide. Options: {', '.join(specialites_valides)}"
-        
-        return True, specialite
-    
-    def valider_formulaire_medecin(self, nom, specialite, username, password):
-        """Valider un formulaire médecin complet"""
-        erreurs = []
-        
-        valid_nom, msg_nom = self.valider_nom_complet(nom)
-        if not valid_nom:
-            erreurs.append(f"Nom: {msg_nom}")
-        
-        valid_spec, msg_spec = self.valider_specialite(specialite)
-        if not valid_spec:
-            erreurs.append(f"Spécialité: {msg_spec}")
-        
-        valid_user, msg_user = self.valider_nom_utilisateur(username)
-        if not valid_user:
-            erreurs.append(f"Utilisateur: {msg_user}")
-        
-        valid_pass, msg_pass = self.valider_mot_de_passe(password)
-        if not valid_pass:
-            erreurs.append(f"Mot de passe: {msg_pass}")
-        
-        if erreurs:
-            return False, "\\n".join(erreurs)
-        
-        return True, "Validation réussie"
+    # Validateurs partagés avec l'import en masse (validation.py)
+    valider_nom_complet = staticmethod(validation.valider_nom_complet)
+    valider_nom_utilisateur = staticmethod(validation.valider_nom_utilisateur)
+    valider_mot_de_passe = staticmethod(validation.valider_mot_de_passe)
+    valider_specialite = staticmethod(validation.valider_specialite)
+    valider_formulaire_medecin = staticmethod(validation.valider_formulaire_medecin)
     # ============ FIN VALIDATION ============
     
     def creer_interface_connexion(self):
@@ -221,12 +134,7 @@ class EspaceAdministrateur:
             return
         
         # Vérifier les identifiants
-        self.cursor.execute('''
-            SELECT id FROM admin 
-            WHERE nom_utilisateur = ? AND mot_de_passe = ?
-        ''', (username, password))
-        
-        admin = self.cursor.fetchone()
+        admin = securite.authentifier(self.conn, "admin", username, password)
         if admin:
             self.admin_connecte = True
             messagebox.showinfo("Succès", "Connexion administrateur réussie !")
@@ -352,12 +260,7 @@ class EspaceAdministrateur:
         # Champ Spécialité (liste déroulante)
         tk.Label(frame_form, text="Spécialité", **style_label).grid(row=1, column=0, sticky="w", pady=5)
         self.combo_specialite = ttk.Combobox(frame_form, font=("Arial", 10), width=28, state="readonly")
-        self.combo_specialite['values'] = (
-            "Radiologue",
-            "Anesthésiste réanimateur",
-            "Cardiologue", 
-            "Dentiste"
-        )
+        self.combo_specialite['values'] = tuple(booking.SPECIALITES)
         self.combo_specialite.grid(row=1, column=1, padx=10, pady=5)
         
         # Champ Nom d'utilisateur
@@ -416,11 +319,12 @@ class EspaceAdministrateur:
         _, username_clean = self.valider_nom_utilisateur(username)
         
         try:
-            self.cursor.execute('''
+            self.conn.execute('''
                 INSERT INTO medecins (nom_complet, specialite, nom_utilisateur, mot_de_passe)
                 VALUES (?, ?, ?, ?)
-            ''', (nom_clean, specialite, username_clean, password))
+            ''', (nom_clean, specialite, username_clean, securite.hacher(password)))
             self.conn.commit()
+            references.invalider(self.conn)
             messagebox.showinfo("Succès", "Médecin ajouté avec succès")
             self.creer_menu_principal()
         except sqlite3.IntegrityError:
@@ -454,9 +358,8 @@ class EspaceAdministrateur:
             tree.heading(col, text=col)
             tree.column(col, width=120, anchor="center")
         
-        # Récupérer les médecins
-        self.cursor.execute("SELECT id, nom_complet, specialite, nom_utilisateur FROM medecins")
-        medecins = self.cursor.fetchall()
+        # Récupérer les médecins (liste en mémoire, rechargée quand elle change)
+        medecins = references.medecins(self.conn)
         
         # Insérer les données
         for medecin in medecins:
@@ -478,8 +381,7 @@ class EspaceAdministrateur:
     
     def supprimer_medecin(self):
         # Récupérer la liste des médecins pour sélection
-        self.cursor.execute("SELECT id, nom_complet, nom_utilisateur FROM medecins")
-        medecins = self.cursor.fetchall()
+        medecins = references.medecins(self.conn)
         
         if not medecins:
             messagebox.showwarning("Attention", "Aucun médecin à supprimer")
@@ -497,7 +399,7 @@ class EspaceAdministrateur:
         # Listbox pour la sélection
         listbox = tk.Listbox(fenetre_selection, font=("Arial", 10), width=50, height=10)
         for medecin in medecins:
-            listbox.insert(tk.END, f"Dr. {medecin[1]} ({medecin[2]})")
+            listbox.insert(tk.END, f"Dr. {medecin[1]} ({medecin[3]})")
         listbox.pack(pady=10)
         
         def confirmer_suppression():
@@ -509,8 +411,9 @@ class EspaceAdministrateur:
             medecin_selectionne = medecins[selection[0]]
             if messagebox.askyesno("Confirmation", 
                                   f"Supprimer définitivement Dr. {medecin_selectionne[1]} ?"):
-                self.cursor.execute("DELETE FROM medecins WHERE id = ?", (medecin_selectionne[0],))
+                self.conn.execute("DELETE FROM medecins WHERE id = ?", (medecin_selectionne[0],))
                 self.conn.commit()
+                references.invalider(self.conn)
                 messagebox.showinfo("Succès", "Médecin supprimé avec succès")
                 fenetre_selection.destroy()
         
@@ -521,179 +424,411 @@ class EspaceAdministrateur:
     
     def voir_tous_rendez_vous(self):
         """Afficher tous les rendez-vous du système avec possibilité de les gérer"""
-        # Récupérer tous les rendez-vous
-        self.cursor.execute('''
-            SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, m.nom_complet, 
-                   m.specialite, rv.urgent, rv.statut, p.telephone
-            FROM rendez_vous rv
-            JOIN patients p ON rv.patient_id = p.id
-            JOIN medecins m ON rv.medecin_id = m.id
-            ORDER BY rv.date_rdv, rv.heure_rdv
-        ''')
-        
-        rendez_vous = self.cursor.fetchall()
-        
         # Créer fenêtre d'affichage
         fenetre_rdv = tk.Toplevel(self.root)
         fenetre_rdv.title("Tous les rendez-vous - Vue Administrateur")
-        fenetre_rdv.geometry("900x600")
+        fenetre_rdv.geometry("900x650")
         fenetre_rdv.configure(bg="#2c2c2c")
         
         tk.Label(fenetre_rdv, text="Tous les rendez-vous du système", 
                 font=("Arial", 14, "bold"), fg="white", bg="#2c2c2c").pack(pady=10)
         
-        if not rendez_vous:
-            tk.Label(fenetre_rdv, text="Aucun rendez-vous dans le système", 
-                    fg="white", bg="#2c2c2c").pack(pady=50)
-        else:
-            # Frame pour les statistiques
-            frame_stats = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_stats.pack(pady=10)
-            
-            # Calculer les statistiques
-            total = len(rendez_vous)
-            confirmes = len([r for r in rendez_vous if r[7] == 'confirmé'])
-            annules = len([r for r in rendez_vous if r[7] == 'annulé'])
-            urgents = len([r for r in rendez_vous if r[6] == 1])
-            
-            stats_text = f"Total: {total} | Confirmés: {confirmes} | Annulés: {annules} | Urgents: {urgents}"
-            tk.Label(frame_stats, text=stats_text, font=("Arial", 10), 
-                    fg="lightgray", bg="#2c2c2c").pack()
-            
-            # Frame avec scrollbar pour la liste
-            frame_tree = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-            
-            # Treeview pour afficher les rendez-vous
-            columns = ("Date", "Heure", "Patient", "Téléphone", "Médecin", "Spécialité", "Urgent", "Statut")
-            tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=15)
-            
-            # Configurer les colonnes
-            tree.heading("Date", text="Date")
-            tree.column("Date", width=80, anchor="center")
-            tree.heading("Heure", text="Heure")
-            tree.column("Heure", width=60, anchor="center")
-            tree.heading("Patient", text="Patient")
-            tree.column("Patient", width=120, anchor="center")
-            tree.heading("Téléphone", text="Téléphone")
-            tree.column("Téléphone", width=100, anchor="center")
-            tree.heading("Médecin", text="Médecin")
-            tree.column("Médecin", width=120, anchor="center")
-            tree.heading("Spécialité", text="Spécialité")
-            tree.column("Spécialité", width=120, anchor="center")
-            tree.heading("Urgent", text="Urgent")
-            tree.column("Urgent", width=60, anchor="center")
-            tree.heading("Statut", text="Statut")
-            tree.column("Statut", width=80, anchor="center")
+        # Frame pour les filtres (appliqués en SQL)
+        frame_filtres = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_filtres.pack(pady=5)
+        
+        tk.Label(frame_filtres, text="Du (JJ/MM/AAAA):", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=2)
+        entry_debut = tk.Entry(frame_filtres, width=11)
+        entry_debut.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(frame_filtres, text="Au:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=2)
+        entry_fin = tk.Entry(frame_filtres, width=11)
+        entry_fin.pack(side=tk.LEFT, padx=2)
+        
+        medecins = booking.lister_medecins(self.conn)
+        tk.Label(frame_filtres, text="Médecin:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=2)
+        combo_medecin = ttk.Combobox(frame_filtres, width=20, state="readonly",
+                                     values=("Tous",) + tuple(f"Dr. {m[1]}" for m in medecins))
+        combo_medecin.set("Tous")
+        combo_medecin.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(frame_filtres, text="Statut:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=2)
+        combo_statut = ttk.Combobox(frame_filtres, width=9, state="readonly",
+                                    values=("Tous", "confirmé", "annulé"))
+        combo_statut.set("Tous")
+        combo_statut.pack(side=tk.LEFT, padx=2)
+        
+        var_urgent = tk.BooleanVar()
+        tk.Checkbutton(frame_filtres, text="Urgents", variable=var_urgent,
+                      fg="white", bg="#2c2c2c", selectcolor="gray").pack(side=tk.LEFT, padx=2)
+        
+        # Frame pour les statistiques
+        frame_stats = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_stats.pack(pady=5)
+        
+        label_stats = tk.Label(frame_stats, font=("Arial", 10), fg="lightgray", bg="#2c2c2c")
+        label_stats.pack()
+        
+        # Frame avec scrollbar pour la liste
+        frame_tree = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        # Treeview pour afficher une page de rendez-vous
+        columns = ("Date", "Heure", "Patient", "Téléphone", "Médecin", "Spécialité", "Urgent", "Statut")
+        tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=15)
+        
+        # Configurer les colonnes
+        tree.heading("Date", text="Date")
+        tree.column("Date", width=80, anchor="center")
+        tree.heading("Heure", text="Heure")
+        tree.column("Heure", width=60, anchor="center")
+        tree.heading("Patient", text="Patient")
+        tree.column("Patient", width=120, anchor="center")
+        tree.heading("Téléphone", text="Téléphone")
+        tree.column("Téléphone", width=100, anchor="center")
+        tree.heading("Médecin", text="Médecin")
+        tree.column("Médecin", width=120, anchor="center")
+        tree.heading("Spécialité", text="Spécialité")
+        tree.column("Spécialité", width=120, anchor="center")
+        tree.heading("Urgent", text="Urgent")
+        tree.column("Urgent", width=60, anchor="center")
+        tree.heading("Statut", text="Statut")
+        tree.column("Statut", width=80, anchor="center")
+        
+        # Colorer les lignes selon le statut
+        tree.tag_configure("urgent", background="lightcoral")
+        tree.tag_configure("annule", background="lightgray", foreground="gray")
+        tree.tag_configure("normal", background="lightgreen")
+        
+        scrollbar = ttk.Scrollbar(frame_tree, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        
+        # Pagination par clé : seule la page courante est chargée dans le Treeview.
+        # debuts_pages[-1] est la clé après laquelle commence la page affichée.
+        etat = {"filtres": {}, "debuts_pages": [None], "page": [], "total": 0}
+        
+        def lire_filtres():
+            filtres = {}
+            try:
+                if entry_debut.get().strip():
+                    filtres["date_debut"] = date_depuis_affichage(entry_debut.get())
+                if entry_fin.get().strip():
+                    filtres["date_fin"] = date_depuis_affichage(entry_fin.get())
+            except ValueError:
+                messagebox.showerror("Erreur", "Date invalide (format JJ/MM/AAAA)", parent=fenetre_rdv)
+                return None
             
-            # Colorer les lignes selon le statut
-            tree.tag_configure("urgent", background="lightcoral")
-            tree.tag_configure("annule", background="lightgray", foreground="gray")
-            tree.tag_configure("normal", background="lightgreen")
+            if combo_medecin.current() > 0:
+                filtres["medecin_id"] = medecins[combo_medecin.current() - 1][0]
+            if combo_statut.get() != "Tous":
+                filtres["statut"] = combo_statut.get()
+            if var_urgent.get():
+                filtres["urgent"] = True
+            return filtres
+        
+        def afficher_pagination():
+            premiere = (len(etat["debuts_pages"]) - 1) * booking.TAILLE_PAGE
+            if etat["page"]:
+                label_page.config(text=f"Lignes {premiere + 1}-{premiere + len(etat['page'])} sur {etat['total']}")
+            else:
+                label_page.config(text="Aucun rendez-vous")
+            btn_precedent.config(state=tk.NORMAL if len(etat["debuts_pages"]) > 1 else tk.DISABLED)
+            btn_suivant.config(state=tk.NORMAL if len(etat["page"]) == booking.TAILLE_PAGE else tk.DISABLED)
+        
+        def afficher_stats():
+            def appliquer(stats):
+                etat["total"] = stats["total"]
+                label_stats.config(text=f"Total: {stats['total']} | Confirmés: {stats['confirmes']} | "
+                                        f"Annulés: {stats['annules']} | Urgents: {stats['urgents']}")
+                afficher_pagination()
             
-            for rdv in rendez_vous:
-                urgent_text = "OUI" if rdv[6] else "NON"
-                telephone = rdv[8] if rdv[8] else "N/A"
+            filtres = dict(etat["filtres"])
+            self.taches.soumettre(lambda conn: booking.statistiques_rendez_vous(conn, **filtres),
+                                  cle=(str(fenetre_rdv), "stats"), succes=appliquer)
+        
+        def tag_ligne(urgent, statut):
+            if statut == 'annulé':
+                return "annule"
+            if urgent == 1:
+                return "urgent"
+            return "normal"
+        
+        def valeurs_ligne(rdv):
+            urgent_text = "OUI" if rdv[6] else "NON"
+            telephone = rdv[8] if rdv[8] else "N/A"
+            return (date_affichage(rdv[1]), rdv[2], rdv[3], telephone, f"Dr. {rdv[4]}", rdv[5], urgent_text, rdv[7])
+        
+        def charger_page():
+            def remplir(page):
+                etat["page"] = page
+                tree.delete(*tree.get_children())
                 
-                if rdv[7] == 'annulé':
-                    tag = "annule"
-                elif rdv[6] == 1:
-                    tag = "urgent"
-                else:
-                    tag = "normal"
+                for rdv in page:
+                    # L'identifiant de la ligne est celui du rendez-vous
+                    tree.insert("", tk.END, iid=str(rdv[0]), values=valeurs_ligne(rdv),
+                               tags=(tag_ligne(rdv[6], rdv[7]),))
                 
-                tree.insert("", tk.END, values=(rdv[1], rdv[2], rdv[3], telephone, 
-                           f"Dr. {rdv[4]}", rdv[5], urgent_text, rdv[7]), 
-                           tags=(tag, rdv[0]))
+                afficher_pagination()
+            
+            # Page chargée en arrière-plan ; une navigation plus récente remplace la précédente
+            btn_precedent.config(state=tk.DISABLED)
+            btn_suivant.config(state=tk.DISABLED)
+            filtres = dict(etat["filtres"])
+            apres = etat["debuts_pages"][-1]
+            self.taches.soumettre(lambda conn: booking.page_rendez_vous(conn, apres=apres, **filtres),
+                                  cle=(str(fenetre_rdv), "page"), succes=remplir)
+        
+        def appliquer_filtres():
+            filtres = lire_filtres()
+            if filtres is None:
+                return
+            etat["filtres"] = filtres
+            etat["debuts_pages"] = [None]
+            afficher_stats()
+            charger_page()
+        
+        def page_suivante():
+            if etat["page"]:
+                etat["debuts_pages"].append(booking.cle_page(etat["page"][-1]))
+                charger_page()
+        
+        def page_precedente():
+            if len(etat["debuts_pages"]) > 1:
+                etat["debuts_pages"].pop()
+                charger_page()
+        
+        def rafraichir():
+            """Recharger les statistiques et la page courante (bouton Actualiser)"""
+            afficher_stats()
+            charger_page()
+        
+        def appliquer_modifications(lignes):
+            """Reporter sur la page les rendez-vous relus (les lignes hors page ne sont pas ajoutées)"""
+            for rdv in lignes:
+                iid = str(rdv[0])
+                if tree.exists(iid):
+                    tree.item(iid, values=valeurs_ligne(rdv), tags=(tag_ligne(rdv[6], rdv[7]),))
+        
+        def sur_modifications(modifications):
+            """Rendez-vous modifiés par d'autres connexions : totaux et lignes visibles relus"""
+            if modifications is None:
+                rafraichir()
+                return
             
-            tree.pack(fill=tk.BOTH, expand=True)
+            afficher_stats()
+            visibles = {ligne_id for _table, ligne_id, _medecin, _date in modifications if tree.exists(str(ligne_id))}
+            if visibles:
+                self.taches.soumettre(booking.lignes_rendez_vous, visibles, succes=appliquer_modifications)
+        
+        self.surveillant.abonner(fenetre_rdv, sur_modifications, tables=("rendez_vous",))
+        
+        def mettre_a_jour_ligne(iid, ligne):
+            """Reporter un rendez-vous modifié sur sa seule ligne ; les totaux sont relus"""
+            urgent, statut = ligne[5], ligne[6]
+            tree.set(iid, "Statut", statut)
+            tree.item(iid, tags=(tag_ligne(urgent, statut),))
+            afficher_stats()
+        
+        tk.Button(frame_filtres, text="Filtrer", command=appliquer_filtres,
+                 bg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        
+        # Navigation entre les pages
+        frame_pages = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_pages.pack()
+        
+        btn_precedent = tk.Button(frame_pages, text="◀ Précédent", command=page_precedente,
+                                 bg="white", font=("Arial", 9))
+        btn_precedent.pack(side=tk.LEFT, padx=10)
+        
+        label_page = tk.Label(frame_pages, font=("Arial", 9), fg="lightgray", bg="#2c2c2c")
+        label_page.pack(side=tk.LEFT, padx=10)
+        
+        btn_suivant = tk.Button(frame_pages, text="Suivant ▶", command=page_suivante,
+                               bg="white", font=("Arial", 9))
+        btn_suivant.pack(side=tk.LEFT, padx=10)
+        
+        # Frame pour les actions admin
+        frame_actions = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_actions.pack(pady=10)
+        
+        def annuler_rdv_admin():
+            """Fonction admin pour annuler un rendez-vous"""
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
+                return
             
-            # Frame pour les actions admin
-            frame_actions = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_actions.pack(pady=10)
+            # L'identifiant de la ligne est celui du rendez-vous
+            rdv_id = int(selection[0])
+            rdv_values = tree.item(selection[0])['values']
             
-            def annuler_rdv_admin():
-                """Fonction admin pour annuler un rendez-vous"""
-                selection = tree.selection()
-                if not selection:
-                    messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
-                    return
-                
-                # Récupérer l'ID du rendez-vous depuis les tags
-                tags = tree.item(selection[0])['tags']
-                rdv_id = tags[1] if len(tags) > 1 else None  # L'ID est le 2ème tag
-                rdv_values = tree.item(selection[0])['values']
-                
-                if rdv_values[7] == 'annulé':
-                    messagebox.showwarning("Attention", "Ce rendez-vous est déjà annulé")
-                    return
-                
-                if messagebox.askyesno("Confirmation Administrateur", 
-                                     f"Annuler le rendez-vous de {rdv_values[2]} du {rdv_values[0]} à {rdv_values[1]} ?"):
-                    try:
-                        self.cursor.execute("UPDATE rendez_vous SET statut = 'annulé' WHERE id = ?", (rdv_id,))
-                        self.conn.commit()
-                        messagebox.showinfo("Succès", "Rendez-vous annulé par l'administrateur")
-                        fenetre_rdv.destroy()
-                        # Relancer la fenêtre pour voir la mise à jour
-                        self.voir_tous_rendez_vous()
-                    except Exception as e:
-                        messagebox.showerror("Erreur", f"Erreur lors de l'annulation: {str(e)}")
+            if rdv_values[7] == 'annulé':
+                messagebox.showwarning("Attention", "Ce rendez-vous est déjà annulé")
+                return
             
-            def reactiver_rdv_admin():
-                """Fonction admin pour réactiver un rendez-vous annulé"""
-                selection = tree.selection()
-                if not selection:
-                    messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
-                    return
-                
-                tags = tree.item(selection[0])['tags']
-                rdv_id = tags[1] if len(tags) > 1 else None
-                rdv_values = tree.item(selection[0])['values']
-                
-                if rdv_values[7] != 'annulé':
-                    messagebox.showwarning("Attention", "Ce rendez-vous n'est pas annulé")
-                    return
-                
-                if messagebox.askyesno("Confirmation Administrateur", 
-                                     f"Réactiver le rendez-vous de {rdv_values[2]} du {rdv_values[0]} à {rdv_values[1]} ?"):
-                    try:
-                        self.cursor.execute("UPDATE rendez_vous SET statut = 'confirmé' WHERE id = ?", (rdv_id,))
-                        self.conn.commit()
-                        messagebox.showinfo("Succès", "Rendez-vous réactivé par l'administrateur")
-                        fenetre_rdv.destroy()
-                        self.voir_tous_rendez_vous()
-                    except Exception as e:
-                        messagebox.showerror("Erreur", f"Erreur lors de la réactivation: {str(e)}")
+            if messagebox.askyesno("Confirmation Administrateur", 
+                                 f"Annuler le rendez-vous de {rdv_values[2]} du {rdv_values[0]} à {rdv_values[1]} ?"):
+                try:
+                    annule, resultat = booking.annuler_rendez_vous(self.conn, rdv_id)
+                    if not annule:
+                        messagebox.showwarning("Attention", resultat)
+                        return
+                    mettre_a_jour_ligne(selection[0], resultat)
+                    messagebox.showinfo("Succès", "Rendez-vous annulé par l'administrateur")
+                except Exception as e:
+                    messagebox.showerror("Erreur", f"Erreur lors de l'annulation: {str(e)}")
+        
+        def reactiver_rdv_admin():
+            """Fonction admin pour réactiver un rendez-vous annulé"""
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
+                return
             
-            # Boutons d'action administrateur
-            btn_annuler_admin = tk.Button(frame_actions, text="Annuler RDV", 
-                                        command=annuler_rdv_admin, bg="lightcoral", font=("Arial", 10))
-            btn_annuler_admin.pack(side=tk.LEFT, padx=10)
+            rdv_id = int(selection[0])
+            rdv_values = tree.item(selection[0])['values']
             
-            btn_reactiver_admin = tk.Button(frame_actions, text="Réactiver RDV", 
-                                          command=reactiver_rdv_admin, bg="lightblue", font=("Arial", 10))
-            btn_reactiver_admin.pack(side=tk.LEFT, padx=10)
+            if rdv_values[7] != 'annulé':
+                messagebox.showwarning("Attention", "Ce rendez-vous n'est pas annulé")
+                return
             
-            # Bouton retour
-            btn_retour = tk.Button(frame_actions, text="Retour", 
-                                 command=fenetre_rdv.destroy, bg="lightgray", font=("Arial", 10))
-            btn_retour.pack(side=tk.RIGHT, padx=10)
+            if messagebox.askyesno("Confirmation Administrateur", 
+                                 f"Réactiver le rendez-vous de {rdv_values[2]} du {rdv_values[0]} à {rdv_values[1]} ?"):
+                try:
+                    # Le créneau doit être resté libre depuis l'annulation
+                    reactive, resultat = booking.reactiver_rendez_vous(self.conn, rdv_id)
+                    if not reactive:
+                        messagebox.showerror("Erreur", str(resultat))
+                        return
+                    mettre_a_jour_ligne(selection[0], resultat)
+                    messagebox.showinfo("Succès", "Rendez-vous réactivé par l'administrateur")
+                except Exception as e:
+                    messagebox.showerror("Erreur", f"Erreur lors de la réactivation: {str(e)}")
+        
+        # Boutons d'action administrateur
+        btn_annuler_admin = tk.Button(frame_actions, text="Annuler RDV", 
+                                    command=annuler_rdv_admin, bg="lightcoral", font=("Arial", 10))
+        btn_annuler_admin.pack(side=tk.LEFT, padx=10)
+        
+        btn_reactiver_admin = tk.Button(frame_actions, text="Réactiver RDV", 
+                                      command=reactiver_rdv_admin, bg="lightblue", font=("Arial", 10))
+        btn_reactiver_admin.pack(side=tk.LEFT, padx=10)
+        
+        btn_actualiser = tk.Button(frame_actions, text="Actualiser", 
+                                 command=rafraichir, bg="white", font=("Arial", 10))
+        btn_actualiser.pack(side=tk.LEFT, padx=10)
+        
+        btn_stats = tk.Button(frame_actions, text="📊 Tableau de bord", 
+                            command=lambda: self.tableau_de_bord(etat["filtres"]), bg="white", font=("Arial", 10))
+        btn_stats.pack(side=tk.LEFT, padx=10)
+        
+        def exporter_rdv():
+            """Exporter les rendez-vous des filtres appliqués (CSV ou JSON Lines)"""
+            chemin = filedialog.asksaveasfilename(
+                parent=fenetre_rdv, title="Exporter les rendez-vous", defaultextension=".csv",
+                filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")]
+            )
+            if not chemin:
+                return
             
-            # Note explicative
-            tk.Label(fenetre_rdv, text="Rouge: Urgent | Gris: Annulé | Vert: Normal | Sélectionnez un RDV puis utilisez les boutons", 
-                    font=("Arial", 9), fg="lightgray", bg="#2c2c2c").pack(pady=5)
+            # Écriture en arrière-plan, par lots : la fenêtre reste utilisable
+            filtres = dict(etat["filtres"])
+            self.taches.soumettre(
+                lambda conn: exportation.exporter_fichier(conn, chemin, **filtres),
+                succes=lambda nb: messagebox.showinfo("Export terminé", f"{nb} rendez-vous exportés dans {chemin}",
+                                                      parent=fenetre_rdv)
+            )
+        
+        btn_exporter = tk.Button(frame_actions, text="💾 Exporter", 
+                               command=exporter_rdv, bg="white", font=("Arial", 10))
+        btn_exporter.pack(side=tk.LEFT, padx=10)
+        
+        # Bouton retour
+        btn_retour = tk.Button(frame_actions, text="Retour", 
+                             command=fenetre_rdv.destroy, bg="lightgray", font=("Arial", 10))
+        btn_retour.pack(side=tk.RIGHT, padx=10)
+        
+        # Note explicative
+        tk.Label(fenetre_rdv, text="Rouge: Urgent | Gris: Annulé | Vert: Normal | Sélectionnez un RDV puis utilisez les boutons", 
+                font=("Arial", 9), fg="lightgray", bg="#2c2c2c").pack(pady=5)
+        
+        # Première page sans filtre
+        afficher_stats()
+        charger_page()
+    
+    def tableau_de_bord(self, filtres=None):
+        """Statistiques par médecin, spécialité ou jour (filtres de la liste des rendez-vous)"""
+        filtres = filtres or {}
+        
+        fenetre_stats = tk.Toplevel(self.root)
+        fenetre_stats.title("Tableau de bord - Vue Administrateur")
+        fenetre_stats.geometry("700x500")
+        fenetre_stats.configure(bg="#2c2c2c")
+        
+        tk.Label(fenetre_stats, text="Tableau de bord", 
+                font=("Arial", 14, "bold"), fg="white", bg="#2c2c2c").pack(pady=10)
+        
+        frame_choix = tk.Frame(fenetre_stats, bg="#2c2c2c")
+        frame_choix.pack(pady=5)
+        
+        regroupements = {"Médecin": "medecin", "Spécialité": "specialite", "Jour": "jour"}
+        tk.Label(frame_choix, text="Regrouper par:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=5)
+        combo_par = ttk.Combobox(frame_choix, width=12, state="readonly", values=tuple(regroupements))
+        combo_par.set("Médecin")
+        combo_par.pack(side=tk.LEFT, padx=5)
+        
+        frame_tree = tk.Frame(fenetre_stats, bg="#2c2c2c")
+        frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        columns = ("Regroupement", "Total", "Confirmés", "Annulés", "Urgents", "Taux d'annulation")
+        tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=15)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=90, anchor="center")
+        tree.column("Regroupement", width=180)
+        
+        scrollbar = ttk.Scrollbar(frame_tree, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        
+        def afficher(*args):
+            par = regroupements[combo_par.get()]
+            tree.delete(*tree.get_children())
+            for libelle, total, confirmes, annules, urgents, taux in booking.tableau_de_bord(self.conn, par, **filtres):
+                if par == "jour":
+                    libelle = date_affichage(libelle)
+                tree.insert("", tk.END, values=(libelle, total, confirmes, annules, urgents, f"{taux} %"))
+        
+        combo_par.bind('<<ComboboxSelected>>', afficher)
+        
+        tk.Button(fenetre_stats, text="Fermer", command=fenetre_stats.destroy,
+                 bg="lightgray", font=("Arial", 10)).pack(pady=10)
+        
+        afficher()
     
     def deconnexion(self):
         self.admin_connecte = False
         self.creer_interface_connexion()
     
     def quitter(self):
-        self.conn.close()
+        self.taches.fermer()
+        self.surveillant.fermer()
+        
+        # Espace ouvert dans une fenêtre de main.py : seule cette fenêtre est fermée,
+        # les connexions partagées restent ouvertes pour les autres espaces
+        if not isinstance(self.root, tk.Tk):
+            self.root.destroy()
+            return
+        
+        database.fermer_connexions()
         self.root.quit()
         self.root.destroy()
-        
 
-root = tk.Tk()
-app = EspaceAdministrateur(root)
-root.mainloop()
\ No newline at end of file
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = EspaceAdministrateur(root)
+    root.mainloop()
@@ -0,0 +1,228 @@
+"""Benchmarks des chemins critiques de réservation.
+
+Mesure la latence (p50/p95/p99) et le débit de la recherche de disponibilités,
+de la réservation, du déplacement, de l'annulation, de la vue administrateur et
+des connexions simultanées, et produit un rapport JSON comparable d'une version
+à l'autre.
+
+Exemple :
+    python benchmark.py --base benchmark.db --echelle moyen --sortie resultats.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import booking
+import database
+import securite
+from database import ouvrir_connexion
+from migrations import appliquer_migrations
+from generer_donnees import ECHELLES, generer
+
+# Connexions simultanées simulées (relève d'équipe) et budget de latence p99 par connexion
+NB_CONNEXIONS_SIMULTANEES = 8
+BUDGET_CONNEXION_P99_MS = 1000
+
+
+def percentile(valeurs_triees, p):
+    """Percentile p (0-100) par rang le plus proche sur une liste triée"""
+    if not valeurs_triees:
+        return None
+    rang = max(0, min(len(valeurs_triees) - 1, round(p / 100 * len(valeurs_triees) + 0.5) - 1))
+    return valeurs_triees[rang]
+
+
+def resumer(durees):
+    """Statistiques de latence (ms) et débit (opérations/s) d'une série de mesures"""
+    durees = sorted(durees)
+    total = sum(durees)
+    return {
+        "iterations": len(durees),
+        "p50_ms": round(percentile(durees, 50) * 1000, 3),
+        "p95_ms": round(percentile(durees, 95) * 1000, 3),
+        "p99_ms": round(percentile(durees, 99) * 1000, 3),
+        "moyenne_ms": round(total / len(durees) * 1000, 3),
+        "debit_ops_s": round(len(durees) / total, 1) if total else None,
+    }
+
+
+def mesurer(operation, iterations):
+    """Exécuter operation(i) iterations fois et retourner les durées en secondes"""
+    durees = []
+    for i in range(iterations):
+        debut = time.perf_counter()
+        operation(i)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def mesurer_simultane(operation, iterations, nb_threads):
+    """Comme mesurer, avec nb_threads appels simultanés (durées en secondes, file d'attente comprise)"""
+    def chronometrer(i):
+        debut = time.perf_counter()
+        operation(i)
+        return time.perf_counter() - debut
+    
+    with ThreadPoolExecutor(max_workers=nb_threads) as executeur:
+        return list(executeur.map(chronometrer, range(iterations)))
+
+
+def executer(conn, iterations=200, iterations_liste=3, graine=42):
+    """Lancer tous les scénarios et retourner le rapport"""
+    rng = random.Random(graine)
+    medecins = [ligne[0] for ligne in conn.execute("SELECT id FROM medecins")]
+    patients = [ligne[0] for ligne in conn.execute("SELECT id FROM patients ORDER BY random() LIMIT 1000")]
+    jours = [ligne[0] for ligne in conn.execute('''
+        SELECT DISTINCT date_rdv FROM rendez_vous WHERE date_rdv > date('now') ORDER BY date_rdv LIMIT 365
+    ''')]
+    heures = booking.generer_heures_disponibles()
+    
+    if not (medecins and patients and jours):
+        raise SystemExit("Base vide : lancer d'abord generer_donnees.py ou utiliser --generer")
+    
+    scenarios = {}
+    
+    # Recherche des heures libres (mettre_a_jour_heures)
+    scenarios["disponibilites"] = resumer(mesurer(
+        lambda i: booking.obtenir_heures_libres(conn, rng.choice(medecins), rng.choice(jours)),
+        iterations,
+    ))
+    
+    # Réservation puis déplacement et annulation des rendez-vous créés
+    reserves = []
+    conflits = 0
+    
+    def reserver(i):
+        nonlocal conflits
+        ok, resultat = booking.prendre_rendez_vous(
+            conn, rng.choice(patients), rng.choice(medecins), rng.choice(jours), rng.choice(heures)
+        )
+        if ok:
+            reserves.append(resultat)
+        else:
+            conflits += 1
+    
+    scenarios["reservation"] = resumer(mesurer(reserver, iterations))
+    scenarios["reservation"]["conflits"] = conflits
+    
+    if reserves:
+        def deplacer(i):
+            rdv_id = reserves[i % len(reserves)]
+            booking.modifier_rendez_vous(
+                conn, rdv_id, rng.choice(medecins), rng.choice(jours), rng.choice(heures), 0
+            )
+        
+        scenarios["deplacement"] = resumer(mesurer(deplacer, len(reserves)))
+        scenarios["annulation"] = resumer(mesurer(
+            lambda i: booking.annuler_rendez_vous(conn, reserves[i]), len(reserves)
+        ))
+    
+    # Ouverture de la vue administrateur : statistiques puis première page
+    def liste_admin(i):
+        booking.statistiques_rendez_vous(conn)
+        booking.page_rendez_vous(conn)
+    
+    scenarios["liste_admin"] = resumer(mesurer(liste_admin, iterations))
+    
+    # Liste complète sans pagination (référence)
+    scenarios["liste_complete"] = resumer(mesurer(
+        lambda i: booking.tous_les_rendez_vous(conn), iterations_liste
+    ))
+    
+    return scenarios
+
+
+def executer_connexions(chemin, iterations=100, nb_threads=NB_CONNEXIONS_SIMULTANEES):
+    """Connexions simultanées : comptes distincts (vérification complète), reconnexions et comptes inconnus"""
+    comptes = [(f"benchconnexion{i}", f"mdp{i}") for i in range(iterations)]
+    conn = ouvrir_connexion(chemin)
+    with conn:
+        conn.execute("DELETE FROM patients WHERE nom_utilisateur LIKE 'benchconnexion%'")
+        conn.executemany(
+            "INSERT INTO patients (nom_complet, nom_utilisateur, mot_de_passe) VALUES ('Benchmark', ?, ?)",
+            zip([nom for nom, _ in comptes], securite.hacher_lot([mdp for _, mdp in comptes]))
+        )
+    
+    def connecter(nom, mot_de_passe, attendu=True):
+        # Une connexion du pool par thread, comme les espaces de l'application
+        resultat = securite.authentifier(database.connexion(chemin), "patients", nom, mot_de_passe)
+        if (resultat is not None) != attendu:
+            raise RuntimeError(f"Connexion inattendue pour {nom}")
+    
+    scenarios = {}
+    try:
+        scenarios["connexion"] = resumer(mesurer_simultane(lambda i: connecter(*comptes[i]), iterations, nb_threads))
+        scenarios["connexion_repetee"] = resumer(mesurer_simultane(lambda i: connecter(*comptes[i]), iterations, nb_threads))
+        scenarios["connexion_inconnue"] = resumer(mesurer_simultane(
+            lambda i: connecter(f"inconnu{i}", "mdp", attendu=False), iterations, nb_threads
+        ))
+    finally:
+        with conn:
+            conn.execute("DELETE FROM patients WHERE nom_utilisateur LIKE 'benchconnexion%'")
+        conn.close()
+    
+    for scenario in scenarios.values():
+        scenario["simultanees"] = nb_threads
+    scenarios["connexion"]["budget_p99_ms"] = BUDGET_CONNEXION_P99_MS
+    scenarios["connexion"]["dans_budget"] = scenarios["connexion"]["p99_ms"] <= BUDGET_CONNEXION_P99_MS
+    return scenarios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques de réservation")
+    parser.add_argument("--base", default="benchmark.db", help="base SQLite de test (jamais hopital.db)")
+    parser.add_argument("--echelle", choices=sorted(ECHELLES), default="petit")
+    parser.add_argument("--generer", action="store_true", help="(re)générer la base avant les mesures")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--iterations-liste", type=int, default=3)
+    parser.add_argument("--iterations-connexion", type=int, default=100)
+    parser.add_argument("--simultanees", type=int, default=NB_CONNEXIONS_SIMULTANEES,
+                        help="nombre de connexions simultanées")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--sortie", help="fichier JSON de résultats (sortie standard par défaut)")
+    args = parser.parse_args(argv)
+    
+    if args.generer and os.path.exists(args.base):
+        os.remove(args.base)
+    
+    # Mêmes réglages de connexion (WAL, caches) que l'application
+    conn = ouvrir_connexion(args.base)
+    generation = None
+    if args.generer or conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+        debut = time.perf_counter()
+        generation = generer(conn, ECHELLES[args.echelle], args.graine)
+        generation["duree_s"] = round(time.perf_counter() - debut, 2)
+    appliquer_migrations(conn)
+    
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "echelle": args.echelle,
+        "volumes": {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("patients", "medecins", "creneaux_disponibles", "rendez_vous")},
+        "generation": generation,
+        "securite": {"algorithme": securite.ALGORITHME, "scrypt_n": securite.SCRYPT_N,
+                     "pbkdf2_iterations": securite.PBKDF2_ITERATIONS},
+        "scenarios": executer(conn, args.iterations, args.iterations_liste, args.graine),
+    }
+    conn.close()
+    rapport["scenarios"].update(executer_connexions(args.base, args.iterations_connexion, args.simultanees))
+    database.fermer_connexions()
+    
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            f.write(texte + "\n")
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
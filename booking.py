@@ -0,0 +1,981 @@
+"""Service de réservation des rendez-vous, indépendant de l'interface graphique.
+
+Toutes les fonctions prennent une connexion SQLite en premier argument et
+suivent la convention des validateurs : (True, valeur) ou (False, message).
+"""
+import calendar
+import heapq
+import sqlite3
+from datetime import date, datetime, timedelta
+from dates import date_objet
+from database import transaction_immediate
+from intervalles import Intervalles
+import references
+
+# Délai minimal entre la prise de rendez-vous et le rendez-vous lui-même
+ANTICIPATION_MINIMALE = timedelta(minutes=30)
+
+# Nombre de jours parcourus par la recherche du prochain créneau libre
+HORIZON_RECHERCHE = 60
+
+# Nombre de jours affichés à la fois dans l'agenda d'un médecin (aujourd'hui et les 7 suivants)
+JOURS_AGENDA = 8
+
+# Durée maximale couverte par une plage récurrente (jours)
+DUREE_MAX_RECURRENCE = 366
+
+# Spécialités médicales proposées
+SPECIALITES = [
+    "Radiologue",
+    "Anesthésiste réanimateur",
+    "Cardiologue",
+    "Dentiste"
+]
+
+# Statuts d'un rendez-vous
+STATUTS = ("confirmé", "annulé")
+
+
+class ConflitCreneau:
+    """Conflit de réservation : le créneau est déjà pris par un rendez-vous actif"""
+    
+    def __init__(self, medecin_id, date_rdv, heure_rdv, rdv_existant_id=None):
+        self.medecin_id = medecin_id
+        self.date_rdv = date_rdv
+        self.heure_rdv = heure_rdv
+        self.rdv_existant_id = rdv_existant_id
+        self.message = "Ce créneau est déjà occupé"
+    
+    def __str__(self):
+        return self.message
+    
+    def __repr__(self):
+        return f"ConflitCreneau(medecin_id={self.medecin_id}, date_rdv={self.date_rdv!r}, heure_rdv={self.heure_rdv!r})"
+
+
+# ============ CRÉNEAUX HORAIRES ============
+def generer_heures_disponibles(heures_occupees=None):
+    """Générer les créneaux horaires disponibles (8h-16h, pause 12h, créneaux 30min)"""
+    if heures_occupees is None:
+        heures_occupees = []
+    
+    heures_disponibles = []
+    
+    # Matin : 8h00 à 11h30 (créneaux de 30 min)
+    for heure in range(8, 12):
+        for minute in [0, 30]:
+            heure_str = f"{heure:02d}:{minute:02d}"
+            if heure_str not in heures_occupees:
+                heures_disponibles.append(heure_str)
+    
+    # Après-midi : 13h00 à 16h30 (créneaux de 30 min)
+    for heure in range(13, 17):
+        for minute in [0, 30]:
+            if heure == 16 and minute > 30:  # Arrêt à 16h30
+                break
+            heure_str = f"{heure:02d}:{minute:02d}"
+            if heure_str not in heures_occupees:
+                heures_disponibles.append(heure_str)
+    
+    return heures_disponibles
+
+
+# Grille fixe des créneaux : le bit k d'un masque correspond à GRILLE[k]
+GRILLE = generer_heures_disponibles()
+BIT_HEURE = {heure: bit for bit, heure in enumerate(GRILLE)}
+MASQUE_COMPLET = (1 << len(GRILLE)) - 1
+# Fin du dernier créneau de la grille : limite de fin des plages
+FIN_JOURNEE = "17:00"
+
+
+def masque_depuis_heures(heures):
+    """Masque des créneaux de la grille présents dans heures (les autres sont ignorés)"""
+    masque = 0
+    for heure in heures:
+        if heure in BIT_HEURE:
+            masque |= 1 << BIT_HEURE[heure]
+    return masque
+
+
+def heures_depuis_masque(masque):
+    """Heures de la grille dont le bit est levé, dans l'ordre chronologique"""
+    return [heure for bit, heure in enumerate(GRILLE) if masque >> bit & 1]
+
+
+def premier_creneau_libre(masque, a_partir_de=None):
+    """Première heure libre du masque (à partir d'une heure de la grille), ou None"""
+    if a_partir_de is not None:
+        masque &= MASQUE_COMPLET ^ ((1 << BIT_HEURE.get(a_partir_de, len(GRILLE))) - 1)
+    if not masque:
+        return None
+    return GRILLE[(masque & -masque).bit_length() - 1]
+
+
+def valider_date(date_str, maintenant=None):
+    """Valider la date de stockage AAAA-MM-JJ et vérifier qu'elle n'est pas passée"""
+    maintenant = maintenant or datetime.now()
+    try:
+        # Vérifier le format
+        date_obj = date_objet(date_str)
+        
+        # Vérifier que ce n'est pas dans le passé
+        if date_obj < maintenant.date():
+            return False, "La date ne peut pas être dans le passé"
+        
+        return True, date_obj
+    
+    except (ValueError, TypeError):
+        return False, "Date invalide"
+
+
+def valider_heure(heure_str):
+    """Valider le format d'heure HH:MM et vérifier les créneaux"""
+    try:
+        heure, minute = heure_str.split(':')
+        heure_int, minute_int = int(heure), int(minute)
+        
+        # Vérifier le format basique
+        if not (0 <= heure_int <= 23 and 0 <= minute_int <= 59):
+            return False, "Heure invalide"
+        
+        # Vérifier les créneaux autorisés
+        if minute_int not in [0, 30]:
+            return False, "Seuls les créneaux de 30 minutes sont autorisés (XX:00 ou XX:30)"
+        
+        # Vérifier les heures d'ouverture
+        if not ((8 <= heure_int < 12) or (13 <= heure_int <= 16)):
+            return False, "Heures d'ouverture : 8h-12h et 13h-16h30"
+        
+        # Vérifier pause déjeuner
+        if heure_int == 12:
+            return False, "Pause déjeuner de 12h à 13h"
+        
+        # Vérifier limite après-midi
+        if heure_int == 16 and minute_int > 30:
+            return False, "Dernier créneau à 16h30"
+        
+        return True, heure_str
+    
+    except (ValueError, IndexError, AttributeError):
+        return False, "Format d'heure invalide (HH:MM requis)"
+
+
+def valider_plage(heure_debut, heure_fin):
+    """Valider une plage horaire : début sur un créneau autorisé, fin à la demi-heure (17h au plus).
+    
+    Retourne (True, (debut, fin)) au format HH:MM ou (False, message).
+    """
+    debut_valide, message = valider_heure(heure_debut)
+    if not debut_valide:
+        return False, message
+    
+    try:
+        debut = datetime.strptime(heure_debut, "%H:%M")
+        fin = datetime.strptime(heure_fin, "%H:%M")
+    except (ValueError, TypeError):
+        return False, "Format d'heure invalide"
+    
+    if fin <= debut:
+        return False, "L'heure de fin doit être après l'heure de début"
+    
+    if fin.minute not in (0, 30) or fin > datetime.strptime(FIN_JOURNEE, "%H:%M"):
+        return False, f"L'heure de fin doit tomber à l'heure ou à la demi-heure, {FIN_JOURNEE} au plus tard"
+    
+    return True, (debut.strftime("%H:%M"), fin.strftime("%H:%M"))
+
+
+def valider_creneau_rdv(date_str, heure_str, maintenant=None):
+    """Valider date, heure et anticipation minimale (30 minutes) d'un rendez-vous"""
+    maintenant = maintenant or datetime.now()
+    
+    date_valide, date_obj_ou_message = valider_date(date_str, maintenant)
+    if not date_valide:
+        return False, date_obj_ou_message
+    
+    heure_valide, message_heure = valider_heure(heure_str)
+    if not heure_valide:
+        return False, message_heure
+    
+    # Vérifier anticipation minimale (30 minutes)
+    datetime_rdv = datetime.combine(date_obj_ou_message, datetime.strptime(heure_str, "%H:%M").time())
+    if datetime_rdv <= maintenant + ANTICIPATION_MINIMALE:
+        return False, "Le rendez-vous doit être programmé au moins 30 minutes à l'avance"
+    
+    return True, datetime_rdv
+
+
+def obtenir_creneaux_occupes(conn, medecin_id, date_str, exclure_rdv_id=None):
+    """Obtenir les créneaux déjà occupés pour un médecin à une date donnée"""
+    resultats = conn.execute('''
+        SELECT heure_rdv FROM rendez_vous
+        WHERE medecin_id = ? AND date_rdv = ? AND statut != 'annulé' AND id IS NOT ?
+    ''', (medecin_id, date_str, exclure_rdv_id)).fetchall()
+    return [resultat[0] for resultat in resultats]
+
+
+def obtenir_creneaux_definis_medecin(conn, medecin_id, date_str):
+    """Obtenir les créneaux définis par le médecin pour une date donnée"""
+    lignes = conn.execute('''
+        SELECT heure_debut, heure_fin FROM creneaux_disponibles
+        WHERE medecin_id = ? AND date_creneau = ? AND disponible = 1
+    ''', (medecin_id, date_str)).fetchall()
+    
+    # Si aucun créneau n'est défini, retourner les créneaux par défaut
+    if not lignes:
+        return generer_heures_disponibles()
+    
+    # Créneaux de la grille couverts par les plages fusionnées, comme dans disponibilite_jour :
+    # des plages toutes mal formées ne proposent aucun créneau
+    return [heure for heure in Intervalles(lignes).creneaux() if heure in BIT_HEURE]
+
+
+def masque_libre(conn, medecin_id, date_str, exclure_rdv_id=None):
+    """Masque des créneaux proposés par le médecin et non occupés.
+    
+    Lu dans disponibilite_jour, tenue à jour par des triggers ; le créneau du
+    rendez-vous exclu (modification) est rendu libre.
+    """
+    ligne = conn.execute('''
+        SELECT masque_defini, masque_occupe FROM disponibilite_jour
+        WHERE medecin_id = ? AND date_jour = ?
+    ''', (medecin_id, date_str)).fetchone()
+    if ligne is None:
+        return MASQUE_COMPLET
+    
+    masque_defini, masque_occupe = ligne
+    if masque_defini is None:
+        masque_defini = MASQUE_COMPLET
+    
+    if exclure_rdv_id is not None and masque_occupe:
+        rdv = conn.execute('''
+            SELECT heure_rdv FROM rendez_vous
+            WHERE id = ? AND medecin_id = ? AND date_rdv = ? AND statut != 'annulé'
+        ''', (exclure_rdv_id, medecin_id, date_str)).fetchone()
+        if rdv:
+            masque_occupe &= ~masque_depuis_heures(rdv)
+    
+    return masque_defini & ~masque_occupe
+
+
+def obtenir_heures_libres(conn, medecin_id, date_str, exclure_rdv_id=None):
+    """Heures proposées par le médecin et non occupées (son propre rendez-vous peut être exclu)"""
+    return heures_depuis_masque(masque_libre(conn, medecin_id, date_str, exclure_rdv_id))
+
+
+def _masque_reservable(jour, limite, a_partir_de=None):
+    """Masque des créneaux du jour qui commencent après limite (et pas avant a_partir_de)"""
+    autorise = MASQUE_COMPLET
+    for bit, heure in enumerate(GRILLE):
+        debut_creneau = datetime.combine(jour, datetime.strptime(heure, "%H:%M").time())
+        if debut_creneau > limite and (a_partir_de is None or debut_creneau >= a_partir_de):
+            break
+        autorise &= ~(1 << bit)
+    return autorise
+
+
+def prochains_creneaux_libres(conn, specialite, nombre=5, a_partir_de=None,
+                              horizon_jours=HORIZON_RECHERCHE, maintenant=None):
+    """Les premiers créneaux libres tous médecins d'une spécialité confondus.
+    
+    Une seule requête sur disponibilite_jour pour tout l'horizon ; un jour sans
+    ligne est entièrement libre. Retourne au plus `nombre` tuples
+    (date_rdv, heure_rdv, medecin_id, nom_medecin) par ordre chronologique.
+    """
+    maintenant = maintenant or datetime.now()
+    limite = maintenant + ANTICIPATION_MINIMALE
+    premier_jour = max(a_partir_de or maintenant, maintenant).date()
+    dernier_jour = premier_jour + timedelta(days=horizon_jours - 1)
+    
+    lignes = conn.execute('''
+        SELECT m.id, m.nom_complet, d.date_jour, d.masque_defini, d.masque_occupe
+        FROM medecins m
+        LEFT JOIN disponibilite_jour d
+            ON d.medecin_id = m.id AND d.date_jour BETWEEN ? AND ?
+        WHERE m.specialite = ?
+    ''', (premier_jour.isoformat(), dernier_jour.isoformat(), specialite)).fetchall()
+    
+    medecins = {}
+    masques = {}
+    for medecin_id, nom, date_jour, masque_defini, masque_occupe in lignes:
+        medecins[medecin_id] = nom
+        if date_jour is not None:
+            if masque_defini is None:
+                masque_defini = MASQUE_COMPLET
+            masques[(medecin_id, date_jour)] = masque_defini & ~masque_occupe
+    
+    resultats = []
+    for decalage in range(horizon_jours if medecins else 0):
+        jour = premier_jour + timedelta(days=decalage)
+        date_str = jour.isoformat()
+        
+        # Créneaux trop proches (anticipation) ou antérieurs à a_partir_de
+        autorise = _masque_reservable(jour, limite, a_partir_de)
+        
+        candidats = []
+        for medecin_id in medecins:
+            masque = masques.get((medecin_id, date_str), MASQUE_COMPLET) & autorise
+            while masque:
+                candidats.append(((masque & -masque).bit_length() - 1, medecin_id))
+                masque &= masque - 1
+        
+        for bit, medecin_id in heapq.nsmallest(nombre - len(resultats), candidats):
+            resultats.append((date_str, GRILLE[bit], medecin_id, medecins[medecin_id]))
+        
+        if len(resultats) >= nombre:
+            break
+    
+    return resultats
+
+
+def disponibilites_mois(conn, medecin_id, annee, mois, maintenant=None):
+    """Nombre de créneaux libres et réservables par jour d'un mois pour un médecin.
+    
+    Une seule lecture de disponibilite_jour sur le mois ; retourne
+    {date AAAA-MM-JJ: nombre de créneaux libres}.
+    """
+    maintenant = maintenant or datetime.now()
+    limite = maintenant + ANTICIPATION_MINIMALE
+    premier_jour = date(int(annee), int(mois), 1)
+    nb_jours = calendar.monthrange(premier_jour.year, premier_jour.month)[1]
+    dernier_jour = premier_jour.replace(day=nb_jours)
+    
+    masques = {}
+    for date_jour, masque_defini, masque_occupe in conn.execute('''
+        SELECT date_jour, masque_defini, masque_occupe FROM disponibilite_jour
+        WHERE medecin_id = ? AND date_jour BETWEEN ? AND ?
+    ''', (medecin_id, premier_jour.isoformat(), dernier_jour.isoformat())):
+        if masque_defini is None:
+            masque_defini = MASQUE_COMPLET
+        masques[date_jour] = masque_defini & ~masque_occupe
+    
+    disponibilites = {}
+    for numero in range(nb_jours):
+        jour = premier_jour + timedelta(days=numero)
+        date_str = jour.isoformat()
+        masque = masques.get(date_str, MASQUE_COMPLET)
+        if jour <= limite.date():
+            masque &= _masque_reservable(jour, limite)
+        disponibilites[date_str] = masque.bit_count()
+    return disponibilites
+
+
+# ============ RÉSERVATION ============
+# Ligne retournée par les modifications d'un rendez-vous (mise à jour des vues ouvertes)
+COLONNES_LIGNE_RDV = "id, patient_id, medecin_id, date_rdv, heure_rdv, urgent, statut"
+# Créneau hors des plages du médecin (ou hors de la grille)
+CRENEAU_NON_PROPOSE = "Ce créneau n'est pas proposé par le médecin"
+
+
+def _rdv_actif_sur_creneau(conn, medecin_id, date_rdv, heure_rdv, exclure_id=None):
+    """Retourner l'id du rendez-vous actif occupant ce créneau, ou None"""
+    ligne = conn.execute('''
+        SELECT id FROM rendez_vous
+        WHERE medecin_id = ? AND date_rdv = ? AND heure_rdv = ? AND statut != 'annulé'
+          AND id IS NOT ?
+    ''', (medecin_id, date_rdv, heure_rdv, exclure_id)).fetchone()
+    return ligne[0] if ligne else None
+
+
+def _refus_creneau(conn, medecin_id, date_rdv, heure_rdv, exclure_id=None):
+    """Raison du refus d'un créneau (ConflitCreneau ou message), ou None s'il est réservable.
+    
+    Le créneau doit être proposé par le médecin et libre (masque_libre) ; le
+    rendez-vous exclu (déplacement) ne bloque pas son propre créneau.
+    """
+    existant = _rdv_actif_sur_creneau(conn, medecin_id, date_rdv, heure_rdv, exclure_id)
+    if existant is not None:
+        return ConflitCreneau(medecin_id, date_rdv, heure_rdv, existant)
+    
+    bit = BIT_HEURE.get(heure_rdv)
+    if bit is None:
+        return CRENEAU_NON_PROPOSE
+    if not masque_libre(conn, medecin_id, date_rdv, exclure_id) >> bit & 1:
+        ligne = conn.execute('''
+            SELECT masque_occupe FROM disponibilite_jour WHERE medecin_id = ? AND date_jour = ?
+        ''', (medecin_id, date_rdv)).fetchone()
+        if ligne and ligne[0] >> bit & 1:
+            return ConflitCreneau(medecin_id, date_rdv, heure_rdv)
+        return CRENEAU_NON_PROPOSE
+    return None
+
+
+def reserver_creneau(conn, patient_id, medecin_id, date_rdv, heure_rdv, urgent=0):
+    """Réserver un créneau de façon atomique.
+    
+    Retourne (True, id du rendez-vous), (False, ConflitCreneau) ou (False, message)
+    si le médecin ne propose pas ce créneau.
+    """
+    try:
+        with transaction_immediate(conn):
+            refus = _refus_creneau(conn, medecin_id, date_rdv, heure_rdv)
+            if refus is not None:
+                return False, refus
+            
+            curseur = conn.execute('''
+                INSERT INTO rendez_vous (patient_id, medecin_id, date_rdv, heure_rdv, urgent)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (patient_id, medecin_id, date_rdv, heure_rdv, urgent))
+            return True, curseur.lastrowid
+    except sqlite3.IntegrityError:
+        # Index unique ux_rdv_actif : le créneau a été pris entre-temps
+        return False, ConflitCreneau(medecin_id, date_rdv, heure_rdv)
+
+
+def deplacer_rendez_vous(conn, rdv_id, medecin_id, date_rdv, heure_rdv, urgent):
+    """Déplacer un rendez-vous vers un nouveau créneau de façon atomique.
+    
+    Retourne (True, ligne modifiée) ou (False, ConflitCreneau ou message) ; la ligne suit
+    COLONNES_LIGNE_RDV. Garder le même créneau (simple changement d'urgence) n'est pas un conflit.
+    """
+    try:
+        with transaction_immediate(conn):
+            refus = _refus_creneau(conn, medecin_id, date_rdv, heure_rdv, exclure_id=rdv_id)
+            if refus is not None:
+                return False, refus
+            
+            lignes = conn.execute(f'''
+                UPDATE rendez_vous
+                SET medecin_id = ?, date_rdv = ?, heure_rdv = ?, urgent = ?
+                WHERE id = ?
+                RETURNING {COLONNES_LIGNE_RDV}
+            ''', (medecin_id, date_rdv, heure_rdv, urgent, rdv_id)).fetchall()
+            if not lignes:
+                return False, "Rendez-vous introuvable"
+            return True, lignes[0]
+    except sqlite3.IntegrityError:
+        return False, ConflitCreneau(medecin_id, date_rdv, heure_rdv)
+
+
+def prendre_rendez_vous(conn, patient_id, medecin_id, date_rdv, heure_rdv, urgent=0, maintenant=None):
+    """Valider puis réserver un nouveau rendez-vous"""
+    valide, resultat = valider_creneau_rdv(date_rdv, heure_rdv, maintenant)
+    if not valide:
+        return False, resultat
+    
+    return reserver_creneau(conn, patient_id, medecin_id, date_rdv, heure_rdv, urgent)
+
+
+def modifier_rendez_vous(conn, rdv_id, medecin_id, date_rdv, heure_rdv, urgent, maintenant=None):
+    """Valider puis déplacer un rendez-vous existant (médecin, date, heure, urgence)"""
+    valide, resultat = valider_creneau_rdv(date_rdv, heure_rdv, maintenant)
+    if not valide:
+        return False, resultat
+    
+    return deplacer_rendez_vous(conn, rdv_id, medecin_id, date_rdv, heure_rdv, urgent)
+
+
+def annuler_rendez_vous(conn, rdv_id):
+    """Annuler un rendez-vous actif : (True, ligne modifiée) ou (False, message)"""
+    lignes = conn.execute(f'''
+        UPDATE rendez_vous SET statut = 'annulé'
+        WHERE id = ? AND statut != 'annulé'
+        RETURNING {COLONNES_LIGNE_RDV}
+    ''', (rdv_id,)).fetchall()
+    conn.commit()
+    
+    if not lignes:
+        return False, "Ce rendez-vous est déjà annulé"
+    
+    return True, lignes[0]
+
+
+def reactiver_rendez_vous(conn, rdv_id):
+    """Réactiver un rendez-vous annulé si son créneau est toujours libre.
+    
+    Retourne (True, ligne modifiée) ou (False, message ou ConflitCreneau).
+    """
+    try:
+        with transaction_immediate(conn):
+            rdv = conn.execute('''
+                SELECT medecin_id, date_rdv, heure_rdv, statut FROM rendez_vous WHERE id = ?
+            ''', (rdv_id,)).fetchone()
+            
+            if not rdv:
+                return False, "Rendez-vous introuvable"
+            
+            if rdv[3] != 'annulé':
+                return False, "Ce rendez-vous n'est pas annulé"
+            
+            existant = _rdv_actif_sur_creneau(conn, rdv[0], rdv[1], rdv[2], exclure_id=rdv_id)
+            if existant is not None:
+                return False, ConflitCreneau(rdv[0], rdv[1], rdv[2], existant)
+            
+            ligne = conn.execute(f'''
+                UPDATE rendez_vous SET statut = 'confirmé' WHERE id = ?
+                RETURNING {COLONNES_LIGNE_RDV}
+            ''', (rdv_id,)).fetchall()[0]
+            return True, ligne
+    except sqlite3.IntegrityError:
+        return False, ConflitCreneau(rdv[0], rdv[1], rdv[2])
+
+
+# ============ CONSULTATION ============
+def lister_medecins(conn):
+    """Liste des médecins (id, nom complet, spécialité), servie par le cache de references"""
+    return references.liste_medecins(conn)
+
+
+def obtenir_rendez_vous(conn, rdv_id):
+    """Détails d'un rendez-vous : (medecin_id, date_rdv, heure_rdv, urgent)"""
+    return conn.execute('''
+        SELECT medecin_id, date_rdv, heure_rdv, urgent
+        FROM rendez_vous
+        WHERE id = ?
+    ''', (rdv_id,)).fetchone()
+
+
+def rendez_vous_patient(conn, patient_id):
+    """Rendez-vous d'un patient, par ordre chronologique"""
+    return conn.execute('''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, m.nom_complet, m.specialite, rv.urgent, rv.statut, rv.medecin_id
+        FROM rendez_vous rv
+        JOIN medecins m ON rv.medecin_id = m.id
+        WHERE rv.patient_id = ?
+        ORDER BY rv.date_rdv, rv.heure_rdv
+    ''', (patient_id,)).fetchall()
+
+
+def agenda_medecin(conn, medecin_id, date_debut, date_fin):
+    """Agenda d'un médecin entre deux dates incluses : (id, date, heure, patient, urgent, statut)"""
+    return conn.execute('''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, rv.urgent, rv.statut
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        WHERE rv.medecin_id = ? AND rv.date_rdv BETWEEN ? AND ?
+        ORDER BY rv.date_rdv, rv.heure_rdv
+    ''', (medecin_id, date_debut, date_fin)).fetchall()
+
+
+def lignes_agenda_medecin(conn, medecin_id, rdv_ids):
+    """Lignes d'agenda (mêmes colonnes qu'agenda_medecin) des rendez-vous rdv_ids encore chez ce médecin"""
+    rdv_ids = list(rdv_ids)
+    if not rdv_ids:
+        return []
+    return conn.execute(f'''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, rv.urgent, rv.statut
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        WHERE rv.medecin_id = ? AND rv.id IN ({", ".join("?" * len(rdv_ids))})
+    ''', [medecin_id] + rdv_ids).fetchall()
+
+
+def coordonnees_patient_rdv(conn, rdv_id):
+    """Coordonnées du patient d'un rendez-vous : (téléphone, âge, adresse) ou None"""
+    return conn.execute('''
+        SELECT p.telephone, p.age, p.adresse
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        WHERE rv.id = ?
+    ''', (rdv_id,)).fetchone()
+
+
+def rendez_vous_urgents_medecin(conn, medecin_id):
+    """Rendez-vous urgents d'un médecin"""
+    return conn.execute('''
+        SELECT rv.date_rdv, rv.heure_rdv, p.nom_complet, rv.statut
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        WHERE rv.medecin_id = ? AND rv.urgent = 1
+        ORDER BY rv.date_rdv, rv.heure_rdv
+    ''', (medecin_id,)).fetchall()
+
+
+def tous_les_rendez_vous(conn):
+    """Tous les rendez-vous du système (vue administrateur)"""
+    return conn.execute('''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, m.nom_complet,
+               m.specialite, rv.urgent, rv.statut, p.telephone
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        JOIN medecins m ON rv.medecin_id = m.id
+        ORDER BY rv.date_rdv, rv.heure_rdv
+    ''').fetchall()
+
+
+# Nombre de lignes chargées par page dans la vue administrateur
+TAILLE_PAGE = 100
+# Nombre de lignes lues à la fois par l'export
+TAILLE_LOT_EXPORT = 1_000
+
+
+def _clause_filtres(alias, date_debut=None, date_fin=None, medecin_id=None, statut=None, urgent=None):
+    """Conditions SQL (et paramètres) des filtres de la vue administrateur sur la table alias"""
+    conditions = []
+    parametres = []
+    if date_debut:
+        conditions.append(f"{alias}.date_rdv >= ?")
+        parametres.append(date_debut)
+    if date_fin:
+        conditions.append(f"{alias}.date_rdv <= ?")
+        parametres.append(date_fin)
+    if medecin_id is not None:
+        conditions.append(f"{alias}.medecin_id = ?")
+        parametres.append(medecin_id)
+    if statut:
+        conditions.append(f"{alias}.statut = ?")
+        parametres.append(statut)
+    if urgent is not None:
+        conditions.append(f"{alias}.urgent = ?")
+        parametres.append(1 if urgent else 0)
+    return conditions, parametres
+
+
+def page_rendez_vous(conn, apres=None, taille=TAILLE_PAGE, **filtres):
+    """Une page de rendez-vous (vue administrateur), triée par date, heure et id.
+    
+    Pagination par clé : apres est la clé (date_rdv, heure_rdv, id) de la dernière
+    ligne de la page précédente. Filtres : date_debut, date_fin, medecin_id,
+    statut, urgent. Colonnes identiques à tous_les_rendez_vous.
+    """
+    conditions, parametres = _clause_filtres("rv", **filtres)
+    if apres is not None:
+        conditions.append("(rv.date_rdv, rv.heure_rdv, rv.id) > (?, ?, ?)")
+        parametres.extend(apres)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return conn.execute(f'''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, m.nom_complet,
+               m.specialite, rv.urgent, rv.statut, p.telephone
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        JOIN medecins m ON rv.medecin_id = m.id
+        {where}
+        ORDER BY rv.date_rdv, rv.heure_rdv, rv.id
+        LIMIT ?
+    ''', parametres + [taille]).fetchall()
+
+
+def lignes_rendez_vous(conn, rdv_ids):
+    """Lignes (mêmes colonnes que page_rendez_vous) des rendez-vous rdv_ids encore présents"""
+    rdv_ids = list(rdv_ids)
+    if not rdv_ids:
+        return []
+    return conn.execute(f'''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, m.nom_complet,
+               m.specialite, rv.urgent, rv.statut, p.telephone
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        JOIN medecins m ON rv.medecin_id = m.id
+        WHERE rv.id IN ({", ".join("?" * len(rdv_ids))})
+    ''', rdv_ids).fetchall()
+
+
+def cle_page(rdv):
+    """Clé de pagination d'une ligne de page_rendez_vous"""
+    return (rdv[1], rdv[2], rdv[0])
+
+
+def iterer_rendez_vous(conn, taille_lot=TAILLE_LOT_EXPORT, **filtres):
+    """Parcourir les rendez-vous filtrés, triés par date, heure et id (export).
+    
+    Mêmes colonnes et filtres que page_rendez_vous ; le curseur est lu par lots
+    de taille_lot lignes, seul le lot courant est gardé en mémoire.
+    """
+    conditions, parametres = _clause_filtres("rv", **filtres)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    curseur = conn.execute(f'''
+        SELECT rv.id, rv.date_rdv, rv.heure_rdv, p.nom_complet, m.nom_complet,
+               m.specialite, rv.urgent, rv.statut, p.telephone
+        FROM rendez_vous rv
+        JOIN patients p ON rv.patient_id = p.id
+        JOIN medecins m ON rv.medecin_id = m.id
+        {where}
+        ORDER BY rv.date_rdv, rv.heure_rdv, rv.id
+    ''', parametres)
+    try:
+        while True:
+            lot = curseur.fetchmany(taille_lot)
+            if not lot:
+                break
+            yield from lot
+    finally:
+        curseur.close()
+
+
+def statistiques_rendez_vous(conn, **filtres):
+    """Totaux (total, confirmés, annulés, urgents) avec les mêmes filtres que la liste.
+    
+    Lus dans resume_quotidien (comptes par médecin, jour, statut et urgence,
+    tenus à jour par des triggers) plutôt qu'en parcourant rendez_vous. Comme
+    la liste, seuls les rendez-vous de médecins et de patients existants sont comptés.
+    """
+    conditions, parametres = _clause_filtres("rq", **filtres)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    total, confirmes, annules, urgents = conn.execute(f'''
+        SELECT COALESCE(SUM(rq.nb), 0),
+               COALESCE(SUM(CASE WHEN rq.statut = 'confirmé' THEN rq.nb END), 0),
+               COALESCE(SUM(CASE WHEN rq.statut = 'annulé' THEN rq.nb END), 0),
+               COALESCE(SUM(CASE WHEN rq.urgent = 1 THEN rq.nb END), 0)
+        FROM resume_quotidien rq
+        JOIN medecins m ON m.id = rq.medecin_id
+        {where}
+    ''', parametres).fetchone()
+    return {"total": total, "confirmes": confirmes, "annules": annules, "urgents": urgents}
+
+
+# Regroupements du tableau de bord : (libellé affiché, clé de regroupement)
+REGROUPEMENTS = {
+    "medecin": ("'Dr. ' || m.nom_complet", "rq.medecin_id"),
+    "specialite": ("m.specialite", "m.specialite"),
+    "jour": ("rq.date_rdv", "rq.date_rdv"),
+}
+
+
+def tableau_de_bord(conn, par="medecin", **filtres):
+    """Statistiques regroupées par médecin, spécialité ou jour, depuis resume_quotidien.
+    
+    Retourne des tuples (libellé, total, confirmés, annulés, urgents, taux d'annulation en %).
+    """
+    libelle, cle = REGROUPEMENTS[par]
+    conditions, parametres = _clause_filtres("rq", **filtres)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    lignes = conn.execute(f'''
+        SELECT {libelle}, SUM(rq.nb),
+               COALESCE(SUM(CASE WHEN rq.statut = 'confirmé' THEN rq.nb END), 0),
+               COALESCE(SUM(CASE WHEN rq.statut = 'annulé' THEN rq.nb END), 0),
+               COALESCE(SUM(CASE WHEN rq.urgent = 1 THEN rq.nb END), 0)
+        FROM resume_quotidien rq
+        JOIN medecins m ON m.id = rq.medecin_id
+        {where}
+        GROUP BY {cle}
+        HAVING SUM(rq.nb) > 0
+        ORDER BY 1
+    ''', parametres).fetchall()
+    return [ligne + (round(100 * ligne[3] / ligne[1], 1),) for ligne in lignes]
+
+
+# ============ PLAGES DES MÉDECINS ============
+# Plages bien formées (comme dans la migration 7 et la vue masques_plages) : les autres,
+# héritées de l'ancien système, ne sont ni fusionnées ni comptées comme couvrant un créneau
+SQL_PLAGE_BIEN_FORMEE = '''
+    heure_debut GLOB '[0-9][0-9]:[0-9][0-9]' AND heure_fin GLOB '[0-9][0-9]:[0-9][0-9]'
+    AND heure_debut < heure_fin
+'''
+# Regroupement des plages d'un médecin en îlots : une plage qui commence avant la fin
+# des précédentes (chevauchement ou contiguïté) rejoint leur îlot
+SQL_ILOTS_PLAGES = f'''
+    WITH ordonnees AS (
+        SELECT id, medecin_id, date_creneau, heure_debut, heure_fin,
+               MAX(heure_fin) OVER (
+                   PARTITION BY medecin_id, date_creneau ORDER BY heure_debut, heure_fin
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ) AS fin_precedente
+        FROM creneaux_disponibles
+        WHERE medecin_id = ? AND date_creneau BETWEEN ? AND ? AND disponible = 1
+          AND {SQL_PLAGE_BIEN_FORMEE}
+    )
+    SELECT id, date_creneau, heure_debut, heure_fin,
+           SUM(fin_precedente IS NULL OR fin_precedente < heure_debut) OVER (
+               PARTITION BY date_creneau ORDER BY heure_debut, heure_fin ROWS UNBOUNDED PRECEDING
+           ) AS ilot
+    FROM ordonnees
+'''
+
+
+def _fusionner_plages(conn, medecin_id, date_debut, date_fin):
+    """Réunir les plages d'un médecin qui se chevauchent ou se touchent (à appeler en transaction)"""
+    ilots = {}
+    for plage_id, date_creneau, heure_debut, heure_fin, ilot in conn.execute(
+        SQL_ILOTS_PLAGES, (medecin_id, date_debut, date_fin)
+    ):
+        ilots.setdefault((date_creneau, ilot), []).append((plage_id, heure_debut, heure_fin))
+    
+    a_supprimer = []
+    a_creer = []
+    for (date_creneau, _ilot), plages in ilots.items():
+        if len(plages) > 1:
+            a_supprimer.extend((plage_id,) for plage_id, _, _ in plages)
+            a_creer.append((medecin_id, date_creneau, min(p[1] for p in plages), max(p[2] for p in plages)))
+    
+    conn.executemany("DELETE FROM creneaux_disponibles WHERE id = ?", a_supprimer)
+    conn.executemany('''
+        INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+        VALUES (?, ?, ?, ?)
+    ''', a_creer)
+    return len(a_creer)
+
+
+def plages_medecin(conn, medecin_id, date_str):
+    """Plages ouvertes d'un médecin pour un jour, fusionnées (Intervalles)"""
+    return Intervalles(conn.execute('''
+        SELECT heure_debut, heure_fin FROM creneaux_disponibles
+        WHERE medecin_id = ? AND date_creneau = ? AND disponible = 1
+    ''', (medecin_id, date_str)))
+
+
+def lister_plages_medecin(conn, medecin_id, date_str):
+    """Plages horaires définies par un médecin pour un jour : (heure_debut, heure_fin, disponible)"""
+    return conn.execute('''
+        SELECT heure_debut, heure_fin, disponible
+        FROM creneaux_disponibles
+        WHERE medecin_id = ? AND date_creneau = ?
+        ORDER BY heure_debut
+    ''', (medecin_id, date_str)).fetchall()
+
+
+def ajouter_creneau(conn, medecin_id, date_str, heure_debut, heure_fin, maintenant=None):
+    """Ajouter une plage horaire de disponibilité pour un médecin"""
+    maintenant = maintenant or datetime.now()
+    
+    # Vérifier les heures (créneaux autorisés, fin après le début)
+    plage_valide, plage_ou_message = valider_plage(heure_debut, heure_fin)
+    if not plage_valide:
+        return False, plage_ou_message
+    
+    heure_debut, heure_fin = plage_ou_message
+    debut = datetime.strptime(heure_debut, "%H:%M")
+    fin = datetime.strptime(heure_fin, "%H:%M")
+    
+    # Vérifier que la date n'est pas dans le passé
+    try:
+        date_creneau = date_objet(date_str)
+    except (ValueError, TypeError):
+        return False, "Date invalide"
+    
+    if date_creneau < maintenant.date():
+        return False, "Impossible de créer un créneau dans le passé"
+    
+    # Si c'est aujourd'hui, vérifier que l'heure de début est dans le futur
+    if date_creneau == maintenant.date() and datetime.combine(date_creneau, debut.time()) <= maintenant:
+        return False, "L'heure de début doit être dans le futur pour aujourd'hui"
+    
+    with transaction_immediate(conn):
+        # Vérifier si la plage est déjà couverte par une plage existante
+        if plages_medecin(conn, medecin_id, date_str).contient(heure_debut, int((fin - debut).total_seconds()) // 60):
+            return False, "Ce créneau existe déjà"
+        
+        conn.execute('''
+            INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+            VALUES (?, ?, ?, ?)
+        ''', (medecin_id, date_str, heure_debut, heure_fin))
+        
+        # Réunir avec les plages qui la chevauchent ou la touchent
+        _fusionner_plages(conn, medecin_id, date_str, date_str)
+        plage_id = conn.execute(f'''
+            SELECT id FROM creneaux_disponibles
+            WHERE medecin_id = ? AND date_creneau = ? AND disponible = 1
+              AND heure_debut <= ? AND heure_fin >= ? AND {SQL_PLAGE_BIEN_FORMEE}
+        ''', (medecin_id, date_str, heure_debut, heure_fin)).fetchone()[0]
+    
+    return True, plage_id
+
+
+def supprimer_creneau(conn, medecin_id, date_str, heure_debut, heure_fin):
+    """Supprimer une plage horaire d'un médecin"""
+    curseur = conn.execute('''
+        DELETE FROM creneaux_disponibles
+        WHERE medecin_id = ? AND date_creneau = ? AND heure_debut = ? AND heure_fin = ?
+    ''', (medecin_id, date_str, heure_debut, heure_fin))
+    conn.commit()
+    
+    if curseur.rowcount == 0:
+        return False, "Créneau introuvable"
+    
+    return True, curseur.rowcount
+
+
+def creneaux_recurrents(conn, medecin_id, jours_semaine, heure_debut, heure_fin,
+                        date_debut, date_fin, maintenant=None):
+    """Créer une plage horaire chaque semaine (ex. lundi et mercredi 08:00-11:30).
+    
+    jours_semaine : numéros de jour (0 = lundi ... 6 = dimanche). Les dates sont
+    générées entre date_debut et date_fin (AAAA-MM-JJ) puis insérées en une seule
+    transaction ; les jours déjà couverts par une plage existante sont écartés
+    par une requête ensembliste et les plages qui se chevauchent sont réunies.
+    Retourne (True, nombre de jours ajoutés) ou (False, message).
+    """
+    maintenant = maintenant or datetime.now()
+    
+    plage_valide, plage_ou_message = valider_plage(heure_debut, heure_fin)
+    if not plage_valide:
+        return False, plage_ou_message
+    
+    heure_debut, heure_fin = plage_ou_message
+    debut = datetime.strptime(heure_debut, "%H:%M")
+    jours_semaine = set(jours_semaine)
+    if not jours_semaine:
+        return False, "Veuillez choisir au moins un jour de la semaine"
+    
+    try:
+        premier_jour = date_objet(date_debut)
+        dernier_jour = date_objet(date_fin)
+    except (ValueError, TypeError):
+        return False, "Date invalide"
+    
+    if dernier_jour < premier_jour:
+        return False, "La date de fin doit être après la date de début"
+    
+    if (dernier_jour - premier_jour).days >= DUREE_MAX_RECURRENCE:
+        return False, f"Période limitée à {DUREE_MAX_RECURRENCE} jours"
+    
+    # Dates concernées, sans le passé ni une plage d'aujourd'hui déjà commencée
+    plages = []
+    jour = max(premier_jour, maintenant.date())
+    while jour <= dernier_jour:
+        if jour.weekday() in jours_semaine and datetime.combine(jour, debut.time()) > maintenant:
+            plages.append((medecin_id, jour.isoformat(), heure_debut, heure_fin))
+        jour += timedelta(days=1)
+    
+    if not plages:
+        return True, 0
+    
+    with transaction_immediate(conn):
+        conn.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS plages_a_creer (
+                medecin_id INTEGER, date_creneau TEXT, heure_debut TEXT, heure_fin TEXT
+            )
+        ''')
+        conn.execute("DELETE FROM plages_a_creer")
+        conn.executemany('''
+            INSERT INTO plages_a_creer (medecin_id, date_creneau, heure_debut, heure_fin)
+            VALUES (?, ?, ?, ?)
+        ''', plages)
+        curseur = conn.execute('''
+            INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+            SELECT p.medecin_id, p.date_creneau, p.heure_debut, p.heure_fin
+            FROM plages_a_creer p
+            WHERE NOT EXISTS (
+                SELECT 1 FROM creneaux_disponibles c
+                WHERE c.medecin_id = p.medecin_id AND c.date_creneau = p.date_creneau AND c.disponible = 1
+                  AND c.heure_debut <= p.heure_debut AND c.heure_fin >= p.heure_fin
+                  AND c.heure_debut GLOB '[0-9][0-9]:[0-9][0-9]' AND c.heure_fin GLOB '[0-9][0-9]:[0-9][0-9]'
+            )
+        ''')
+        nb_crees = curseur.rowcount
+        conn.execute("DELETE FROM plages_a_creer")
+        _fusionner_plages(conn, medecin_id, plages[0][1], plages[-1][1])
+    
+    return True, nb_crees
+
+
+# ============ JOURNAL DES MODIFICATIONS ============
+# Entrées lues au plus par consultation du journal ; au-delà, les vues se rechargent
+LIMITE_MODIFICATIONS = 500
+
+
+def derniere_modification(conn):
+    """Numéro de la dernière entrée du journal des modifications (0 si vide)"""
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM journal_modifications").fetchone()[0]
+
+
+def modifications_depuis(conn, depuis, limite=LIMITE_MODIFICATIONS):
+    """Entrées du journal postérieures à depuis : (dernier numéro, modifications).
+    
+    modifications : liste de (table, ligne_id, medecin_id, date_jour), ou None
+    s'il y a plus de limite entrées ou si des entrées ont été élaguées depuis
+    (la vue doit alors se recharger entièrement).
+    """
+    lignes = conn.execute('''
+        SELECT id, table_modifiee, ligne_id, medecin_id, date_jour
+        FROM journal_modifications
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+    ''', (depuis, limite + 1)).fetchall()
+    if not lignes:
+        return depuis, []
+    
+    if len(lignes) > limite or lignes[0][0] != depuis + 1:
+        return derniere_modification(conn), None
+    
+    return lignes[-1][0], [ligne[1:] for ligne in lignes]
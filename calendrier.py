@@ -0,0 +1,90 @@
+"""Vue mensuelle des disponibilités d'un médecin (carte de chaleur).
+
+Le mois entier est calculé par booking.disponibilites_mois en une seule
+lecture, exécutée hors du thread Tk.
+"""
+import calendar
+import tkinter as tk
+import booking
+
+NOMS_MOIS = ["Janvier", "Février", "Mars", "Avril", "Mai", "Juin", "Juillet",
+             "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
+JOURS_SEMAINE = ["Lu", "Ma", "Me", "Je", "Ve", "Sa", "Di"]
+
+
+def couleur_disponibilite(nb_libres):
+    """Couleur d'une case selon le nombre de créneaux libres"""
+    if nb_libres == 0:
+        return "lightgray"
+    if nb_libres <= len(booking.GRILLE) // 4:
+        return "lightcoral"
+    if nb_libres <= len(booking.GRILLE) // 2:
+        return "khaki"
+    return "lightgreen"
+
+
+def ouvrir_calendrier(parent, taches, medecin_id, nom_medecin, annee, mois, choisir_jour=None):
+    """Fenêtre mensuelle des créneaux libres ; choisir_jour(date_str) est appelé au clic sur un jour"""
+    fenetre = tk.Toplevel(parent)
+    fenetre.title("Disponibilités du mois")
+    fenetre.geometry("520x420")
+    fenetre.configure(bg="#2c2c2c")
+    
+    tk.Label(fenetre, text=f"Disponibilités - Dr. {nom_medecin}", font=("Arial", 12, "bold"),
+             fg="white", bg="#2c2c2c").pack(pady=10)
+    
+    # Navigation entre les mois
+    frame_navigation = tk.Frame(fenetre, bg="#2c2c2c")
+    frame_navigation.pack(pady=5)
+    
+    etat = {"annee": int(annee), "mois": int(mois)}
+    
+    def changer_mois(decalage):
+        indice = etat["annee"] * 12 + etat["mois"] - 1 + decalage
+        etat["annee"], etat["mois"] = indice // 12, indice % 12 + 1
+        charger()
+    
+    tk.Button(frame_navigation, text="◀", command=lambda: changer_mois(-1),
+              bg="white", font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+    label_mois = tk.Label(frame_navigation, width=16, font=("Arial", 11, "bold"), fg="white", bg="#2c2c2c")
+    label_mois.pack(side=tk.LEFT)
+    tk.Button(frame_navigation, text="▶", command=lambda: changer_mois(1),
+              bg="white", font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+    
+    frame_grille = tk.Frame(fenetre, bg="#2c2c2c")
+    frame_grille.pack(pady=10)
+    
+    tk.Label(fenetre, text="Nombre de créneaux libres par jour | Vert: disponible | Rouge: presque complet | Gris: complet",
+             font=("Arial", 8), fg="lightgray", bg="#2c2c2c").pack(pady=5)
+    
+    def choisir(date_str):
+        choisir_jour(date_str)
+        fenetre.destroy()
+    
+    def afficher(disponibilites):
+        for widget in frame_grille.winfo_children():
+            widget.destroy()
+        
+        for colonne, nom_jour in enumerate(JOURS_SEMAINE):
+            tk.Label(frame_grille, text=nom_jour, width=6, fg="white", bg="#2c2c2c").grid(row=0, column=colonne)
+        
+        for ligne, semaine in enumerate(calendar.monthcalendar(etat["annee"], etat["mois"]), start=1):
+            for colonne, jour in enumerate(semaine):
+                if jour == 0:
+                    continue
+                date_str = f"{etat['annee']:04d}-{etat['mois']:02d}-{jour:02d}"
+                nb_libres = disponibilites.get(date_str, 0)
+                case = tk.Button(frame_grille, text=f"{jour}\n{nb_libres}", width=6, height=2,
+                                 bg=couleur_disponibilite(nb_libres), font=("Arial", 9))
+                if choisir_jour is not None:
+                    case.config(command=lambda d=date_str: choisir(d))
+                case.grid(row=ligne, column=colonne, padx=1, pady=1)
+    
+    def charger():
+        label_mois.config(text=f"{NOMS_MOIS[etat['mois'] - 1]} {etat['annee']}")
+        # Un changement de mois plus récent remplace la demande en cours
+        taches.soumettre(booking.disponibilites_mois, medecin_id, etat["annee"], etat["mois"],
+                         cle=(str(fenetre), "mois"), succes=afficher)
+    
+    charger()
+    return fenetre
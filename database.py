@@ -0,0 +1,157 @@
+"""Accès partagé à la base hopital.db.
+
+Les connexions sont ouvertes en mode WAL (les lecteurs ne bloquent plus les
+écrivains), avec un délai d'attente sur verrou et des caches réglés, puis
+réutilisées au sein du processus par un pool.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from migrations import appliquer_migrations
+
+CHEMIN_BD = 'hopital.db'
+
+# Version minimale de SQLite : RETURNING (3.35) et fonctions de fenêtre (3.25)
+VERSION_SQLITE_MINIMALE = (3, 35, 0)
+
+# Délai d'attente d'un verrou avant l'erreur « database is locked » (secondes)
+DELAI_VERROU = 5
+
+# Réglages appliqués à chaque nouvelle connexion
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA busy_timeout = {DELAI_VERROU * 1000}",
+    "PRAGMA cache_size = -16000",      # 16 Mo de cache de pages
+    "PRAGMA mmap_size = 268435456",    # 256 Mo lus par projection mémoire
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class Connexion(sqlite3.Connection):
+    """Connexion SQLite qui garde le chemin absolu de sa base (clé des caches en mémoire)"""
+    
+    def __init__(self, chemin, *args, **kwargs):
+        super().__init__(chemin, *args, **kwargs)
+        self.chemin = os.path.abspath(chemin) if chemin != ":memory:" else chemin
+
+
+def ouvrir_connexion(chemin=CHEMIN_BD):
+    """Ouvrir une nouvelle connexion configurée (WAL, busy_timeout, caches)"""
+    if sqlite3.sqlite_version_info < VERSION_SQLITE_MINIMALE:
+        minimale = ".".join(map(str, VERSION_SQLITE_MINIMALE))
+        raise RuntimeError(f"SQLite {minimale} ou plus récent est requis (version installée : {sqlite3.sqlite_version})")
+    
+    conn = sqlite3.connect(chemin, timeout=DELAI_VERROU, check_same_thread=False, factory=Connexion)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@contextmanager
+def transaction_immediate(conn):
+    """Ouvrir une transaction BEGIN IMMEDIATE (verrou d'écriture pris dès le début)"""
+    if conn.in_transaction:
+        conn.commit()
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class PoolConnexions:
+    """Connexions réutilisées au sein d'un processus.
+    
+    Chaque thread dispose d'une connexion attitrée (connexion()) ; les tâches
+    ponctuelles empruntent une connexion le temps d'un bloc (acquerir()).
+    Les migrations sont appliquées une seule fois, à la création du pool.
+    """
+    
+    def __init__(self, chemin=CHEMIN_BD, taille_max=4):
+        self.chemin = chemin
+        self.taille_max = taille_max
+        self._libres = []
+        self._ouvertes = []
+        self._verrou = threading.Lock()
+        self._local = threading.local()
+        
+        conn = self._prendre()
+        try:
+            appliquer_migrations(conn)
+        finally:
+            self._rendre(conn)
+    
+    def _prendre(self):
+        with self._verrou:
+            if self._libres:
+                return self._libres.pop()
+        conn = ouvrir_connexion(self.chemin)
+        with self._verrou:
+            self._ouvertes.append(conn)
+        return conn
+    
+    def _rendre(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._verrou:
+            if len(self._libres) < self.taille_max:
+                self._libres.append(conn)
+                return
+            self._ouvertes.remove(conn)
+        conn.close()
+    
+    def connexion(self):
+        """Connexion attitrée au thread courant"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._prendre()
+            self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def acquerir(self):
+        """Emprunter une connexion le temps d'un bloc puis la rendre au pool"""
+        conn = self._prendre()
+        try:
+            yield conn
+        finally:
+            self._rendre(conn)
+    
+    def fermer(self):
+        """Fermer toutes les connexions ouvertes par ce pool"""
+        with self._verrou:
+            ouvertes, self._ouvertes, self._libres = self._ouvertes, [], []
+        for conn in ouvertes:
+            conn.close()
+        self._local = threading.local()
+
+
+_pools = {}
+_verrou_pools = threading.Lock()
+
+
+def pool(chemin=CHEMIN_BD):
+    """Pool de connexions du processus pour une base donnée (créé au premier appel)"""
+    with _verrou_pools:
+        if chemin not in _pools:
+            _pools[chemin] = PoolConnexions(chemin)
+        return _pools[chemin]
+
+
+def connexion(chemin=CHEMIN_BD):
+    """Connexion attitrée au thread courant, issue du pool du processus"""
+    return pool(chemin).connexion()
+
+
+def fermer_connexions():
+    """Fermer tous les pools du processus (à la sortie de l'application)"""
+    with _verrou_pools:
+        pools = list(_pools.values())
+        _pools.clear()
+    for p in pools:
+        p.fermer()
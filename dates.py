@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+# Les dates sont stockées au format ISO (AAAA-MM-JJ), triable et indexable.
+# Le format JJ/MM/AAAA n'est utilisé que pour l'affichage.
+FORMAT_AFFICHAGE = "%d/%m/%Y"
+
+
+def date_iso(jour, mois, annee):
+    """Construire la date de stockage AAAA-MM-JJ à partir des sélecteurs jour/mois/année"""
+    return f"{int(annee):04d}-{int(mois):02d}-{int(jour):02d}"
+
+
+def date_affichage(date_str):
+    """Convertir une date de stockage AAAA-MM-JJ en JJ/MM/AAAA pour l'affichage"""
+    try:
+        annee, mois, jour = date_str.split('-')
+        return f"{jour}/{mois}/{annee}"
+    except (ValueError, AttributeError):
+        return date_str
+
+
+def date_objet(date_str):
+    """Obtenir l'objet date correspondant à une date de stockage AAAA-MM-JJ"""
+    return date.fromisoformat(date_str)
+
+
+def date_depuis_affichage(texte):
+    """Convertir une date saisie JJ/MM/AAAA en date de stockage AAAA-MM-JJ (ValueError si invalide)"""
+    return datetime.strptime(texte.strip(), FORMAT_AFFICHAGE).date().isoformat()
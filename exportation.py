@@ -0,0 +1,108 @@
+"""Export des rendez-vous (CSV ou JSON Lines) pour la facturation et les rapports.
+
+Les lignes sont lues par lots (booking.iterer_rendez_vous) et écrites au fur
+et à mesure : la mémoire utilisée ne dépend pas de la période exportée, et la
+sortie standard peut alimenter un autre programme.
+
+Exemples :
+    python exportation.py --du 2026-01-01 --au 2026-01-31 --sortie janvier.csv
+    python exportation.py --format jsonl --medecin 3 | gzip > medecin3.jsonl.gz
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import booking
+from database import CHEMIN_BD, ouvrir_connexion
+from migrations import appliquer_migrations
+from dates import date_objet, date_depuis_affichage
+
+FORMATS = ("csv", "jsonl")
+# En-tête des fichiers exportés (colonnes de booking.iterer_rendez_vous)
+COLONNES = ("id", "date", "heure", "patient", "medecin", "specialite", "urgent", "statut", "telephone")
+
+
+def exporter(conn, sortie, format_sortie="csv", taille_lot=booking.TAILLE_LOT_EXPORT, **filtres):
+    """Écrire les rendez-vous filtrés dans le fichier texte sortie ; retourne le nombre de lignes.
+    
+    Filtres : ceux de la vue administrateur (date_debut, date_fin, medecin_id, statut, urgent).
+    """
+    lignes = booking.iterer_rendez_vous(conn, taille_lot, **filtres)
+    nb_lignes = 0
+    if format_sortie == "csv":
+        ecrivain = csv.writer(sortie)
+        ecrivain.writerow(COLONNES)
+        for ligne in lignes:
+            ecrivain.writerow(ligne)
+            nb_lignes += 1
+    else:
+        for ligne in lignes:
+            sortie.write(json.dumps(dict(zip(COLONNES, ligne)), ensure_ascii=False) + "\n")
+            nb_lignes += 1
+    return nb_lignes
+
+
+def format_depuis_chemin(chemin):
+    """Format d'export déduit de l'extension du fichier (CSV par défaut)"""
+    return "jsonl" if chemin.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def exporter_fichier(conn, chemin, format_sortie=None, **filtres):
+    """Exporter dans un fichier (format déduit de l'extension s'il n'est pas donné)"""
+    with open(chemin, "w", encoding="utf-8", newline="") as f:
+        return exporter(conn, f, format_sortie or format_depuis_chemin(chemin), **filtres)
+
+
+def _date_argument(texte):
+    """Date de la ligne de commande (AAAA-MM-JJ ou JJ/MM/AAAA) au format de stockage"""
+    try:
+        return date_objet(texte).isoformat()
+    except ValueError:
+        try:
+            return date_depuis_affichage(texte)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"date invalide : {texte}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporter les rendez-vous en CSV ou JSON Lines")
+    parser.add_argument("--base", default=CHEMIN_BD, help="base SQLite à lire")
+    parser.add_argument("--du", type=_date_argument, help="première date incluse")
+    parser.add_argument("--au", type=_date_argument, help="dernière date incluse")
+    parser.add_argument("--medecin", type=int, help="identifiant du médecin")
+    parser.add_argument("--statut", choices=booking.STATUTS)
+    parser.add_argument("--urgents", action="store_true", help="rendez-vous urgents seulement")
+    parser.add_argument("--format", choices=FORMATS, help="format de sortie (déduit de --sortie, sinon csv)")
+    parser.add_argument("--sortie", help="fichier de sortie (sortie standard par défaut)")
+    parser.add_argument("--taille-lot", type=int, default=booking.TAILLE_LOT_EXPORT)
+    args = parser.parse_args(argv)
+    
+    filtres = {"date_debut": args.du, "date_fin": args.au, "medecin_id": args.medecin,
+               "statut": args.statut, "urgent": True if args.urgents else None}
+    format_sortie = args.format or (format_depuis_chemin(args.sortie) if args.sortie else "csv")
+    
+    conn = ouvrir_connexion(args.base)
+    appliquer_migrations(conn)
+    debut = time.perf_counter()
+    try:
+        if args.sortie:
+            with open(args.sortie, "w", encoding="utf-8", newline="") as f:
+                nb_lignes = exporter(conn, f, format_sortie, args.taille_lot, **filtres)
+        else:
+            nb_lignes = exporter(conn, sys.stdout, format_sortie, args.taille_lot, **filtres)
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # Lecteur de la sortie standard fermé (ex. | head) : arrêt sans erreur
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        conn.close()
+    
+    print(f"{nb_lignes} rendez-vous exportés en {time.perf_counter() - debut:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Générateur de données synthétiques pour hopital.db (benchmarks).
+
+Exemple :
+    python generer_donnees.py --base benchmark.db --echelle moyen --graine 42
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+from booking import generer_heures_disponibles, SPECIALITES
+from dates import date_iso
+from database import ouvrir_connexion
+from migrations import appliquer_migrations
+from securite import hacher
+
+# Nombre de rendez-vous par échelle
+ECHELLES = {
+    "petit": 1_000,
+    "moyen": 100_000,
+    "grand": 10_000_000,
+}
+
+PRENOMS = ["Alice", "Bruno", "Camille", "David", "Emma", "François", "Gabriel", "Hélène",
+           "Inès", "Julien", "Karim", "Léa", "Mathis", "Nora", "Olivier", "Pauline"]
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand",
+        "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "Roux"]
+
+TAILLE_LOT = 10_000
+# Taux d'occupation visé des créneaux des médecins sur la période
+TAUX_OCCUPATION = 0.5
+
+
+def _nom_aleatoire(rng):
+    return f"{rng.choice(PRENOMS)} {rng.choice(NOMS)}"
+
+
+def _inserer_par_lots(conn, sql, lignes):
+    """Insérer un itérable de lignes par lots de TAILLE_LOT avec executemany"""
+    lot = []
+    total = 0
+    for ligne in lignes:
+        lot.append(ligne)
+        if len(lot) >= TAILLE_LOT:
+            conn.executemany(sql, lot)
+            total += len(lot)
+            lot = []
+    if lot:
+        conn.executemany(sql, lot)
+        total += len(lot)
+    return total
+
+
+def dimensions(nb_rdv, nb_jours=365):
+    """Nombre de patients et de médecins adaptés au volume de rendez-vous"""
+    creneaux_par_jour = len(generer_heures_disponibles())
+    nb_medecins = max(5, math.ceil(nb_rdv / (nb_jours * creneaux_par_jour * TAUX_OCCUPATION)))
+    nb_patients = max(50, nb_rdv // 10)
+    return nb_patients, nb_medecins
+
+
+def generer(conn, nb_rdv, graine=42, date_debut=None, nb_jours=365):
+    """Remplir patients, medecins, creneaux_disponibles et rendez_vous de façon reproductible"""
+    rng = random.Random(graine)
+    date_debut = date_debut or (date.today() + timedelta(days=1))
+    nb_patients, nb_medecins = dimensions(nb_rdv, nb_jours)
+    heures = generer_heures_disponibles()
+    jours = [date_debut + timedelta(days=i) for i in range(nb_jours)]
+    jours_iso = [date_iso(j.day, j.month, j.year) for j in jours]
+    
+    appliquer_migrations(conn)
+    
+    # Mot de passe "1234" pour tous les comptes générés : une seule empreinte (même sel)
+    # pour ne pas payer le coût du hachage à chaque compte
+    empreinte = hacher("1234")
+    
+    # Les identifiants générés suivent ceux déjà présents
+    premier_patient = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM patients").fetchone()[0]
+    premier_medecin = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM medecins").fetchone()[0]
+    
+    with conn:
+        _inserer_par_lots(conn, '''
+            INSERT INTO patients (id, nom_complet, nom_utilisateur, mot_de_passe, telephone, age, adresse)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (premier_patient + i, _nom_aleatoire(rng), f"gen{graine}p{i}", empreinte,
+             f"06 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+             rng.randint(1, 99), f"{rng.randint(1, 200)} rue de la Santé")
+            for i in range(nb_patients)
+        ))
+        
+        _inserer_par_lots(conn, '''
+            INSERT INTO medecins (id, nom_complet, specialite, nom_utilisateur, mot_de_passe)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            (premier_medecin + i, _nom_aleatoire(rng), rng.choice(SPECIALITES), f"gen{graine}m{i}", empreinte)
+            for i in range(nb_medecins)
+        ))
+    
+    # Plages horaires : un jour sur trois, matin et/ou après-midi
+    def plages():
+        for m in range(nb_medecins):
+            for jour in jours_iso:
+                if rng.random() >= 1 / 3:
+                    continue
+                if rng.random() < 0.7:
+                    yield (premier_medecin + m, jour, "08:00", "12:00")
+                if rng.random() < 0.7:
+                    yield (premier_medecin + m, jour, "13:00", "17:00")
+    
+    # Rendez-vous : créneaux tirés sans remise pour chaque médecin (pas de doublon actif)
+    rdv_par_medecin = [nb_rdv // nb_medecins + (1 if m < nb_rdv % nb_medecins else 0)
+                       for m in range(nb_medecins)]
+    capacite = nb_jours * len(heures)
+    
+    def rendez_vous():
+        for m, nombre in enumerate(rdv_par_medecin):
+            for indice in rng.sample(range(capacite), min(nombre, capacite)):
+                jour, creneau = divmod(indice, len(heures))
+                statut = "annulé" if rng.random() < 0.1 else "confirmé"
+                urgent = 1 if rng.random() < 0.05 else 0
+                yield (premier_patient + rng.randrange(nb_patients), premier_medecin + m,
+                       jours_iso[jour], heures[creneau], urgent, statut)
+    
+    with conn:
+        nb_plages = _inserer_par_lots(conn, '''
+            INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+            VALUES (?, ?, ?, ?)
+        ''', plages())
+    
+    with conn:
+        nb_rendez_vous = _inserer_par_lots(conn, '''
+            INSERT INTO rendez_vous (patient_id, medecin_id, date_rdv, heure_rdv, urgent, statut)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rendez_vous())
+    
+    # Données neuves : aucune fenêtre n'a de modification à relire
+    with conn:
+        conn.execute("DELETE FROM journal_modifications")
+    
+    conn.execute("ANALYZE")
+    
+    return {
+        "patients": nb_patients,
+        "medecins": nb_medecins,
+        "creneaux_disponibles": nb_plages,
+        "rendez_vous": nb_rendez_vous,
+        "date_debut": jours_iso[0],
+        "nb_jours": nb_jours,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Générer des données synthétiques pour les benchmarks")
+    parser.add_argument("--base", default="benchmark.db", help="fichier SQLite à remplir")
+    parser.add_argument("--echelle", choices=sorted(ECHELLES), default="petit")
+    parser.add_argument("--rdv", type=int, help="nombre de rendez-vous (remplace --echelle)")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--jours", type=int, default=365, help="période couverte à partir de demain")
+    args = parser.parse_args(argv)
+    
+    conn = ouvrir_connexion(args.base)
+    # Génération en masse : durabilité inutile
+    conn.execute("PRAGMA synchronous = OFF")
+    
+    debut = time.perf_counter()
+    resume = generer(conn, args.rdv or ECHELLES[args.echelle], args.graine, nb_jours=args.jours)
+    conn.close()
+    
+    print(f"{resume['rendez_vous']} rendez-vous, {resume['patients']} patients, "
+          f"{resume['medecins']} médecins, {resume['creneaux_disponibles']} plages "
+          f"générés en {time.perf_counter() - debut:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
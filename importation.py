@@ -0,0 +1,362 @@
+"""Import en masse de patients, médecins et rendez-vous (CSV ou JSON Lines).
+
+Le fichier est lu ligne à ligne et traité par lots : chaque lot est validé
+avec les validateurs des formulaires (et ses mots de passe hachés) hors de
+toute transaction, puis inséré par executemany dans sa propre transaction,
+qui ne garde le verrou d'écriture que le temps des contrôles d'unicité et de
+l'insertion. La mémoire utilisée ne dépend que de la taille d'un lot.
+
+Colonnes attendues (en-tête CSV ou clés JSON) :
+    patients     nom_complet, nom_utilisateur, mot_de_passe, telephone, age, adresse
+    medecins     nom_complet, specialite, nom_utilisateur, mot_de_passe
+    rendez_vous  patient, medecin (noms d'utilisateur), date (AAAA-MM-JJ ou JJ/MM/AAAA),
+                 heure, urgent (0/1, facultatif), statut (facultatif, confirmé par défaut)
+
+Exemple :
+    python importation.py patients patients.csv --erreurs erreurs.csv
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+import booking
+import securite
+import validation
+from database import CHEMIN_BD, ouvrir_connexion, transaction_immediate
+from dates import date_objet, date_depuis_affichage
+from migrations import appliquer_migrations
+
+# Nombre de lignes validées et insérées par transaction
+TAILLE_LOT = 1_000
+# Nombre d'erreurs gardées dans le rapport (les suivantes sont seulement comptées)
+ERREURS_CONSERVEES = 1_000
+
+VALEURS_URGENT = {"": 0, "0": 0, "non": 0, "false": 0, "1": 1, "oui": 1, "true": 1}
+
+
+def _valider_mot_de_passe(mot_de_passe):
+    """Mot de passe en clair (haché à l'insertion) ou empreinte déjà calculée"""
+    if securite.est_hache(mot_de_passe):
+        return True, mot_de_passe
+    return validation.valider_mot_de_passe(mot_de_passe)
+
+
+CHAMPS_PATIENT = [
+    ("nom_complet", validation.valider_nom_complet),
+    ("nom_utilisateur", validation.valider_nom_utilisateur),
+    ("mot_de_passe", _valider_mot_de_passe),
+    ("telephone", validation.valider_telephone),
+    ("age", validation.valider_age),
+    ("adresse", validation.valider_adresse),
+]
+CHAMPS_MEDECIN = [
+    ("nom_complet", validation.valider_nom_complet),
+    ("specialite", validation.valider_specialite),
+    ("nom_utilisateur", validation.valider_nom_utilisateur),
+    ("mot_de_passe", _valider_mot_de_passe),
+]
+
+
+def lire_lignes(chemin):
+    """Parcourir un fichier ligne à ligne : (numéro de ligne, dictionnaire ou None si illisible).
+    
+    Les fichiers .jsonl/.ndjson contiennent un objet JSON par ligne ; les
+    autres sont lus comme CSV avec une ligne d'en-tête.
+    """
+    with open(chemin, encoding="utf-8-sig", newline="") as f:
+        if chemin.lower().endswith((".jsonl", ".ndjson")):
+            for numero, texte in enumerate(f, start=1):
+                if not texte.strip():
+                    continue
+                try:
+                    ligne = json.loads(texte)
+                except json.JSONDecodeError:
+                    ligne = None
+                yield numero, ligne if isinstance(ligne, dict) else None
+        else:
+            for numero, ligne in enumerate(csv.DictReader(f), start=2):
+                yield numero, ligne
+
+
+def _texte(ligne, champ):
+    """Valeur d'un champ sous forme de texte ("" si absente)"""
+    valeur = ligne.get(champ)
+    return "" if valeur is None else str(valeur)
+
+
+def _valider_champs(ligne, champs):
+    """Appliquer les validateurs : (True, valeurs nettoyées) ou (False, message)"""
+    valeurs = []
+    erreurs = []
+    for champ, validateur in champs:
+        valide, valeur_ou_message = validateur(_texte(ligne, champ))
+        if valide:
+            valeurs.append(valeur_ou_message)
+        else:
+            erreurs.append(f"{champ}: {valeur_ou_message}")
+    
+    if erreurs:
+        return False, "; ".join(erreurs)
+    return True, tuple(valeurs)
+
+
+def _valider_rendez_vous(ligne):
+    """Valider une ligne de rendez-vous : (True, valeurs) ou (False, message)"""
+    erreurs = []
+    patient = _texte(ligne, "patient").strip().lower()
+    medecin = _texte(ligne, "medecin").strip().lower()
+    if not patient:
+        erreurs.append("patient: nom d'utilisateur manquant")
+    if not medecin:
+        erreurs.append("medecin: nom d'utilisateur manquant")
+    
+    # Dates ISO ou au format d'affichage de l'ancien système
+    texte_date = _texte(ligne, "date").strip()
+    try:
+        date_rdv = date_objet(texte_date).isoformat()
+    except ValueError:
+        try:
+            date_rdv = date_depuis_affichage(texte_date)
+        except ValueError:
+            date_rdv = None
+            erreurs.append("date: Date invalide (AAAA-MM-JJ ou JJ/MM/AAAA)")
+    
+    heure_valide, heure_ou_message = booking.valider_heure(_texte(ligne, "heure").strip())
+    if heure_valide:
+        heure_rdv = datetime.strptime(heure_ou_message, "%H:%M").strftime("%H:%M")
+    else:
+        erreurs.append(f"heure: {heure_ou_message}")
+    
+    urgent = VALEURS_URGENT.get(_texte(ligne, "urgent").strip().lower())
+    if urgent is None:
+        erreurs.append("urgent: valeur attendue 0 ou 1")
+    
+    statut = _texte(ligne, "statut").strip() or "confirmé"
+    if statut not in booking.STATUTS:
+        erreurs.append(f"statut: valeur attendue {' ou '.join(booking.STATUTS)}")
+    
+    if erreurs:
+        return False, "; ".join(erreurs)
+    return True, (patient, medecin, date_rdv, heure_rdv, urgent, statut)
+
+
+def _ids_par_nom(conn, table, noms):
+    """Identifiants des utilisateurs d'une table, par nom d'utilisateur"""
+    noms = list(set(noms))
+    if not noms:
+        return {}
+    return dict(conn.execute(f'''
+        SELECT nom_utilisateur, id FROM {table}
+        WHERE nom_utilisateur IN ({", ".join("?" * len(noms))})
+    ''', noms))
+
+
+def _preparer_utilisateurs(conn, table, champs, lot, rejeter):
+    """Valider un lot de patients ou de médecins et hacher ses mots de passe (hors transaction).
+    
+    Retourne les lignes retenues : (numéro, valeurs).
+    """
+    valides = []
+    for numero, ligne in lot:
+        valide, valeurs = _valider_champs(ligne, champs) if ligne is not None else (False, "Ligne illisible")
+        if valide:
+            valides.append((numero, valeurs))
+        else:
+            rejeter(numero, valeurs)
+    
+    # Noms d'utilisateur déjà pris, en base ou plus haut dans le fichier : inutile de les hacher
+    indice_nom = [champ for champ, _ in champs].index("nom_utilisateur")
+    pris = set(_ids_par_nom(conn, table, [valeurs[indice_nom] for _, valeurs in valides]))
+    
+    retenus = []
+    for numero, valeurs in valides:
+        if valeurs[indice_nom] in pris:
+            rejeter(numero, "nom_utilisateur: Ce nom d'utilisateur existe déjà")
+            continue
+        pris.add(valeurs[indice_nom])
+        retenus.append((numero, valeurs))
+    
+    # Mots de passe en clair hachés en parallèle, les empreintes importées sont conservées
+    indice_mdp = [champ for champ, _ in champs].index("mot_de_passe")
+    en_clair = [i for i, (_, valeurs) in enumerate(retenus) if not securite.est_hache(valeurs[indice_mdp])]
+    for i, empreinte in zip(en_clair, securite.hacher_lot([retenus[i][1][indice_mdp] for i in en_clair])):
+        numero, valeurs = retenus[i]
+        retenus[i] = (numero, valeurs[:indice_mdp] + (empreinte,) + valeurs[indice_mdp + 1:])
+    return retenus
+
+
+def _inserer_utilisateurs(conn, table, champs, retenus, rejeter):
+    """Insérer les lignes préparées (dans la transaction du lot) ; retourne le nombre inséré"""
+    # Noms pris par une autre connexion depuis la préparation
+    indice_nom = [champ for champ, _ in champs].index("nom_utilisateur")
+    pris = _ids_par_nom(conn, table, [valeurs[indice_nom] for _, valeurs in retenus])
+    
+    a_inserer = []
+    for numero, valeurs in retenus:
+        if valeurs[indice_nom] in pris:
+            rejeter(numero, "nom_utilisateur: Ce nom d'utilisateur existe déjà")
+        else:
+            a_inserer.append(valeurs)
+    
+    colonnes = ", ".join(champ for champ, _ in champs)
+    conn.executemany(
+        f"INSERT INTO {table} ({colonnes}) VALUES ({', '.join('?' * len(champs))})", a_inserer
+    )
+    return len(a_inserer)
+
+
+def _preparer_patients(conn, lot, rejeter):
+    return _preparer_utilisateurs(conn, "patients", CHAMPS_PATIENT, lot, rejeter)
+
+
+def _inserer_patients(conn, retenus, rejeter):
+    return _inserer_utilisateurs(conn, "patients", CHAMPS_PATIENT, retenus, rejeter)
+
+
+def _preparer_medecins(conn, lot, rejeter):
+    return _preparer_utilisateurs(conn, "medecins", CHAMPS_MEDECIN, lot, rejeter)
+
+
+def _inserer_medecins(conn, retenus, rejeter):
+    return _inserer_utilisateurs(conn, "medecins", CHAMPS_MEDECIN, retenus, rejeter)
+
+
+def _preparer_rendez_vous(conn, lot, rejeter):
+    """Valider un lot de rendez-vous (hors transaction) : (numéro, valeurs) des lignes valides"""
+    valides = []
+    for numero, ligne in lot:
+        valide, valeurs = _valider_rendez_vous(ligne) if ligne is not None else (False, "Ligne illisible")
+        if valide:
+            valides.append((numero, valeurs))
+        else:
+            rejeter(numero, valeurs)
+    return valides
+
+
+def _inserer_rendez_vous(conn, valides, rejeter):
+    """Résoudre les comptes et insérer les rendez-vous validés ; retourne le nombre inséré"""
+    patients = _ids_par_nom(conn, "patients", [valeurs[0] for _, valeurs in valides])
+    medecins = _ids_par_nom(conn, "medecins", [valeurs[1] for _, valeurs in valides])
+    
+    resolus = []
+    for numero, (patient, medecin, date_rdv, heure_rdv, urgent, statut) in valides:
+        if patient not in patients:
+            rejeter(numero, f"patient: {patient} introuvable")
+        elif medecin not in medecins:
+            rejeter(numero, f"medecin: {medecin} introuvable")
+        else:
+            resolus.append((numero, (patients[patient], medecins[medecin], date_rdv, heure_rdv, urgent, statut)))
+    
+    # Créneaux actifs déjà pris (un seul rendez-vous actif par médecin, date et heure)
+    cles = [valeurs[1:4] for _, valeurs in resolus if valeurs[5] != "annulé"]
+    occupes = set()
+    if cles:
+        occupes = set(conn.execute(f'''
+            WITH cles (medecin_id, date_rdv, heure_rdv) AS (VALUES {", ".join(["(?, ?, ?)"] * len(cles))})
+            SELECT r.medecin_id, r.date_rdv, r.heure_rdv
+            FROM cles c
+            JOIN rendez_vous r
+                ON r.medecin_id = c.medecin_id AND r.date_rdv = c.date_rdv AND r.heure_rdv = c.heure_rdv
+            WHERE r.statut != 'annulé'
+        ''', [valeur for cle in cles for valeur in cle]))
+    
+    a_inserer = []
+    for numero, valeurs in resolus:
+        if valeurs[5] != "annulé":
+            if valeurs[1:4] in occupes:
+                rejeter(numero, "Ce créneau est déjà réservé")
+                continue
+            occupes.add(valeurs[1:4])
+        a_inserer.append(valeurs)
+    
+    conn.executemany('''
+        INSERT INTO rendez_vous (patient_id, medecin_id, date_rdv, heure_rdv, urgent, statut)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', a_inserer)
+    return len(a_inserer)
+
+
+# Par type : (préparation hors transaction, insertion dans la transaction du lot)
+IMPORTEURS = {
+    "patients": (_preparer_patients, _inserer_patients),
+    "medecins": (_preparer_medecins, _inserer_medecins),
+    "rendez_vous": (_preparer_rendez_vous, _inserer_rendez_vous),
+}
+
+
+def importer(conn, type_donnees, lignes, taille_lot=TAILLE_LOT, signaler_erreur=None):
+    """Importer un itérable de (numéro, ligne) par lots d'une transaction chacun.
+    
+    signaler_erreur(numéro, message) est appelé pour chaque ligne rejetée.
+    Retourne le rapport : lignes lues, importées, rejetées et premières erreurs.
+    """
+    preparer, inserer = IMPORTEURS[type_donnees]
+    rapport = {"lues": 0, "importees": 0, "rejetees": 0, "erreurs": []}
+    
+    def rejeter(numero, message):
+        rapport["rejetees"] += 1
+        if len(rapport["erreurs"]) < ERREURS_CONSERVEES:
+            rapport["erreurs"].append((numero, message))
+        if signaler_erreur is not None:
+            signaler_erreur(numero, message)
+    
+    lignes = iter(lignes)
+    while True:
+        lot = list(islice(lignes, taille_lot))
+        if not lot:
+            break
+        rapport["lues"] += len(lot)
+        # Validation et hachage (coûteux) avant de prendre le verrou d'écriture
+        retenus = preparer(conn, lot, rejeter)
+        with transaction_immediate(conn):
+            rapport["importees"] += inserer(conn, retenus, rejeter)
+    
+    return rapport
+
+
+def importer_fichier(conn, type_donnees, chemin, **options):
+    """Importer un fichier CSV ou JSON Lines (voir importer)"""
+    return importer(conn, type_donnees, lire_lignes(chemin), **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importer des patients, médecins ou rendez-vous en masse")
+    parser.add_argument("type", choices=sorted(IMPORTEURS), help="type de données du fichier")
+    parser.add_argument("fichier", help="fichier CSV (avec en-tête) ou JSON Lines (.jsonl)")
+    parser.add_argument("--base", default=CHEMIN_BD, help="base SQLite à remplir")
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT)
+    parser.add_argument("--erreurs", help="fichier CSV recevant toutes les lignes rejetées")
+    args = parser.parse_args(argv)
+    
+    conn = ouvrir_connexion(args.base)
+    appliquer_migrations(conn)
+    
+    fichier_erreurs = open(args.erreurs, "w", encoding="utf-8", newline="") if args.erreurs else None
+    signaler_erreur = None
+    if fichier_erreurs:
+        ecrivain = csv.writer(fichier_erreurs)
+        ecrivain.writerow(["ligne", "erreur"])
+        signaler_erreur = lambda numero, message: ecrivain.writerow([numero, message])
+    
+    debut = time.perf_counter()
+    try:
+        rapport = importer_fichier(conn, args.type, args.fichier, taille_lot=args.taille_lot,
+                                   signaler_erreur=signaler_erreur)
+    finally:
+        conn.close()
+        if fichier_erreurs:
+            fichier_erreurs.close()
+    
+    if not fichier_erreurs:
+        for numero, message in rapport["erreurs"]:
+            print(f"ligne {numero}: {message}", file=sys.stderr)
+    print(f"{rapport['importees']} ligne(s) importée(s), {rapport['rejetees']} rejetée(s) "
+          f"sur {rapport['lues']} en {time.perf_counter() - debut:.1f} s", file=sys.stderr)
+    return 1 if rapport["rejetees"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
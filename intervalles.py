@@ -0,0 +1,79 @@
+"""Plages horaires d'un médecin sous forme d'intervalles fusionnés.
+
+Les plages qui se chevauchent ou se touchent sont réunies ; les intervalles
+obtenus sont triés et disjoints, ce qui permet de savoir par bisection si une
+heure est couverte et d'énumérer les créneaux sans doublon.
+"""
+import re
+from bisect import bisect_right
+
+# Durée d'un créneau de rendez-vous (minutes)
+DUREE_CRENEAU = 30
+
+# Heure de plage bien formée : "HH:MM" ou "H:MM"
+FORMAT_HEURE = re.compile(r"[0-9]{1,2}:[0-9]{2}")
+
+
+def minutes(heure):
+    """Convertir "HH:MM" (ou "H:MM") en minutes depuis minuit"""
+    heures, mins = heure.split(":")
+    return int(heures) * 60 + int(mins)
+
+
+def heure(minutes_depuis_minuit):
+    """Convertir des minutes depuis minuit en "HH:MM" """
+    return f"{minutes_depuis_minuit // 60:02d}:{minutes_depuis_minuit % 60:02d}"
+
+
+def fusionner(plages):
+    """Réunir des plages (debut, fin) en minutes : liste triée d'intervalles disjoints"""
+    fusionnees = []
+    for debut, fin in sorted(plages):
+        if fin <= debut:
+            continue
+        if fusionnees and debut <= fusionnees[-1][1]:
+            fusionnees[-1][1] = max(fusionnees[-1][1], fin)
+        else:
+            fusionnees.append([debut, fin])
+    return [tuple(intervalle) for intervalle in fusionnees]
+
+
+class Intervalles:
+    """Ensemble d'intervalles horaires [debut, fin[ fusionnés et triés"""
+    
+    def __init__(self, plages=()):
+        """plages : couples ("HH:MM", "HH:MM") ; les plages mal formées sont ignorées.
+        
+        Comme la vue masques_plages : une heure hors format ou un début qui ne
+        tombe pas sur une demi-heure rend la plage mal formée.
+        """
+        en_minutes = []
+        for debut, fin in plages:
+            if not all(isinstance(h, str) and FORMAT_HEURE.fullmatch(h) for h in (debut, fin)):
+                continue
+            if minutes(debut) % DUREE_CRENEAU:
+                continue
+            en_minutes.append((minutes(debut), minutes(fin)))
+        intervalles = fusionner(en_minutes)
+        self._debuts = [debut for debut, _ in intervalles]
+        self._fins = [fin for _, fin in intervalles]
+    
+    def __len__(self):
+        return len(self._debuts)
+    
+    def __iter__(self):
+        for debut, fin in zip(self._debuts, self._fins):
+            yield heure(debut), heure(fin)
+    
+    def contient(self, heure_str, duree=0):
+        """L'heure (et les duree minutes qui suivent) est-elle couverte par un intervalle ?"""
+        debut = minutes(heure_str)
+        i = bisect_right(self._debuts, debut) - 1
+        return i >= 0 and debut + duree <= self._fins[i] and debut < self._fins[i]
+    
+    def creneaux(self, pas=DUREE_CRENEAU):
+        """Heures de début des créneaux de chaque intervalle, triées et sans doublon"""
+        heures = []
+        for debut, fin in zip(self._debuts, self._fins):
+            heures.extend(heure(m) for m in range(debut, fin, pas))
+        return heures
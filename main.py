@@ -1,10 +1,18 @@
+import argparse
 import tkinter as tk
 import subprocess
 import sys
+import database
+from patient import EspacePatient
+from medecin import EspaceMedecin
+from admin import EspaceAdministrateur
 
 class SystemeGestionRendezVous:
-    def __init__(self, root):
+    def __init__(self, root, mode_processus=False):
         self.root = root
+        # Par défaut les espaces s'ouvrent dans des fenêtres de ce processus
+        # (connexions et caches partagés) ; sinon un interpréteur par espace
+        self.mode_processus = mode_processus
         self.root.title("Système de gestion des rendez-vous médicaux")
         self.root.geometry("500x400")
         self.root.configure(bg="#2c2c2c")
@@ -12,6 +20,9 @@ class SystemeGestionRendezVous:
         # Centrer la fenêtre
         self.centrer_fenetre()
         
+        # Le bouton de fermeture ferme aussi les connexions partagées
+        self.root.protocol("WM_DELETE_WINDOW", self.quitter_application)
+        
         # Créer l'interface
         self.creer_interface()
     
@@ -85,29 +96,37 @@ class SystemeGestionRendezVous:
         )
         btn_quitter.pack(pady=10)
     
+    def ouvrir_espace(self, classe_espace, script):
+        if self.mode_processus:
+            try:
+                subprocess.Popen([sys.executable, script])
+            except FileNotFoundError:
+                print(f"Fichier {script} non trouvé")
+            return
+        
+        classe_espace(tk.Toplevel(self.root))
+    
     def ouvrir_espace_patient(self):
-        try:
-            subprocess.Popen([sys.executable, "patient.py"])
-        except FileNotFoundError:
-            print("Fichier patient.py non trouvé")
+        self.ouvrir_espace(EspacePatient, "patient.py")
     
     def ouvrir_espace_medecin(self):
-        try:
-            subprocess.Popen([sys.executable, "medecin.py"])
-        except FileNotFoundError:
-            print("Fichier medecin.py non trouvé")
+        self.ouvrir_espace(EspaceMedecin, "medecin.py")
     
     def ouvrir_espace_admin(self):
-        try:
-            subprocess.Popen([sys.executable, "admin.py"])
-        except FileNotFoundError:
-            print("Fichier admin.py non trouvé")
+        self.ouvrir_espace(EspaceAdministrateur, "admin.py")
     
     def quitter_application(self):
+        database.fermer_connexions()
         self.root.quit()
         self.root.destroy()
 
 
-root = tk.Tk()
-app = SystemeGestionRendezVous(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Système de gestion des rendez-vous médicaux")
+    parser.add_argument("--processus", action="store_true",
+                        help="ouvrir chaque espace dans son propre interpréteur Python")
+    args = parser.parse_args()
+    
+    root = tk.Tk()
+    app = SystemeGestionRendezVous(root, mode_processus=args.processus)
+    root.mainloop()
@@ -1,7 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
-from datetime import datetime
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import database
+from dates import date_iso, date_affichage, date_objet
+import booking
+import securite
+from taches import ExecuteurTaches
+from notifications import Surveillant
+from calendrier import ouvrir_calendrier
 
 class EspaceMedecin:
     def __init__(self, root):
@@ -16,6 +23,9 @@ class EspaceMedecin:
         # Initialiser la base de données
         self.init_database()
         
+        # Le bouton de fermeture libère aussi threads et connexions
+        self.root.protocol("WM_DELETE_WINDOW", self.quitter)
+        
         # Médecin connecté
         self.medecin_connecte = None
         
@@ -31,22 +41,12 @@ class EspaceMedecin:
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
     def init_database(self):
-        self.conn = sqlite3.connect('hopital.db')
-        self.cursor = self.conn.cursor()
-        
-        # Créer la table des créneaux si elle n'existe pas
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS creneaux_disponibles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                medecin_id INTEGER,
-                date_creneau TEXT NOT NULL,
-                heure_debut TEXT NOT NULL,
-                heure_fin TEXT NOT NULL,
-                disponible INTEGER DEFAULT 1,
-                FOREIGN KEY (medecin_id) REFERENCES medecins (id)
-            )
-        ''')
-        self.conn.commit()
+        # Connexion du pool partagé (WAL) ; les migrations sont appliquées à sa création
+        self.conn = database.connexion()
+        # Requêtes de consultation exécutées hors du thread Tk
+        self.taches = ExecuteurTaches(self.root)
+        # Modifications faites par les autres processus (agenda et créneaux ouverts)
+        self.surveillant = Surveillant(self.root)
     
     def creer_interface_connexion(self):
         # Nettoyer la fenêtre
@@ -123,12 +123,8 @@ class EspaceMedecin:
             messagebox.showerror("Erreur", "Veuillez remplir tous les champs")
             return
         
-        self.cursor.execute('''
-            SELECT id, nom_complet, specialite FROM medecins 
-            WHERE nom_utilisateur = ? AND mot_de_passe = ?
-        ''', (username, password))
-        
-        medecin = self.cursor.fetchone()
+        medecin = securite.authentifier(self.conn, "medecins", username, password,
+                                        "id, nom_complet, specialite")
         if medecin:
             self.medecin_connecte = {
                 "id": medecin[0], 
@@ -207,105 +203,191 @@ class EspaceMedecin:
         btn_deconnexion.pack(pady=10)
     
     def voir_mes_rendez_vous(self):
-        # Récupérer les rendez-vous du médecin
-        self.cursor.execute('''
-            SELECT rv.date_rdv, rv.heure_rdv, p.nom_complet, p.telephone, p.age, p.adresse, rv.urgent, rv.statut, rv.id
-            FROM rendez_vous rv
-            JOIN patients p ON rv.patient_id = p.id
-            WHERE rv.medecin_id = ?
-            ORDER BY rv.date_rdv, rv.heure_rdv
-        ''', (self.medecin_connecte['id'],))
-        
-        rendez_vous = self.cursor.fetchall()
-        
         # Créer fenêtre d'affichage
         fenetre_rdv = tk.Toplevel(self.root)
         fenetre_rdv.title("Mes rendez-vous")
-        fenetre_rdv.geometry("700x500")
+        fenetre_rdv.geometry("700x550")
         fenetre_rdv.configure(bg="#2c2c2c")
         
         tk.Label(fenetre_rdv, text="Mes rendez-vous programmés", 
                 font=("Arial", 14, "bold"), fg="white", bg="#2c2c2c").pack(pady=10)
         
-        if not rendez_vous:
-            tk.Label(fenetre_rdv, text="Aucun rendez-vous programmé", 
-                    fg="white", bg="#2c2c2c").pack(pady=50)
-        else:
-            # Frame avec scrollbar
-            frame_tree = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-            
-            # Treeview pour afficher les rendez-vous avec informations complètes
-            columns = ("Date", "Heure", "Patient", "Téléphone", "Âge", "Adresse", "Urgent", "Statut")
-            tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=12)
+        # Fenêtre de dates affichée : aujourd'hui et les jours suivants, puis pages plus anciennes ou récentes
+        etat = {"debut": datetime.now().date()}
+        
+        frame_navigation = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_navigation.pack(pady=5)
+        
+        def changer_periode(decalage):
+            etat["debut"] += timedelta(days=decalage * booking.JOURS_AGENDA)
+            charger()
+        
+        def revenir_aujourdhui():
+            etat["debut"] = datetime.now().date()
+            charger()
+        
+        tk.Button(frame_navigation, text="◀ Plus anciens", command=lambda: changer_periode(-1),
+                 bg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        label_periode = tk.Label(frame_navigation, width=28, font=("Arial", 10), fg="white", bg="#2c2c2c")
+        label_periode.pack(side=tk.LEFT, padx=5)
+        tk.Button(frame_navigation, text="Plus récents ▶", command=lambda: changer_periode(1),
+                 bg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        tk.Button(frame_navigation, text="Aujourd'hui", command=revenir_aujourdhui,
+                 bg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        
+        # Frame avec scrollbar
+        frame_tree = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        # Treeview de la période ; l'identifiant de chaque ligne est l'id du rendez-vous
+        columns = ("Date", "Heure", "Patient", "Urgent", "Statut")
+        tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=12)
+        
+        tree.heading("Date", text="Date")
+        tree.column("Date", width=90, anchor="center")
+        tree.heading("Heure", text="Heure")
+        tree.column("Heure", width=70, anchor="center")
+        tree.heading("Patient", text="Patient")
+        tree.column("Patient", width=200, anchor="center")
+        tree.heading("Urgent", text="Urgent")
+        tree.column("Urgent", width=70, anchor="center")
+        tree.heading("Statut", text="Statut")
+        tree.column("Statut", width=90, anchor="center")
+        
+        # Colorer les lignes urgentes
+        tree.tag_configure("urgent", background="lightcoral")
+        tree.tag_configure("normal", background="lightgray")
+        
+        scrollbar = ttk.Scrollbar(frame_tree, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        
+        # Coordonnées du patient sélectionné, lues à la demande
+        label_details = tk.Label(fenetre_rdv, text="Sélectionnez un rendez-vous pour voir les coordonnées du patient",
+                                font=("Arial", 10), fg="lightgray", bg="#2c2c2c")
+        label_details.pack(pady=5)
+        
+        def afficher_details(event=None):
+            selection = tree.selection()
+            if not selection:
+                return
             
-            # Configurer les colonnes avec des largeurs adaptées
-            tree.heading("Date", text="Date")
-            tree.column("Date", width=80, anchor="center")
-            tree.heading("Heure", text="Heure")
-            tree.column("Heure", width=60, anchor="center")
-            tree.heading("Patient", text="Patient")
-            tree.column("Patient", width=120, anchor="center")
-            tree.heading("Téléphone", text="Téléphone")
-            tree.column("Téléphone", width=100, anchor="center")
-            tree.heading("Âge", text="Âge")
-            tree.column("Âge", width=40, anchor="center")
-            tree.heading("Adresse", text="Adresse")
-            tree.column("Adresse", width=150, anchor="w")
-            tree.heading("Urgent", text="Urgent")
-            tree.column("Urgent", width=60, anchor="center")
-            tree.heading("Statut", text="Statut")
-            tree.column("Statut", width=80, anchor="center")
+            def remplir(coordonnees):
+                if coordonnees is None:
+                    label_details.config(text="Patient introuvable")
+                    return
+                telephone, age, adresse = (valeur if valeur else "N/A" for valeur in coordonnees)
+                label_details.config(text=f"Téléphone: {telephone} | Âge: {age} | Adresse: {adresse}")
             
-            # Colorer les lignes urgentes
-            tree.tag_configure("urgent", background="lightcoral")
-            tree.tag_configure("normal", background="lightgray")
+            label_details.config(text="Chargement des coordonnées...")
+            self.taches.soumettre(booking.coordonnees_patient_rdv, int(selection[0]),
+                                  cle=(str(fenetre_rdv), "details"), succes=remplir)
+        
+        tree.bind("<<TreeviewSelect>>", afficher_details)
+        
+        # Clé de tri (date, heure, id) de chaque ligne affichée, pour insérer les nouvelles à leur place
+        cles_tri = {}
+        
+        def placer_ligne(rdv_id, date_rdv, heure_rdv, patient, urgent, statut, position=tk.END):
+            iid = str(rdv_id)
+            urgent_text = "OUI" if urgent else "NON"
+            tag = "urgent" if urgent else "normal"
+            valeurs = (date_affichage(date_rdv), heure_rdv, patient, urgent_text, statut)
+            if tree.exists(iid):
+                tree.item(iid, values=valeurs, tags=(tag,))
+                tree.move(iid, "", position)
+            else:
+                tree.insert("", position, iid=iid, values=valeurs, tags=(tag,))
+            cles_tri[iid] = (date_rdv, heure_rdv, rdv_id)
+        
+        def afficher(rendez_vous):
+            tree.delete(*tree.get_children())
+            cles_tri.clear()
+            label_details.config(text="Sélectionnez un rendez-vous pour voir les coordonnées du patient")
             
             for rdv in rendez_vous:
-                urgent_text = "OUI" if rdv[6] else "NON"
-                tag = "urgent" if rdv[6] else "normal"
-                telephone = rdv[3] if rdv[3] else "N/A"
-                age = rdv[4] if rdv[4] else "N/A"
-                adresse = rdv[5] if rdv[5] else "N/A"
-                tree.insert("", tk.END, values=(rdv[0], rdv[1], rdv[2], telephone, age, adresse, urgent_text, rdv[7]), 
-                           tags=(tag,))
-            
-            tree.pack(fill=tk.BOTH, expand=True)
+                placer_ligne(*rdv)
             
-            # Frame pour les boutons d'action
-            frame_actions = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_actions.pack(pady=10)
+            if not rendez_vous:
+                label_details.config(text="Aucun rendez-vous sur cette période")
+        
+        def appliquer_modifications(rdv_ids, lignes):
+            """Reporter les rendez-vous relus ; ceux qui ont quitté la période ou l'agenda sont retirés"""
+            debut = etat["debut"].isoformat()
+            fin = (etat["debut"] + timedelta(days=booking.JOURS_AGENDA - 1)).isoformat()
+            dans_periode = {ligne[0]: ligne for ligne in lignes if debut <= ligne[1] <= fin}
             
-            def annuler_rdv():
-                selection = tree.selection()
-                if not selection:
-                    messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
-                    return
-                
-                # Récupérer l'ID du rendez-vous sélectionné
-                item = tree.item(selection[0])
-                values = item['values']
+            for rdv_id in rdv_ids:
+                iid = str(rdv_id)
+                if rdv_id not in dans_periode:
+                    if tree.exists(iid):
+                        tree.delete(iid)
+                        cles_tri.pop(iid, None)
+                    continue
                 
-                # Trouver le rendez-vous correspondant (mise à jour des indices)
-                for rdv in rendez_vous:
-                    if rdv[0] == values[0] and rdv[1] == values[1] and rdv[2] == values[2]:
-                        if messagebox.askyesno("Confirmation", "Annuler ce rendez-vous ?"):
-                            self.cursor.execute("UPDATE rendez_vous SET statut = 'annulé' WHERE id = ?", (rdv[8],))
-                            self.conn.commit()
-                            messagebox.showinfo("Succès", "Rendez-vous annulé")
-                            fenetre_rdv.destroy()
-                            self.voir_mes_rendez_vous()
-                        break
+                ligne = dans_periode[rdv_id]
+                autres = [cles_tri[enfant] for enfant in tree.get_children() if enfant != iid]
+                placer_ligne(*ligne, position=bisect_left(autres, (ligne[1], ligne[2], rdv_id)))
+        
+        def sur_modifications(modifications):
+            """Rendez-vous de ce médecin modifiés par d'autres connexions : seules leurs lignes sont relues"""
+            if modifications is None:
+                charger()
+                return
+            
+            rdv_ids = {ligne_id for _table, ligne_id, _medecin, _date in modifications}
+            self.taches.soumettre(booking.lignes_agenda_medecin, self.medecin_connecte['id'], rdv_ids,
+                                  succes=lambda lignes: appliquer_modifications(rdv_ids, lignes))
+        
+        self.surveillant.abonner(fenetre_rdv, sur_modifications, medecin_id=self.medecin_connecte['id'],
+                                 tables=("rendez_vous",))
+        
+        def charger():
+            debut = etat["debut"]
+            fin = debut + timedelta(days=booking.JOURS_AGENDA - 1)
+            label_periode.config(text=f"Du {date_affichage(debut.isoformat())} au {date_affichage(fin.isoformat())}")
+            # Une navigation plus récente remplace la demande en cours
+            self.taches.soumettre(booking.agenda_medecin, self.medecin_connecte['id'],
+                                  debut.isoformat(), fin.isoformat(),
+                                  cle=(str(fenetre_rdv), "agenda"), succes=afficher)
+        
+        # Frame pour les boutons d'action
+        frame_actions = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_actions.pack(pady=10)
+        
+        def annuler_rdv():
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
+                return
             
-            btn_annuler = tk.Button(frame_actions, text="Annuler RDV sélectionné", 
-                                   command=annuler_rdv, bg="lightcoral", font=("Arial", 10))
-            btn_annuler.pack(side=tk.LEFT, padx=10)
+            # L'identifiant de la ligne est celui du rendez-vous
+            rdv_id = int(selection[0])
+            if messagebox.askyesno("Confirmation", "Annuler ce rendez-vous ?"):
+                annule, resultat = booking.annuler_rendez_vous(self.conn, rdv_id)
+                if not annule:
+                    messagebox.showwarning("Attention", resultat)
+                    return
+                # Seule la ligne modifiée est mise à jour (rechargement complet : Actualiser)
+                tree.set(selection[0], "Statut", resultat[6])
+                messagebox.showinfo("Succès", "Rendez-vous annulé")
+        
+        btn_annuler = tk.Button(frame_actions, text="Annuler RDV sélectionné", 
+                               command=annuler_rdv, bg="lightcoral", font=("Arial", 10))
+        btn_annuler.pack(side=tk.LEFT, padx=10)
+        
+        btn_actualiser = tk.Button(frame_actions, text="Actualiser", 
+                                  command=charger, bg="lightblue", font=("Arial", 10))
+        btn_actualiser.pack(side=tk.LEFT, padx=10)
+        
+        charger()
     
     def gerer_creneaux(self):
         # Fenêtre de gestion des créneaux
         fenetre_creneaux = tk.Toplevel(self.root)
         fenetre_creneaux.title("Gérer mes créneaux")
-        fenetre_creneaux.geometry("600x600")
+        fenetre_creneaux.geometry("600x750")
         fenetre_creneaux.configure(bg="#2c2c2c")
         
         tk.Label(fenetre_creneaux, text="Gestion des créneaux disponibles", 
@@ -416,7 +498,7 @@ class EspaceMedecin:
         
         # Combobox pour l'heure de début
         combo_heure_debut = ttk.Combobox(frame_creneaux, width=8, state="readonly")
-        tous_creneaux = self.generer_tous_creneaux_possibles()
+        tous_creneaux = booking.generer_heures_disponibles()
         combo_heure_debut['values'] = tous_creneaux
         if tous_creneaux:
             combo_heure_debut.set(tous_creneaux[0])
@@ -439,7 +521,7 @@ class EspaceMedecin:
                 annee = combo_annee.get()
                 
                 if jour and mois and annee:
-                    date_str = f"{int(jour):02d}/{int(mois):02d}/{annee}"
+                    date_str = date_iso(jour, mois, annee)
                     afficher_creneaux_jour(date_str)
                     
             except (ValueError, IndexError):
@@ -450,6 +532,23 @@ class EspaceMedecin:
         combo_mois.bind('<<ComboboxSelected>>', mettre_a_jour_affichage)
         combo_annee.bind('<<ComboboxSelected>>', mettre_a_jour_affichage)
         
+        # Vue du mois : créneaux libres par jour, un clic sélectionne le jour
+        def voir_calendrier():
+            def choisir_jour(date_str):
+                date_obj = date_objet(date_str)
+                combo_annee.set(date_obj.year)
+                mettre_a_jour_mois()
+                combo_mois.set(date_obj.month)
+                mettre_a_jour_jours()
+                combo_jour.set(date_obj.day)
+                mettre_a_jour_affichage()
+            
+            ouvrir_calendrier(fenetre_creneaux, self.taches, self.medecin_connecte['id'], self.medecin_connecte['nom'],
+                              combo_annee.get(), combo_mois.get(), choisir_jour)
+        
+        tk.Button(frame_date, text="📅 Mois", command=voir_calendrier,
+                 bg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=10)
+        
         # Frame pour les actions
         frame_actions = tk.Frame(fenetre_creneaux, bg="#2c2c2c")
         frame_actions.pack(pady=10)
@@ -465,62 +564,18 @@ class EspaceMedecin:
                 messagebox.showerror("Erreur", "Veuillez sélectionner une date, une heure de début et une heure de fin")
                 return
             
-            # Vérifier que l'heure de fin est après l'heure de début
-            try:
-                debut = datetime.strptime(heure_debut, "%H:%M")
-                fin = datetime.strptime(heure_fin, "%H:%M")
-                
-                if fin <= debut:
-                    messagebox.showerror("Erreur", "L'heure de fin doit être après l'heure de début")
-                    return
-                    
-            except ValueError:
-                messagebox.showerror("Erreur", "Format d'heure invalide")
-                return
-            
-            date_str = f"{int(jour):02d}/{int(mois):02d}/{annee}"
+            date_str = date_iso(jour, mois, annee)
             
-            # Vérifier que la date n'est pas dans le passé
             try:
-                date_creneau = datetime(int(annee), int(mois), int(jour)).date()
-                date_aujourd_hui = datetime.now().date()
-                
-                if date_creneau < date_aujourd_hui:
-                    messagebox.showerror("Erreur", "Impossible de créer un créneau dans le passé")
+                # Validation (ordre des heures, date future) et doublons gérés par le service
+                ajoute, resultat = booking.ajouter_creneau(
+                    self.conn, self.medecin_connecte['id'], date_str, heure_debut, heure_fin
+                )
+                if not ajoute:
+                    messagebox.showerror("Erreur", resultat)
                     return
                 
-                # Si c'est aujourd'hui, vérifier que l'heure de début est dans le futur
-                if date_creneau == date_aujourd_hui:
-                    maintenant = datetime.now()
-                    datetime_debut = datetime.combine(date_creneau, debut.time())
-                    
-                    if datetime_debut <= maintenant:
-                        messagebox.showerror("Erreur", "L'heure de début doit être dans le futur pour aujourd'hui")
-                        return
-                    
-            except ValueError:
-                messagebox.showerror("Erreur", "Date invalide")
-                return
-            
-            try:
-                # Vérifier si le créneau existe déjà
-                self.cursor.execute('''
-                    SELECT id FROM creneaux_disponibles
-                    WHERE medecin_id = ? AND date_creneau = ? AND heure_debut = ? AND heure_fin = ?
-                ''', (self.medecin_connecte['id'], date_str, heure_debut, heure_fin))
-                
-                if self.cursor.fetchone():
-                    messagebox.showwarning("Attention", "Ce créneau existe déjà")
-                    return
-                
-                # Ajouter le créneau
-                self.cursor.execute('''
-                    INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
-                    VALUES (?, ?, ?, ?)
-                ''', (self.medecin_connecte['id'], date_str, heure_debut, heure_fin))
-                self.conn.commit()
-                
-                messagebox.showinfo("Succès", f"Créneau {heure_debut}-{heure_fin} ajouté pour le {date_str}")
+                messagebox.showinfo("Succès", f"Créneau {heure_debut}-{heure_fin} ajouté pour le {date_affichage(date_str)}")
                 afficher_creneaux_jour(date_str)
                 
             except Exception as e:
@@ -536,13 +591,72 @@ class EspaceMedecin:
             annee = combo_annee.get()
             
             if jour and mois and annee:
-                date_str = f"{int(jour):02d}/{int(mois):02d}/{annee}"
+                date_str = date_iso(jour, mois, annee)
                 afficher_creneaux_jour(date_str)
         
         btn_actualiser = tk.Button(frame_actions, text="Actualiser", command=actualiser,
                                   bg="lightblue", font=("Arial", 12), width=15)
         btn_actualiser.pack(side=tk.LEFT, padx=10)
         
+        # Plages récurrentes : mêmes heures chaque semaine à partir de la date sélectionnée
+        frame_recurrence = tk.LabelFrame(fenetre_creneaux, text="Créneaux récurrents", fg="white",
+                                         bg="#2c2c2c", font=("Arial", 10, "bold"))
+        frame_recurrence.pack(pady=5, padx=20, fill=tk.X)
+        
+        frame_jours_semaine = tk.Frame(frame_recurrence, bg="#2c2c2c")
+        frame_jours_semaine.pack(pady=5)
+        
+        jours_coches = []
+        for nom_jour in ("Lu", "Ma", "Me", "Je", "Ve", "Sa", "Di"):
+            variable = tk.BooleanVar()
+            tk.Checkbutton(frame_jours_semaine, text=nom_jour, variable=variable, fg="white", bg="#2c2c2c",
+                           selectcolor="#2c2c2c", activebackground="#2c2c2c").pack(side=tk.LEFT, padx=3)
+            jours_coches.append(variable)
+        
+        frame_duree = tk.Frame(frame_recurrence, bg="#2c2c2c")
+        frame_duree.pack(pady=5)
+        
+        tk.Label(frame_duree, text="Pendant", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=5)
+        combo_semaines = ttk.Combobox(frame_duree, width=4, state="readonly", values=tuple(range(1, 27)))
+        combo_semaines.set(4)
+        combo_semaines.pack(side=tk.LEFT)
+        tk.Label(frame_duree, text="semaine(s)", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=5)
+        
+        def ajouter_creneaux_recurrents():
+            jour = combo_jour.get()
+            mois = combo_mois.get()
+            annee = combo_annee.get()
+            heure_debut = combo_heure_debut.get()
+            heure_fin = combo_heure_fin.get()
+            jours_semaine = [i for i, variable in enumerate(jours_coches) if variable.get()]
+            
+            if not all([jour, mois, annee, heure_debut, heure_fin]):
+                messagebox.showerror("Erreur", "Veuillez sélectionner une date, une heure de début et une heure de fin")
+                return
+            
+            date_str = date_iso(jour, mois, annee)
+            date_fin = date_objet(date_str) + timedelta(weeks=int(combo_semaines.get()), days=-1)
+            
+            try:
+                # Toutes les plages sont créées en une transaction, les doublons sont ignorés
+                ajoute, resultat = booking.creneaux_recurrents(
+                    self.conn, self.medecin_connecte['id'], jours_semaine, heure_debut, heure_fin,
+                    date_str, date_fin.isoformat()
+                )
+                if not ajoute:
+                    messagebox.showerror("Erreur", resultat)
+                    return
+                
+                messagebox.showinfo("Succès", f"{resultat} créneau(x) {heure_debut}-{heure_fin} ajouté(s) "
+                                              f"du {date_affichage(date_str)} au {date_affichage(date_fin.isoformat())}")
+                afficher_creneaux_jour(date_str)
+            
+            except Exception as e:
+                messagebox.showerror("Erreur", f"Erreur: {str(e)}")
+        
+        tk.Button(frame_duree, text="Générer", command=ajouter_creneaux_recurrents,
+                  bg="lightgreen", font=("Arial", 10), width=10).pack(side=tk.LEFT, padx=10)
+        
         # Liste des créneaux existants pour le jour sélectionné
         frame_liste = tk.Frame(fenetre_creneaux, bg="#2c2c2c")
         frame_liste.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -576,7 +690,7 @@ class EspaceMedecin:
             if not all([jour, mois, annee]):
                 return
             
-            date_str = f"{int(jour):02d}/{int(mois):02d}/{annee}"
+            date_str = date_iso(jour, mois, annee)
             
             item = tree.item(selection[0])
             creneau_complet = item['values'][0]  # Format "08:00 - 08:30"
@@ -591,11 +705,7 @@ class EspaceMedecin:
                 return
             
             if messagebox.askyesno("Confirmation", f"Supprimer le créneau {creneau_complet} ?"):
-                self.cursor.execute('''
-                    DELETE FROM creneaux_disponibles
-                    WHERE medecin_id = ? AND date_creneau = ? AND heure_debut = ? AND heure_fin = ?
-                ''', (self.medecin_connecte['id'], date_str, heure_debut, heure_fin))
-                self.conn.commit()
+                booking.supprimer_creneau(self.conn, self.medecin_connecte['id'], date_str, heure_debut, heure_fin)
                 messagebox.showinfo("Succès", "Créneau supprimé")
                 afficher_creneaux_jour(date_str)
         
@@ -603,62 +713,44 @@ class EspaceMedecin:
                                  bg="lightcoral", font=("Arial", 10))
         btn_supprimer.pack(side=tk.LEFT, padx=5)
         
+        # Jour dont les plages sont affichées
+        jour_affiche = {"date": None}
+        
         def afficher_creneaux_jour(date_str):
-            # Vider la liste
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            # Récupérer les créneaux du jour
-            self.cursor.execute('''
-                SELECT heure_debut, heure_fin, disponible
-                FROM creneaux_disponibles
-                WHERE medecin_id = ? AND date_creneau = ?
-                ORDER BY heure_debut
-            ''', (self.medecin_connecte['id'], date_str))
-            
-            creneaux = self.cursor.fetchall()
+            jour_affiche["date"] = date_str
             
-            for creneau in creneaux:
-                heure_affichage = f"{creneau[0]} - {creneau[1]}"
-                # Tous les créneaux créés sont disponibles par défaut
-                tree.insert("", tk.END, values=(heure_affichage,), tags=("creneau",))
+            def remplir(creneaux):
+                # Vider la liste
+                for item in tree.get_children():
+                    tree.delete(item)
+                
+                for creneau in creneaux:
+                    heure_affichage = f"{creneau[0]} - {creneau[1]}"
+                    # Tous les créneaux créés sont disponibles par défaut
+                    tree.insert("", tk.END, values=(heure_affichage,), tags=("creneau",))
+                
+                # Configurer la couleur des créneaux
+                tree.tag_configure("creneau", background="lightgreen")
             
-            # Configurer la couleur des créneaux
-            tree.tag_configure("creneau", background="lightgreen")
+            # Récupérer les créneaux du jour en arrière-plan (seul le dernier jour demandé est affiché)
+            self.taches.soumettre(booking.lister_plages_medecin, self.medecin_connecte['id'], date_str,
+                                  cle=(str(fenetre_creneaux), "plages"), succes=remplir)
+        
+        # Plages modifiées ailleurs (autre session, import) : seul le jour affiché est relu s'il est concerné
+        def sur_modifications(modifications):
+            if modifications is None or any(date == jour_affiche["date"] for *_autres, date in modifications):
+                afficher_creneaux_jour(jour_affiche["date"])
+        
+        self.surveillant.abonner(fenetre_creneaux, sur_modifications, medecin_id=self.medecin_connecte['id'],
+                                 tables=("creneaux_disponibles",))
         
         # Affichage initial
-        date_initiale = f"{aujourd_hui.day:02d}/{aujourd_hui.month:02d}/{aujourd_hui.year}"
+        date_initiale = date_iso(aujourd_hui.day, aujourd_hui.month, aujourd_hui.year)
         afficher_creneaux_jour(date_initiale)
     
-    def generer_tous_creneaux_possibles(self):
-        """Générer tous les créneaux possibles (8h-16h30, créneaux 30min)"""
-        heures_possibles = []
-        
-        # Matin : 8h00 à 11h30
-        for heure in range(8, 12):
-            for minute in [0, 30]:
-                heures_possibles.append(f"{heure:02d}:{minute:02d}")
-        
-        # Après-midi : 13h00 à 16h30
-        for heure in range(13, 17):
-            for minute in [0, 30]:
-                if heure == 16 and minute > 30:
-                    break
-                heures_possibles.append(f"{heure:02d}:{minute:02d}")
-        
-        return heures_possibles
-    
     def voir_rdv_urgents(self):
         # Récupérer uniquement les rendez-vous urgents
-        self.cursor.execute('''
-            SELECT rv.date_rdv, rv.heure_rdv, p.nom_complet, rv.statut
-            FROM rendez_vous rv
-            JOIN patients p ON rv.patient_id = p.id
-            WHERE rv.medecin_id = ? AND rv.urgent = 1
-            ORDER BY rv.date_rdv, rv.heure_rdv
-        ''', (self.medecin_connecte['id'],))
-        
-        rdv_urgents = self.cursor.fetchall()
+        rdv_urgents = booking.rendez_vous_urgents_medecin(self.conn, self.medecin_connecte['id'])
         
         # Fenêtre d'affichage
         fenetre_urgents = tk.Toplevel(self.root)
@@ -685,7 +777,7 @@ class EspaceMedecin:
             tree.tag_configure("urgent", background="lightcoral", foreground="darkred")
             
             for rdv in rdv_urgents:
-                tree.insert("", tk.END, values=rdv, tags=("urgent",))
+                tree.insert("", tk.END, values=(date_affichage(rdv[0]), rdv[1], rdv[2], rdv[3]), tags=("urgent",))
             
             tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
             
@@ -698,10 +790,21 @@ class EspaceMedecin:
         self.creer_interface_connexion()
     
     def quitter(self):
-        self.conn.close()
+        self.taches.fermer()
+        self.surveillant.fermer()
+        
+        # Espace ouvert dans une fenêtre de main.py : seule cette fenêtre est fermée,
+        # les connexions partagées restent ouvertes pour les autres espaces
+        if not isinstance(self.root, tk.Tk):
+            self.root.destroy()
+            return
+        
+        database.fermer_connexions()
         self.root.quit()
         self.root.destroy()
 
-root = tk.Tk()
-app = EspaceMedecin(root)
-root.mainloop()
\ No newline at end of file
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = EspaceMedecin(root)
+    root.mainloop()
@@ -0,0 +1,579 @@
+import sqlite3
+
+# Migrations du schéma de hopital.db, appliquées dans l'ordre.
+# Chaque entrée : (version, description, liste d'instructions SQL)
+# La version courante est conservée dans PRAGMA user_version.
+MIGRATIONS = [
+    (1, "Tables de base", [
+        '''
+            CREATE TABLE IF NOT EXISTS admin (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nom_utilisateur TEXT UNIQUE NOT NULL,
+                mot_de_passe TEXT NOT NULL
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS patients (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nom_complet TEXT NOT NULL,
+                nom_utilisateur TEXT UNIQUE NOT NULL,
+                mot_de_passe TEXT NOT NULL,
+                telephone TEXT,
+                age INTEGER,
+                adresse TEXT
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS medecins (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nom_complet TEXT NOT NULL,
+                specialite TEXT NOT NULL,
+                nom_utilisateur TEXT UNIQUE NOT NULL,
+                mot_de_passe TEXT NOT NULL
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS rendez_vous (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                patient_id INTEGER,
+                medecin_id INTEGER,
+                date_rdv TEXT NOT NULL,
+                heure_rdv TEXT NOT NULL,
+                urgent INTEGER DEFAULT 0,
+                statut TEXT DEFAULT 'confirmé',
+                FOREIGN KEY (patient_id) REFERENCES patients (id),
+                FOREIGN KEY (medecin_id) REFERENCES medecins (id)
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS creneaux_disponibles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                medecin_id INTEGER,
+                date_creneau TEXT NOT NULL,
+                heure_debut TEXT NOT NULL,
+                heure_fin TEXT NOT NULL,
+                disponible INTEGER DEFAULT 1,
+                FOREIGN KEY (medecin_id) REFERENCES medecins (id)
+            )
+        ''',
+    ]),
+    (2, "Index composites des agendas", [
+        # Créneaux occupés d'un médecin pour un jour (obtenir_creneaux_occupes)
+        '''
+            CREATE INDEX IF NOT EXISTS idx_rdv_medecin_date
+            ON rendez_vous (medecin_id, date_rdv, heure_rdv, statut)
+        ''',
+        # Rendez-vous d'un patient (voir_mes_rendez_vous)
+        '''
+            CREATE INDEX IF NOT EXISTS idx_rdv_patient_date
+            ON rendez_vous (patient_id, date_rdv)
+        ''',
+        # Plages définies par un médecin pour un jour (obtenir_creneaux_definis_medecin)
+        '''
+            CREATE INDEX IF NOT EXISTS idx_creneaux_medecin_date
+            ON creneaux_disponibles (medecin_id, date_creneau, disponible)
+        ''',
+    ]),
+    (3, "Dates au format ISO AAAA-MM-JJ", [
+        # Conversion unique des dates JJ/MM/AAAA existantes
+        '''
+            UPDATE rendez_vous
+            SET date_rdv = substr(date_rdv, 7, 4) || '-' || substr(date_rdv, 4, 2) || '-' || substr(date_rdv, 1, 2)
+            WHERE date_rdv GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+        ''',
+        '''
+            UPDATE creneaux_disponibles
+            SET date_creneau = substr(date_creneau, 7, 4) || '-' || substr(date_creneau, 4, 2) || '-' || substr(date_creneau, 1, 2)
+            WHERE date_creneau GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+        ''',
+        # Parcours par plage de dates tous médecins confondus (vue administrateur)
+        '''
+            CREATE INDEX IF NOT EXISTS idx_rdv_date
+            ON rendez_vous (date_rdv, heure_rdv)
+        ''',
+    ]),
+    (4, "Unicité des créneaux actifs", [
+        # Doublons existants : garder le plus ancien, annuler les autres
+        '''
+            UPDATE rendez_vous SET statut = 'annulé'
+            WHERE statut != 'annulé' AND id NOT IN (
+                SELECT MIN(id) FROM rendez_vous
+                WHERE statut != 'annulé'
+                GROUP BY medecin_id, date_rdv, heure_rdv
+            )
+        ''',
+        # Un seul rendez-vous actif par médecin, date et heure
+        '''
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_rdv_actif
+            ON rendez_vous (medecin_id, date_rdv, heure_rdv)
+            WHERE statut != 'annulé'
+        ''',
+    ]),
+    (5, "Masques de disponibilité par médecin et par jour", [
+        # Grille fixe des 16 créneaux de 30 min (booking.generer_heures_disponibles) : bit k = k-ième créneau
+        '''
+            CREATE TABLE IF NOT EXISTS grille_creneaux (
+                bit INTEGER PRIMARY KEY,
+                heure TEXT UNIQUE NOT NULL
+            )
+        ''',
+        '''
+            INSERT OR IGNORE INTO grille_creneaux (bit, heure) VALUES
+                (0, '08:00'), (1, '08:30'), (2, '09:00'), (3, '09:30'),
+                (4, '10:00'), (5, '10:30'), (6, '11:00'), (7, '11:30'),
+                (8, '13:00'), (9, '13:30'), (10, '14:00'), (11, '14:30'),
+                (12, '15:00'), (13, '15:30'), (14, '16:00'), (15, '16:30')
+        ''',
+        # masque_defini : créneaux ouverts par les plages du médecin (NULL : aucune plage, grille complète)
+        # masque_occupe : créneaux pris par un rendez-vous actif
+        '''
+            CREATE TABLE IF NOT EXISTS disponibilite_jour (
+                medecin_id INTEGER NOT NULL,
+                date_jour TEXT NOT NULL,
+                masque_defini INTEGER,
+                masque_occupe INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (medecin_id, date_jour)
+            ) WITHOUT ROWID
+        ''',
+        # Créneaux de la grille couverts par les plages d'un jour (heures « H:MM » complétées,
+        # plages mal formées ou non alignées sur la demi-heure ignorées)
+        '''
+            CREATE VIEW IF NOT EXISTS masques_plages AS
+            SELECT p.medecin_id, p.date_jour, COALESCE(SUM(DISTINCT 1 << g.bit), 0) AS masque
+            FROM (
+                SELECT medecin_id, date_creneau AS date_jour,
+                       CASE WHEN heure_debut GLOB '[0-9]:*' THEN '0' || heure_debut ELSE heure_debut END AS debut,
+                       CASE WHEN heure_fin GLOB '[0-9]:*' THEN '0' || heure_fin ELSE heure_fin END AS fin
+                FROM creneaux_disponibles
+                WHERE disponible = 1
+            ) p
+            LEFT JOIN grille_creneaux g
+                ON p.debut GLOB '[0-9][0-9]:[03]0' AND p.fin GLOB '[0-9][0-9]:[0-9][0-9]'
+                AND g.heure >= p.debut AND g.heure < p.fin
+            GROUP BY p.medecin_id, p.date_jour
+        ''',
+        # Remplissage initial
+        '''
+            INSERT OR REPLACE INTO disponibilite_jour (medecin_id, date_jour, masque_defini)
+            SELECT medecin_id, date_jour, masque FROM masques_plages WHERE medecin_id IS NOT NULL
+        ''',
+        '''
+            INSERT INTO disponibilite_jour (medecin_id, date_jour, masque_occupe)
+            SELECT r.medecin_id, r.date_rdv, SUM(DISTINCT 1 << g.bit)
+            FROM rendez_vous r JOIN grille_creneaux g ON g.heure = r.heure_rdv
+            WHERE r.statut != 'annulé' AND r.medecin_id IS NOT NULL
+            GROUP BY r.medecin_id, r.date_rdv
+            ON CONFLICT (medecin_id, date_jour) DO UPDATE SET masque_occupe = excluded.masque_occupe
+        ''',
+        # Mise à jour incrémentale : un bit par rendez-vous actif (unicité garantie par ux_rdv_actif)
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_dispo_rdv_ajout AFTER INSERT ON rendez_vous
+            WHEN NEW.statut != 'annulé' AND NEW.medecin_id IS NOT NULL
+            BEGIN
+                INSERT INTO disponibilite_jour (medecin_id, date_jour, masque_occupe)
+                SELECT NEW.medecin_id, NEW.date_rdv, 1 << bit FROM grille_creneaux WHERE heure = NEW.heure_rdv
+                ON CONFLICT (medecin_id, date_jour) DO UPDATE SET masque_occupe = masque_occupe | excluded.masque_occupe;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_dispo_rdv_modif
+            AFTER UPDATE OF medecin_id, date_rdv, heure_rdv, statut ON rendez_vous
+            BEGIN
+                UPDATE disponibilite_jour
+                SET masque_occupe = masque_occupe & ~(SELECT 1 << bit FROM grille_creneaux WHERE heure = OLD.heure_rdv)
+                WHERE medecin_id = OLD.medecin_id AND date_jour = OLD.date_rdv AND OLD.statut != 'annulé'
+                  AND OLD.heure_rdv IN (SELECT heure FROM grille_creneaux);
+                INSERT INTO disponibilite_jour (medecin_id, date_jour, masque_occupe)
+                SELECT NEW.medecin_id, NEW.date_rdv, 1 << bit FROM grille_creneaux
+                WHERE heure = NEW.heure_rdv AND NEW.statut != 'annulé' AND NEW.medecin_id IS NOT NULL
+                ON CONFLICT (medecin_id, date_jour) DO UPDATE SET masque_occupe = masque_occupe | excluded.masque_occupe;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_dispo_rdv_suppr AFTER DELETE ON rendez_vous
+            WHEN OLD.statut != 'annulé'
+            BEGIN
+                UPDATE disponibilite_jour
+                SET masque_occupe = masque_occupe & ~(SELECT 1 << bit FROM grille_creneaux WHERE heure = OLD.heure_rdv)
+                WHERE medecin_id = OLD.medecin_id AND date_jour = OLD.date_rdv
+                  AND OLD.heure_rdv IN (SELECT heure FROM grille_creneaux);
+            END
+        ''',
+        # Plages : le masque du jour est recalculé (plages qui se chevauchent)
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_dispo_plage_ajout AFTER INSERT ON creneaux_disponibles
+            WHEN NEW.medecin_id IS NOT NULL
+            BEGIN
+                INSERT INTO disponibilite_jour (medecin_id, date_jour, masque_defini)
+                VALUES (NEW.medecin_id, NEW.date_creneau, (
+                    SELECT masque FROM masques_plages WHERE medecin_id = NEW.medecin_id AND date_jour = NEW.date_creneau
+                ))
+                ON CONFLICT (medecin_id, date_jour) DO UPDATE SET masque_defini = excluded.masque_defini;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_dispo_plage_modif AFTER UPDATE ON creneaux_disponibles
+            BEGIN
+                UPDATE disponibilite_jour SET masque_defini = (
+                    SELECT masque FROM masques_plages WHERE medecin_id = OLD.medecin_id AND date_jour = OLD.date_creneau
+                )
+                WHERE medecin_id = OLD.medecin_id AND date_jour = OLD.date_creneau;
+                INSERT INTO disponibilite_jour (medecin_id, date_jour, masque_defini)
+                SELECT NEW.medecin_id, NEW.date_creneau, (
+                    SELECT masque FROM masques_plages WHERE medecin_id = NEW.medecin_id AND date_jour = NEW.date_creneau
+                )
+                WHERE NEW.medecin_id IS NOT NULL
+                ON CONFLICT (medecin_id, date_jour) DO UPDATE SET masque_defini = excluded.masque_defini;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_dispo_plage_suppr AFTER DELETE ON creneaux_disponibles
+            BEGIN
+                UPDATE disponibilite_jour SET masque_defini = (
+                    SELECT masque FROM masques_plages WHERE medecin_id = OLD.medecin_id AND date_jour = OLD.date_creneau
+                )
+                WHERE medecin_id = OLD.medecin_id AND date_jour = OLD.date_creneau;
+            END
+        ''',
+    ]),
+    (6, "Résumé quotidien des rendez-vous", [
+        # Nombre de rendez-vous par médecin, jour, statut et urgence (statistiques administrateur)
+        '''
+            CREATE TABLE IF NOT EXISTS resume_quotidien (
+                date_rdv TEXT NOT NULL,
+                medecin_id INTEGER NOT NULL,
+                statut TEXT NOT NULL,
+                urgent INTEGER NOT NULL,
+                nb INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (date_rdv, medecin_id, statut, urgent)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_resume_medecin_date
+            ON resume_quotidien (medecin_id, date_rdv)
+        ''',
+        # Remplissage initial
+        '''
+            INSERT OR REPLACE INTO resume_quotidien (date_rdv, medecin_id, statut, urgent, nb)
+            SELECT date_rdv, COALESCE(medecin_id, 0), COALESCE(statut, ''), COALESCE(urgent, 0), COUNT(*)
+            FROM rendez_vous
+            GROUP BY 1, 2, 3, 4
+        ''',
+        # Mise à jour incrémentale : +1 sur la nouvelle clé, -1 sur l'ancienne
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_rdv_ajout AFTER INSERT ON rendez_vous
+            BEGIN
+                INSERT INTO resume_quotidien (date_rdv, medecin_id, statut, urgent, nb)
+                VALUES (NEW.date_rdv, COALESCE(NEW.medecin_id, 0), COALESCE(NEW.statut, ''), COALESCE(NEW.urgent, 0), 1)
+                ON CONFLICT (date_rdv, medecin_id, statut, urgent) DO UPDATE SET nb = nb + 1;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_rdv_modif
+            AFTER UPDATE OF date_rdv, medecin_id, statut, urgent ON rendez_vous
+            BEGIN
+                UPDATE resume_quotidien SET nb = nb - 1
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0);
+                INSERT INTO resume_quotidien (date_rdv, medecin_id, statut, urgent, nb)
+                VALUES (NEW.date_rdv, COALESCE(NEW.medecin_id, 0), COALESCE(NEW.statut, ''), COALESCE(NEW.urgent, 0), 1)
+                ON CONFLICT (date_rdv, medecin_id, statut, urgent) DO UPDATE SET nb = nb + 1;
+                DELETE FROM resume_quotidien
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0) AND nb = 0;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_rdv_suppr AFTER DELETE ON rendez_vous
+            BEGIN
+                UPDATE resume_quotidien SET nb = nb - 1
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0);
+                DELETE FROM resume_quotidien
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0) AND nb = 0;
+            END
+        ''',
+    ]),
+    (7, "Plages des médecins fusionnées", [
+        # Heures « H:MM » complétées pour que l'ordre des chaînes soit celui des heures
+        '''
+            UPDATE creneaux_disponibles SET heure_debut = '0' || heure_debut
+            WHERE heure_debut GLOB '[0-9]:[0-9][0-9]'
+        ''',
+        '''
+            UPDATE creneaux_disponibles SET heure_fin = '0' || heure_fin
+            WHERE heure_fin GLOB '[0-9]:[0-9][0-9]'
+        ''',
+        # Îlots de plages qui se chevauchent ou se touchent (même médecin, même jour)
+        '''
+            CREATE TEMP TABLE ilots_plages AS
+            WITH ordonnees AS (
+                SELECT id, medecin_id, date_creneau, heure_debut, heure_fin,
+                       MAX(heure_fin) OVER (
+                           PARTITION BY medecin_id, date_creneau ORDER BY heure_debut, heure_fin
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                       ) AS fin_precedente
+                FROM creneaux_disponibles
+                WHERE disponible = 1 AND medecin_id IS NOT NULL
+                  AND heure_debut GLOB '[0-9][0-9]:[0-9][0-9]' AND heure_fin GLOB '[0-9][0-9]:[0-9][0-9]'
+                  AND heure_debut < heure_fin
+            ),
+            numerotees AS (
+                SELECT *, SUM(fin_precedente IS NULL OR fin_precedente < heure_debut) OVER (
+                           PARTITION BY medecin_id, date_creneau ORDER BY heure_debut, heure_fin
+                           ROWS UNBOUNDED PRECEDING
+                       ) AS ilot
+                FROM ordonnees
+            )
+            SELECT id, medecin_id, date_creneau, heure_debut, heure_fin,
+                   COUNT(*) OVER (PARTITION BY medecin_id, date_creneau, ilot) AS taille,
+                   MIN(heure_debut) OVER (PARTITION BY medecin_id, date_creneau, ilot) AS debut_ilot,
+                   MAX(heure_fin) OVER (PARTITION BY medecin_id, date_creneau, ilot) AS fin_ilot
+            FROM numerotees
+        ''',
+        # Une seule plage par îlot : les autres sont supprimées
+        '''
+            DELETE FROM creneaux_disponibles
+            WHERE id IN (SELECT id FROM ilots_plages WHERE taille > 1)
+        ''',
+        '''
+            INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+            SELECT DISTINCT medecin_id, date_creneau, debut_ilot, fin_ilot
+            FROM ilots_plages
+            WHERE taille > 1
+        ''',
+        '''
+            DROP TABLE temp.ilots_plages
+        ''',
+    ]),
+    (8, "Journal des modifications", [
+        # Une entrée par ligne écrite : les fenêtres ouvertes des autres processus
+        # relisent seulement les lignes modifiées depuis la dernière entrée vue
+        '''
+            CREATE TABLE IF NOT EXISTS journal_modifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_modifiee TEXT NOT NULL,
+                ligne_id INTEGER NOT NULL,
+                medecin_id INTEGER,
+                date_jour TEXT
+            )
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_rdv_ajout AFTER INSERT ON rendez_vous
+            BEGIN
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                VALUES ('rendez_vous', NEW.id, NEW.medecin_id, NEW.date_rdv);
+            END
+        ''',
+        # Un rendez-vous déplacé est signalé à l'ancien agenda comme au nouveau
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_rdv_modif AFTER UPDATE ON rendez_vous
+            BEGIN
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                SELECT 'rendez_vous', OLD.id, OLD.medecin_id, OLD.date_rdv
+                WHERE OLD.medecin_id IS NOT NEW.medecin_id OR OLD.date_rdv IS NOT NEW.date_rdv;
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                VALUES ('rendez_vous', NEW.id, NEW.medecin_id, NEW.date_rdv);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_rdv_suppr AFTER DELETE ON rendez_vous
+            BEGIN
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                VALUES ('rendez_vous', OLD.id, OLD.medecin_id, OLD.date_rdv);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_plage_ajout AFTER INSERT ON creneaux_disponibles
+            BEGIN
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                VALUES ('creneaux_disponibles', NEW.id, NEW.medecin_id, NEW.date_creneau);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_plage_modif AFTER UPDATE ON creneaux_disponibles
+            BEGIN
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                SELECT 'creneaux_disponibles', OLD.id, OLD.medecin_id, OLD.date_creneau
+                WHERE OLD.medecin_id IS NOT NEW.medecin_id OR OLD.date_creneau IS NOT NEW.date_creneau;
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                VALUES ('creneaux_disponibles', NEW.id, NEW.medecin_id, NEW.date_creneau);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_plage_suppr AFTER DELETE ON creneaux_disponibles
+            BEGIN
+                INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+                VALUES ('creneaux_disponibles', OLD.id, OLD.medecin_id, OLD.date_creneau);
+            END
+        ''',
+    ]),
+    (9, "Versions des données de référence", [
+        # Numéro incrémenté à chaque changement de la liste des médecins (caches en mémoire)
+        '''
+            CREATE TABLE IF NOT EXISTS versions_donnees (
+                nom TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''',
+        '''
+            INSERT OR IGNORE INTO versions_donnees (nom, version) VALUES ('medecins', 1)
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_version_medecins_ajout AFTER INSERT ON medecins
+            BEGIN
+                UPDATE versions_donnees SET version = version + 1 WHERE nom = 'medecins';
+            END
+        ''',
+        # Le re-hachage d'un mot de passe ne change pas la liste
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_version_medecins_modif
+            AFTER UPDATE OF id, nom_complet, specialite, nom_utilisateur ON medecins
+            BEGIN
+                UPDATE versions_donnees SET version = version + 1 WHERE nom = 'medecins';
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_version_medecins_suppr AFTER DELETE ON medecins
+            BEGIN
+                UPDATE versions_donnees SET version = version + 1 WHERE nom = 'medecins';
+            END
+        ''',
+    ]),
+    (10, "Résumé quotidien limité aux patients existants", [
+        # La liste administrateur joint les patients : les rendez-vous d'un patient supprimé
+        # (conservés dans rendez_vous) ne sont plus comptés, comme ceux d'un médecin supprimé
+        '''
+            DROP TRIGGER IF EXISTS trg_resume_rdv_ajout
+        ''',
+        '''
+            DROP TRIGGER IF EXISTS trg_resume_rdv_modif
+        ''',
+        '''
+            DROP TRIGGER IF EXISTS trg_resume_rdv_suppr
+        ''',
+        '''
+            DELETE FROM resume_quotidien
+        ''',
+        '''
+            INSERT INTO resume_quotidien (date_rdv, medecin_id, statut, urgent, nb)
+            SELECT date_rdv, COALESCE(medecin_id, 0), COALESCE(statut, ''), COALESCE(urgent, 0), COUNT(*)
+            FROM rendez_vous r
+            WHERE EXISTS (SELECT 1 FROM patients p WHERE p.id = r.patient_id)
+            GROUP BY 1, 2, 3, 4
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_rdv_ajout AFTER INSERT ON rendez_vous
+            WHEN EXISTS (SELECT 1 FROM patients WHERE id = NEW.patient_id)
+            BEGIN
+                INSERT INTO resume_quotidien (date_rdv, medecin_id, statut, urgent, nb)
+                VALUES (NEW.date_rdv, COALESCE(NEW.medecin_id, 0), COALESCE(NEW.statut, ''), COALESCE(NEW.urgent, 0), 1)
+                ON CONFLICT (date_rdv, medecin_id, statut, urgent) DO UPDATE SET nb = nb + 1;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_rdv_modif
+            AFTER UPDATE OF patient_id, date_rdv, medecin_id, statut, urgent ON rendez_vous
+            BEGIN
+                UPDATE resume_quotidien SET nb = nb - 1
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0)
+                  AND EXISTS (SELECT 1 FROM patients WHERE id = OLD.patient_id);
+                INSERT INTO resume_quotidien (date_rdv, medecin_id, statut, urgent, nb)
+                SELECT NEW.date_rdv, COALESCE(NEW.medecin_id, 0), COALESCE(NEW.statut, ''), COALESCE(NEW.urgent, 0), 1
+                WHERE EXISTS (SELECT 1 FROM patients WHERE id = NEW.patient_id)
+                ON CONFLICT (date_rdv, medecin_id, statut, urgent) DO UPDATE SET nb = nb + 1;
+                DELETE FROM resume_quotidien
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0) AND nb = 0;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_rdv_suppr AFTER DELETE ON rendez_vous
+            WHEN EXISTS (SELECT 1 FROM patients WHERE id = OLD.patient_id)
+            BEGIN
+                UPDATE resume_quotidien SET nb = nb - 1
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0);
+                DELETE FROM resume_quotidien
+                WHERE date_rdv = OLD.date_rdv AND medecin_id = COALESCE(OLD.medecin_id, 0)
+                  AND statut = COALESCE(OLD.statut, '') AND urgent = COALESCE(OLD.urgent, 0) AND nb = 0;
+            END
+        ''',
+        # Suppression d'un patient : ses rendez-vous sont retirés des comptes (pas de la base)
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_resume_patient_suppr AFTER DELETE ON patients
+            BEGIN
+                UPDATE resume_quotidien SET nb = nb - (
+                    SELECT COUNT(*) FROM rendez_vous r
+                    WHERE r.patient_id = OLD.id AND r.date_rdv = resume_quotidien.date_rdv
+                      AND COALESCE(r.medecin_id, 0) = resume_quotidien.medecin_id
+                      AND COALESCE(r.statut, '') = resume_quotidien.statut
+                      AND COALESCE(r.urgent, 0) = resume_quotidien.urgent
+                )
+                WHERE (date_rdv, medecin_id, statut, urgent) IN (
+                    SELECT date_rdv, COALESCE(medecin_id, 0), COALESCE(statut, ''), COALESCE(urgent, 0)
+                    FROM rendez_vous WHERE patient_id = OLD.id
+                );
+                DELETE FROM resume_quotidien
+                WHERE nb <= 0 AND (date_rdv, medecin_id, statut, urgent) IN (
+                    SELECT date_rdv, COALESCE(medecin_id, 0), COALESCE(statut, ''), COALESCE(urgent, 0)
+                    FROM rendez_vous WHERE patient_id = OLD.id
+                );
+            END
+        ''',
+    ]),
+    (11, "Élagage automatique du journal des modifications", [
+        # Seules les 10 000 dernières entrées sont gardées ; l'élagage a lieu toutes
+        # les 1 000 entrées, dans la transaction de l'écriture qui les ajoute
+        '''
+            DELETE FROM journal_modifications
+            WHERE id <= (SELECT MAX(id) FROM journal_modifications) - 10000
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_journal_elagage AFTER INSERT ON journal_modifications
+            WHEN NEW.id % 1000 = 0
+            BEGIN
+                DELETE FROM journal_modifications WHERE id <= NEW.id - 10000;
+            END
+        ''',
+    ]),
+]
+
+VERSION_SCHEMA = MIGRATIONS[-1][0]
+
+
+def version_schema(conn):
+    """Lire la version du schéma enregistrée dans la base"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def appliquer_migrations(conn):
+    """Appliquer les migrations manquantes dans une seule transaction et retourner la version"""
+    # Chemin rapide : schéma à jour, simple lecture sans verrou d'écriture
+    version = version_schema(conn)
+    if version >= VERSION_SCHEMA:
+        return version
+    
+    if conn.in_transaction:
+        conn.commit()
+    
+    # Verrou d'écriture immédiat : deux processus ne migrent pas en même temps
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Relire la version : un autre processus a pu migrer entre-temps
+        version = version_schema(conn)
+        for numero, _description, instructions in MIGRATIONS:
+            if numero <= version:
+                continue
+            for instruction in instructions:
+                conn.execute(instruction)
+            conn.execute(f"PRAGMA user_version = {numero}")
+            version = numero
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    
+    return version
@@ -0,0 +1,102 @@
+"""Suivi des modifications faites par les autres connexions (autres processus compris).
+
+Les triggers du schéma consignent chaque écriture sur les rendez-vous et les
+plages dans journal_modifications. Le surveillant lit périodiquement PRAGMA
+data_version sur sa propre connexion : cette valeur ne change que lorsqu'une
+autre connexion a validé une écriture, et sa lecture ne touche aucune table.
+Le journal n'est lu qu'à ce moment-là ; chaque fenêtre abonnée reçoit les
+entrées qui la concernent et relit seulement les lignes modifiées.
+"""
+import tkinter as tk
+import booking
+import database
+
+# Intervalle de lecture de PRAGMA data_version (millisecondes)
+INTERVALLE_SCRUTATION = 1000
+
+
+class Surveillant:
+    """Scrutation du journal des modifications rattachée à une fenêtre Tk"""
+    
+    def __init__(self, root, chemin=database.CHEMIN_BD):
+        self.root = root
+        self.chemin = chemin
+        self._conn = None
+        self._abonnes = {}
+        self._version_donnees = None
+        self._dernier_id = 0
+        self._scrutation_prevue = False
+    
+    def abonner(self, fenetre, rappel, medecin_id=None, tables=None):
+        """Appeler rappel(modifications) quand la base est modifiée par une autre connexion.
+        
+        modifications : entrées (table, ligne_id, medecin_id, date_jour) du médecin
+        et des tables demandés, ou None quand le journal ne suffit pas et que la
+        vue doit se recharger entièrement. L'abonnement prend fin avec la fenêtre.
+        """
+        if self._conn is None:
+            self._conn = database.ouvrir_connexion(self.chemin)
+        
+        # Reprise après une période sans abonné : les vues ouvertes viennent d'être chargées
+        if not self._abonnes:
+            self._version_donnees = self._lire_version()
+            self._dernier_id = booking.derniere_modification(self._conn)
+        
+        self._abonnes[str(fenetre)] = (fenetre, rappel, medecin_id, tables)
+        self._planifier()
+    
+    def _lire_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _planifier(self):
+        if not self._scrutation_prevue and self._abonnes:
+            self._scrutation_prevue = True
+            self.root.after(INTERVALLE_SCRUTATION, self._scruter)
+    
+    def _scruter(self):
+        self._scrutation_prevue = False
+        if self._conn is None:
+            return
+        
+        # Les fenêtres fermées sont désabonnées
+        for cle, (fenetre, *_autres) in list(self._abonnes.items()):
+            try:
+                ouverte = fenetre.winfo_exists()
+            except tk.TclError:
+                ouverte = False
+            if not ouverte:
+                del self._abonnes[cle]
+        if not self._abonnes:
+            return
+        
+        version = self._lire_version()
+        if version != self._version_donnees:
+            self._version_donnees = version
+            self._dernier_id, modifications = booking.modifications_depuis(self._conn, self._dernier_id)
+            if modifications is None or modifications:
+                self._diffuser(modifications)
+        
+        try:
+            self._planifier()
+        except tk.TclError:
+            pass  # fenêtre détruite
+    
+    def _diffuser(self, modifications):
+        for _fenetre, rappel, medecin_id, tables in list(self._abonnes.values()):
+            concernees = None
+            if modifications is not None:
+                concernees = [m for m in modifications
+                              if (medecin_id is None or m[2] == medecin_id) and (tables is None or m[0] in tables)]
+                if not concernees:
+                    continue
+            try:
+                rappel(concernees)
+            except tk.TclError:
+                pass  # fenêtre fermée entre-temps
+    
+    def fermer(self):
+        """Arrêter la scrutation et fermer la connexion du surveillant"""
+        self._abonnes.clear()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,8 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import sqlite3
-from datetime import datetime, timedelta
-import re
+from datetime import datetime
+import database
+from dates import date_iso, date_affichage, date_objet
+import booking
+import validation
+import securite
+import references
+from taches import ExecuteurTaches, regrouper
+from calendrier import ouvrir_calendrier
+
+# Nombre de médecins listés sous le champ de recherche (les plus pertinents)
+MEDECINS_AFFICHES = 50
 
 class EspacePatient:
     def __init__(self, root):
@@ -17,6 +27,9 @@ class EspacePatient:
         # Initialiser la base de données
         self.init_database()
         
+        # Le bouton de fermeture libère aussi threads et connexions
+        self.root.protocol("WM_DELETE_WINDOW", self.quitter)
+        
         # Patient connecté
         self.patient_connecte = None
         
@@ -32,281 +45,20 @@ class EspacePatient:
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
     def init_database(self):
-        self.conn = sqlite3.connect('hopital.db')
-        self.cursor = self.conn.cursor()
-        
-        # Créer les tables si elles n'existent pas
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nom_complet TEXT NOT NULL,
-                nom_utilisateur TEXT UNIQUE NOT NULL,
-                mot_de_passe TEXT NOT NULL,
-                telephone TEXT,
-                age INTEGER,
-                adresse TEXT
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS rendez_vous (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER,
-                medecin_id INTEGER,
-                date_rdv TEXT NOT NULL,
-                heure_rdv TEXT NOT NULL,
-                urgent INTEGER DEFAULT 0,
-                statut TEXT DEFAULT 'confirmé',
-                FOREIGN KEY (patient_id) REFERENCES patients (id),
-                FOREIGN KEY (medecin_id) REFERENCES medecins (id)
-            )
-        ''')
-        
-        self.conn.commit()
-    
-    def generer_heures_disponibles(self, heures_occupees=None):
-        """Générer les créneaux horaires disponibles (8h-16h, pause 12h, créneaux 30min)"""
-        if heures_occupees is None:
-            heures_occupees = []
-        
-        heures_disponibles = []
-        
-        # Matin : 8h00 à 11h30 (créneaux de 30 min)
-        for heure in range(8, 12):
-            for minute in [0, 30]:
-                heure_str = f"{heure:02d}:{minute:02d}"
-                if heure_str not in heures_occupees:
-                    heures_disponibles.append(heure_str)
-        
-        # Après-midi : 13h00 à 16h30 (créneaux de 30 min)
-        for heure in range(13, 17):
-            for minute in [0, 30]:
-                if heure == 16 and minute > 30:  # Arrêt à 16h30
-                    break
-                heure_str = f"{heure:02d}:{minute:02d}"
-                if heure_str not in heures_occupees:
-                    heures_disponibles.append(heure_str)
-        
-        return heures_disponibles
-    
-    def valider_date(self, date_str):
-        """Valider le format de date JJ/MM/AAAA et vérifier qu'elle n'est pas passée"""
-        try:
-            # Vérifier le format
-            jour, mois, annee = date_str.split('/')
-            date_obj = datetime(int(annee), int(mois), int(jour)).date()
-            
-            # Vérifier que ce n'est pas dans le passé
-            if date_obj < datetime.now().date():
-                return False, "La date ne peut pas être dans le passé"
-            
-            return True, date_obj
-            
-        except (ValueError, IndexError):
-            return False, "Format de date invalide (JJ/MM/AAAA requis)"
-    
-    def valider_heure(self, heure_str):
-        """Valider le format d'heure HH:MM et vérifier les créneaux"""
-        try:
-            heure, minute = heure_str.split(':')
-            heure_int, minute_int = int(heure), int(minute)
-            
-            # Vérifier le format basique
-            if not (0 <= heure_int <= 23 and 0 <= minute_int <= 59):
-                return False, "Heure invalide"
-            
-            # Vérifier les créneaux autorisés
-            if minute_int not in [0, 30]:
-                return False, "Seuls les créneaux de 30 minutes sont autorisés (XX:00 ou XX:30)"
-            
-            # Vérifier les heures d'ouverture
-            if not ((8 <= heure_int < 12) or (13 <= heure_int <= 16)):
-                return False, "Heures d'ouverture : 8h-12h et 13h-16h30"
-            
-            # Vérifier pause déjeuner
-            if heure_int == 12:
-                return False, "Pause déjeuner de 12h à 13h"
-            
-            # Vérifier limite après-midi
-            if heure_int == 16 and minute_int > 30:
-                return False, "Dernier créneau à 16h30"
-                
-            return True, heure_str
-            
-        except (ValueError, IndexError):
-            return False, "Format d'heure invalide (HH:MM requis)"
-    
-    def obtenir_creneaux_occupes(self, medecin_id, date_str):
-        """Obtenir les créneaux déjà occupés pour un médecin à une date donnée"""
-        self.cursor.execute('''
-            SELECT heure_rdv FROM rendez_vous
-            WHERE medecin_id = ? AND date_rdv = ? AND statut != 'annulé'
-        ''', (medecin_id, date_str))
-        
-        resultats = self.cursor.fetchall()
-        return [resultat[0] for resultat in resultats]
-    
-    def obtenir_creneaux_definis_medecin(self, medecin_id, date_str):
-        """Obtenir les créneaux définis par le médecin pour une date donnée"""
-        # Récupérer les créneaux définis comme disponibles par le médecin
-        self.cursor.execute('''
-            SELECT heure_debut, heure_fin FROM creneaux_disponibles
-            WHERE medecin_id = ? AND date_creneau = ? AND disponible = 1
-            ORDER BY heure_debut
-        ''', (medecin_id, date_str))
-        
-        creneaux_definis = self.cursor.fetchall()
-        
-        # Si aucun créneau n'est défini, retourner les créneaux par défaut
-        if not creneaux_definis:
-            return self.generer_heures_disponibles()
-        
-        # Générer les créneaux de 30 minutes dans chaque plage définie
-        heures_disponibles = []
-        for debut_str, fin_str in creneaux_definis:
-            try:
-                debut = datetime.strptime(debut_str, "%H:%M")
-                fin = datetime.strptime(fin_str, "%H:%M")
-                
-                # Générer des créneaux de 30 minutes
-                creneau_actuel = debut
-                while creneau_actuel < fin:
-                    heure_str = creneau_actuel.strftime("%H:%M")
-                    heures_disponibles.append(heure_str)
-                    creneau_actuel += timedelta(minutes=30)
-                    
-            except ValueError:
-                continue
-        
-        return sorted(heures_disponibles)
+        # Connexion du pool partagé (WAL) ; les migrations sont appliquées à sa création
+        self.conn = database.connexion()
+        # Requêtes de consultation exécutées hors du thread Tk
+        self.taches = ExecuteurTaches(self.root)
     
     # ============ VALIDATION DES DONNÉES ============
-    def valider_nom_complet(self, nom):
-        """Valider le nom complet (lettres, espaces, tirets uniquement)"""
-        if not nom or not nom.strip():
-            return False, "Le nom complet ne peut pas être vide"
-        
-        nom = nom.strip()
-        if len(nom) < 2:
-            return False, "Le nom complet doit contenir au moins 2 caractères"
-        
-        if len(nom) > 50:
-            return False, "Le nom complet ne peut pas dépasser 50 caractères"
-        
-        # Seules lettres, espaces, tirets et apostrophes autorisés
-        if not re.match(r"^[a-zA-ZÀ-ÿ\s\-']+$", nom):
-            return False, "Le nom ne peut contenir que des lettres, espaces, tirets et apostrophes"
-        
-        return True, nom
-    
-    def valider_nom_utilisateur(self, username):
-        """Valider le nom d'utilisateur (lettres et chiffres uniquement)"""
-        if not username or not username.strip():
-            return False, "Le nom d'utilisateur ne peut pas être vide"
-        
-        username = username.strip()
-        if len(username) < 3:
-            return False, "Le nom d'utilisateur doit contenir au moins 3 caractères"
-        
-        if len(username) > 20:
-            return False, "Le nom d'utilisateur ne peut pas dépasser 20 caractères"
-        
-        # Seules lettres et chiffres autorisés
-        if not re.match(r"^[a-zA-Z0-9]+$", username):
-            return False, "Le nom d'utilisateur ne peut contenir que des lettres et chiffres"
-        
-        return True, username.lower()
-    
-    def valider_mot_de_passe(self, password):
-        """Valider le mot de passe (minimum 4 caractères)"""
-        if not password:
-            return False, "Le mot de passe ne peut pas être vide"
-        
-        if len(password) < 4:
-            return False, "Le mot de passe doit contenir au moins 4 caractères"
-        
-        if len(password) > 30:
-            return False, "Le mot de passe ne peut pas dépasser 30 caractères"
-        
-        return True, password
-    
-    def valider_telephone(self, telephone):
-        """Valider le numéro de téléphone (format français)"""
-        if not telephone or not telephone.strip():
-            return False, "Le numéro de téléphone ne peut pas être vide"
-        
-        telephone = telephone.strip().replace(" ", "").replace("-", "").replace(".", "")
-        
-        # Format français : 10 chiffres commençant par 0
-        if not re.match(r"^0[1-9]\d{8}$", telephone):
-            return False, "Format de téléphone invalide (ex: 0123456789)"
-        
-        # Formater le numéro
-        formatted = f"{telephone[:2]} {telephone[2:4]} {telephone[4:6]} {telephone[6:8]} {telephone[8:]}"
-        return True, formatted
-    
-    def valider_age(self, age_str):
-        """Valider l'âge (nombre entre 1 et 120)"""
-        if not age_str or not age_str.strip():
-            return False, "L'âge ne peut pas être vide"
-        
-        try:
-            age = int(age_str.strip())
-            if age < 1:
-                return False, "L'âge doit être supérieur à 0"
-            if age > 120:
-                return False, "L'âge doit être inférieur à 120 ans"
-            return True, age
-        except ValueError:
-            return False, "L'âge doit être un nombre entier"
-    
-    def valider_adresse(self, adresse):
-        """Valider l'adresse"""
-        if not adresse or not adresse.strip():
-            return False, "L'adresse ne peut pas être vide"
-        
-        adresse = adresse.strip()
-        if len(adresse) < 5:
-            return False, "L'adresse doit contenir au moins 5 caractères"
-        
-        if len(adresse) > 100:
-            return False, "L'adresse ne peut pas dépasser 100 caractères"
-        
-        return True, adresse
-    
-    def valider_formulaire_patient(self, nom, username, password, telephone=None, age=None, adresse=None):
-        """Valider un formulaire patient complet"""
-        erreurs = []
-        
-        valid_nom, msg_nom = self.valider_nom_complet(nom)
-        if not valid_nom:
-            erreurs.append(f"Nom: {msg_nom}")
-        
-        valid_user, msg_user = self.valider_nom_utilisateur(username)
-        if not valid_user:
-            erreurs.append(f"Utilisateur: {msg_user}")
-        
-        valid_pass, msg_pass = self.valider_mot_de_passe(password)
-        if not valid_pass:
-            erreurs.append(f"Mot de passe: {msg_pass}")
-        
-        # Tous les champs sont maintenant obligatoires
-        valid_tel, msg_tel = self.valider_telephone(telephone)
-        if not valid_tel:
-            erreurs.append(f"Téléphone: {msg_tel}")
-        
-        valid_age, msg_age = self.valider_age(age)
-        if not valid_age:
-            erreurs.append(f"Âge: {msg_age}")
-        
-        valid_addr, msg_addr = self.valider_adresse(adresse)
-        if not valid_addr:
-            erreurs.append(f"Adresse: {msg_addr}")
-        
-        if erreurs:
-            return False, "\\n".join(erreurs)
-        
-        return True, "Validation réussie"
+    # Validateurs partagés avec l'import en masse (validation.py)
+    valider_nom_complet = staticmethod(validation.valider_nom_complet)
+    valider_nom_utilisateur = staticmethod(validation.valider_nom_utilisateur)
+    valider_mot_de_passe = staticmethod(validation.valider_mot_de_passe)
+    valider_telephone = staticmethod(validation.valider_telephone)
+    valider_age = staticmethod(validation.valider_age)
+    valider_adresse = staticmethod(validation.valider_adresse)
+    valider_formulaire_patient = staticmethod(validation.valider_formulaire_patient)
     # ============ FIN VALIDATION ============
     
     def creer_interface_connexion(self):
@@ -475,10 +227,10 @@ class EspacePatient:
         _, username_clean = self.valider_nom_utilisateur(username)
         
         try:
-            self.cursor.execute('''
+            self.conn.execute('''
                 INSERT INTO patients (nom_complet, telephone, age, adresse, nom_utilisateur, mot_de_passe)
                 VALUES (?, ?, ?, ?, ?, ?)
-            ''', (nom_clean, telephone_clean, age_clean, adresse_clean, username_clean, password))
+            ''', (nom_clean, telephone_clean, age_clean, adresse_clean, username_clean, securite.hacher(password)))
             self.conn.commit()
             messagebox.showinfo("Succès", "Compte patient créé avec succès")
             self.creer_interface_connexion()
@@ -494,12 +246,8 @@ class EspacePatient:
         if not password:
             return
         
-        self.cursor.execute('''
-            SELECT id, nom_complet, telephone, age, adresse FROM patients 
-            WHERE nom_utilisateur = ? AND mot_de_passe = ?
-        ''', (username, password))
-        
-        patient = self.cursor.fetchone()
+        patient = securite.authentifier(self.conn, "patients", username, password,
+                                        "id, nom_complet, telephone, age, adresse")
         if patient:
             self.patient_connecte = {
                 "id": patient[0], 
@@ -570,10 +318,77 @@ class EspacePatient:
         )
         btn_deconnexion.pack(pady=10)
     
+    def creer_liste_medecins(self, parent, hauteur, medecin_id_initial=None):
+        """Champ de recherche (nom ou spécialité) et liste des médecins trouvés.
+        
+        Retourne (listbox, affiches, selectionner_medecin) : affiches[i] est le
+        médecin (id, nom, spécialité) de la ligne i ; selectionner_medecin(id)
+        vide la recherche et sélectionne ce médecin.
+        """
+        frame_recherche = tk.Frame(parent, bg="#2c2c2c")
+        frame_recherche.pack()
+        
+        tk.Label(frame_recherche, text="Rechercher:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=5)
+        var_recherche = tk.StringVar()
+        entry_recherche = tk.Entry(frame_recherche, textvariable=var_recherche, width=38)
+        entry_recherche.pack(side=tk.LEFT)
+        
+        frame_liste = tk.Frame(parent, bg="#2c2c2c")
+        frame_liste.pack(pady=10)
+        
+        # exportselection=False : sélectionner du texte dans la recherche ne désélectionne pas le médecin
+        listbox = tk.Listbox(frame_liste, font=("Arial", 10), width=50, height=hauteur, exportselection=False)
+        listbox.pack()
+        
+        affiches = []
+        derniere_recherche = {"texte": None}
+        
+        def montrer(medecin_id):
+            for i, medecin in enumerate(affiches):
+                if medecin[0] == medecin_id:
+                    listbox.selection_set(i)
+                    listbox.see(i)
+                    return True
+            return False
+        
+        def afficher(*args):
+            texte = var_recherche.get()
+            if texte == derniere_recherche["texte"]:
+                return
+            derniere_recherche["texte"] = texte
+            
+            # Le médecin sélectionné le reste s'il fait partie des résultats
+            selection = listbox.curselection()
+            medecin_id = affiches[selection[0]][0] if selection else None
+            affiches[:] = references.rechercher_medecins(self.conn, texte, MEDECINS_AFFICHES)
+            listbox.delete(0, tk.END)
+            listbox.insert(tk.END, *(f"Dr. {medecin[1]} - {medecin[2]}" for medecin in affiches))
+            montrer(medecin_id)
+        
+        def selectionner_medecin(medecin_id):
+            var_recherche.set("")
+            afficher()
+            listbox.selection_clear(0, tk.END)
+            if not montrer(medecin_id):
+                # Hors des premiers résultats : placé en tête de liste
+                medecin = references.medecin(self.conn, medecin_id)
+                if medecin is not None:
+                    affiches.insert(0, medecin[:3])
+                    listbox.insert(0, f"Dr. {medecin[1]} - {medecin[2]}")
+                    montrer(medecin_id)
+        
+        # Recherche à chaque frappe (regroupée : une recherche par cycle)
+        var_recherche.trace_add("write", regrouper(listbox, afficher))
+        afficher()
+        if medecin_id_initial is not None:
+            selectionner_medecin(medecin_id_initial)
+        entry_recherche.focus_set()
+        
+        return listbox, affiches, selectionner_medecin
+    
     def prendre_rendez_vous(self):
         # Récupérer la liste des médecins
-        self.cursor.execute("SELECT id, nom_complet, specialite FROM medecins")
-        medecins = self.cursor.fetchall()
+        medecins = booking.lister_medecins(self.conn)
         
         if not medecins:
             messagebox.showwarning("Attention", "Aucun médecin disponible")
@@ -582,21 +397,15 @@ class EspacePatient:
         # Fenêtre de sélection médecin
         fenetre_rdv = tk.Toplevel(self.root)
         fenetre_rdv.title("Prendre rendez-vous")
-        fenetre_rdv.geometry("500x400")
+        fenetre_rdv.geometry("500x490")
         fenetre_rdv.configure(bg="#2c2c2c")
         
         # Liste des médecins
         tk.Label(fenetre_rdv, text="Choisir un médecin:", font=("Arial", 12, "bold"), 
                 fg="white", bg="#2c2c2c").pack(pady=10)
         
-        # Listbox pour les médecins
-        frame_liste = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-        frame_liste.pack(pady=10)
-        
-        listbox = tk.Listbox(frame_liste, font=("Arial", 10), width=50, height=8)
-        for medecin in medecins:
-            listbox.insert(tk.END, f"Dr. {medecin[1]} - {medecin[2]}")
-        listbox.pack()
+        # Recherche et liste des médecins
+        listbox, affiches, selectionner_medecin = self.creer_liste_medecins(fenetre_rdv, 8)
         
         # Sélection date
         frame_date = tk.Frame(fenetre_rdv, bg="#2c2c2c")
@@ -637,14 +446,19 @@ class EspacePatient:
         
         # Combobox pour les heures disponibles (sera mis à jour selon la date)
         combo_heure = ttk.Combobox(frame_heure, width=8, state="readonly")
-        heures_initiales = self.generer_heures_disponibles()
+        heures_initiales = booking.generer_heures_disponibles()
         combo_heure['values'] = heures_initiales
         if heures_initiales:
             combo_heure.set(heures_initiales[0])
         combo_heure.pack(side=tk.LEFT, padx=5)
         
+        # Heures libres déjà consultées dans cette fenêtre, par (medecin_id, date)
+        cache_heures = {}
+        # Recherche d'heures en cours : la confirmation attend son résultat
+        recherche_en_cours = tk.BooleanVar(master=fenetre_rdv, value=False)
+        
         # Fonction pour mettre à jour les heures disponibles selon la date et médecin
-        def mettre_a_jour_heures(*args):
+        def mettre_a_jour_heures(heure_preferee=None, recharger=False):
             try:
                 selection = listbox.curselection()
                 if not selection:
@@ -657,33 +471,168 @@ class EspacePatient:
                 if not (jour and mois and annee):
                     return
                 
-                date_str = f"{int(jour):02d}/{int(mois):02d}/{annee}"
-                medecin_id = medecins[selection[0]][0]
-                
-                # Obtenir les créneaux définis par le médecin
-                heures_medecin_disponibles = self.obtenir_creneaux_definis_medecin(medecin_id, date_str)
+                date_str = date_iso(jour, mois, annee)
+                medecin_id = affiches[selection[0]][0]
                 
-                # Obtenir les créneaux occupés pour cette date et ce médecin
-                heures_occupees = self.obtenir_creneaux_occupes(medecin_id, date_str)
-                
-                # Filtrer les créneaux occupés
-                heures_disponibles = [h for h in heures_medecin_disponibles if h not in heures_occupees]
-                
-                # Mettre à jour la combobox
+            except (ValueError, IndexError):
+                return
+            
+            cle_cache = (medecin_id, date_str)
+            if recharger:
+                cache_heures.pop(cle_cache, None)
+            
+            # Mettre à jour la combobox (seule la dernière recherche est appliquée)
+            def appliquer(heures_disponibles):
+                recherche_en_cours.set(False)
+                cache_heures[cle_cache] = heures_disponibles
                 combo_heure['values'] = heures_disponibles
-                if heures_disponibles:
+                if heure_preferee in heures_disponibles:
+                    combo_heure.set(heure_preferee)
+                elif heures_disponibles:
                     combo_heure.set(heures_disponibles[0])
                 else:
                     combo_heure.set("")
-                    
-            except (ValueError, IndexError):
-                pass
+            
+            if cle_cache in cache_heures:
+                # Date déjà consultée : pas de requête, une recherche en cours devient caduque
+                self.taches.annuler((str(fenetre_rdv), "heures"))
+                appliquer(cache_heures[cle_cache])
+                return
+            
+            def echec(exception):
+                recherche_en_cours.set(False)
+                messagebox.showerror("Erreur", f"Erreur d'accès à la base de données: {exception}")
+            
+            # Créneaux définis par le médecin et non occupés, cherchés en arrière-plan
+            recherche_en_cours.set(True)
+            self.taches.soumettre(booking.obtenir_heures_libres, medecin_id, date_str,
+                                  cle=(str(fenetre_rdv), "heures"), succes=appliquer, erreur=echec)
+        
+        # Lier les événements pour mettre à jour les heures (regroupés : une recherche par cycle)
+        demander_heures = regrouper(fenetre_rdv, mettre_a_jour_heures)
+        combo_jour.bind('<<ComboboxSelected>>', demander_heures)
+        combo_mois.bind('<<ComboboxSelected>>', demander_heures)
+        combo_annee.bind('<<ComboboxSelected>>', demander_heures)
+        listbox.bind('<<ListboxSelect>>', demander_heures)
+        
+        # Recherche du prochain créneau libre pour une spécialité
+        def chercher_prochain_creneau():
+            fenetre_recherche = tk.Toplevel(fenetre_rdv)
+            fenetre_recherche.title("Prochain créneau disponible")
+            fenetre_recherche.geometry("450x370")
+            fenetre_recherche.configure(bg="#2c2c2c")
+            
+            frame_specialite = tk.Frame(fenetre_recherche, bg="#2c2c2c")
+            frame_specialite.pack(pady=10)
+            
+            tk.Label(frame_specialite, text="Spécialité:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=5)
+            # Seules les spécialités exercées par au moins un médecin sont proposées
+            specialites = references.specialites(self.conn)
+            combo_specialite = ttk.Combobox(frame_specialite, width=25, state="readonly",
+                                            values=tuple(specialites))
+            combo_specialite.set(specialites[0])
+            combo_specialite.pack(side=tk.LEFT, padx=5)
+            
+            # Point de départ de la recherche (maintenant par défaut)
+            frame_debut = tk.Frame(fenetre_recherche, bg="#2c2c2c")
+            frame_debut.pack(pady=5)
+            
+            tk.Label(frame_debut, text="À partir du:", fg="white", bg="#2c2c2c").pack(side=tk.LEFT, padx=5)
+            entry_date_debut = tk.Entry(frame_debut, width=12)
+            entry_date_debut.insert(0, datetime.now().strftime("%d/%m/%Y"))
+            entry_date_debut.pack(side=tk.LEFT, padx=5)
+            
+            tk.Label(frame_debut, text="à", fg="white", bg="#2c2c2c").pack(side=tk.LEFT)
+            combo_heure_debut = ttk.Combobox(frame_debut, width=8, state="readonly", values=booking.GRILLE)
+            combo_heure_debut.set(booking.GRILLE[0])
+            combo_heure_debut.pack(side=tk.LEFT, padx=5)
+            
+            listbox_creneaux = tk.Listbox(fenetre_recherche, font=("Arial", 10), width=50, height=8)
+            listbox_creneaux.pack(pady=10)
+            
+            creneaux = []
+            
+            def afficher(trouves):
+                creneaux[:] = trouves
+                listbox_creneaux.delete(0, tk.END)
+                for date_rdv, heure_rdv, _medecin_id, nom_medecin in creneaux:
+                    listbox_creneaux.insert(tk.END, f"{date_affichage(date_rdv)} {heure_rdv} - Dr. {nom_medecin}")
+                if not creneaux:
+                    listbox_creneaux.insert(tk.END, "Aucun créneau libre sur la période")
+            
+            def rechercher(*args):
+                debut_valide, debut = validation.valider_debut_recherche(entry_date_debut.get(),
+                                                                         combo_heure_debut.get())
+                if not debut_valide:
+                    messagebox.showerror("Erreur", debut, parent=fenetre_recherche)
+                    return
+                
+                creneaux.clear()
+                listbox_creneaux.delete(0, tk.END)
+                listbox_creneaux.insert(tk.END, "Recherche en cours...")
+                # Les 10 premiers créneaux, cherchés en arrière-plan (seule la dernière spécialité compte)
+                self.taches.soumettre(booking.prochains_creneaux_libres, combo_specialite.get(), 10, debut,
+                                      cle=(str(fenetre_recherche), "prochains"), succes=afficher)
+            
+            def choisir(*args):
+                selection = listbox_creneaux.curselection()
+                if not selection or not creneaux:
+                    messagebox.showerror("Erreur", "Veuillez sélectionner un créneau", parent=fenetre_recherche)
+                    return
+                
+                date_rdv, heure_rdv, medecin_id, _nom_medecin = creneaux[selection[0]]
+                
+                # Reporter médecin, date et heure dans le formulaire de réservation
+                selectionner_medecin(medecin_id)
+                
+                date_obj = date_objet(date_rdv)
+                combo_jour.set(date_obj.day)
+                combo_mois.set(date_obj.month)
+                combo_annee.set(date_obj.year)
+                mettre_a_jour_heures(heure_preferee=heure_rdv)
+                
+                fenetre_recherche.destroy()
+            
+            combo_specialite.bind('<<ComboboxSelected>>', rechercher)
+            combo_heure_debut.bind('<<ComboboxSelected>>', rechercher)
+            entry_date_debut.bind('<Return>', rechercher)
+            tk.Button(frame_debut, text="Rechercher", command=rechercher,
+                     bg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+            listbox_creneaux.bind('<Double-Button-1>', choisir)
+            
+            tk.Button(fenetre_recherche, text="Choisir ce créneau", command=choisir,
+                     bg="white", font=("Arial", 10)).pack(pady=5)
+            
+            rechercher()
+        
+        # Vue du mois du médecin sélectionné
+        def voir_calendrier():
+            selection = listbox.curselection()
+            if not selection:
+                messagebox.showerror("Erreur", "Veuillez sélectionner un médecin", parent=fenetre_rdv)
+                return
+            
+            def choisir_jour(date_str):
+                date_obj = date_objet(date_str)
+                combo_jour.set(date_obj.day)
+                combo_mois.set(date_obj.month)
+                combo_annee.set(date_obj.year)
+                demander_heures()
+            
+            medecin = affiches[selection[0]]
+            ouvrir_calendrier(fenetre_rdv, self.taches, medecin[0], medecin[1],
+                              combo_annee.get(), combo_mois.get(), choisir_jour)
         
-        # Lier les événements pour mettre à jour les heures
-        combo_jour.bind('<<ComboboxSelected>>', mettre_a_jour_heures)
-        combo_mois.bind('<<ComboboxSelected>>', mettre_a_jour_heures)
-        combo_annee.bind('<<ComboboxSelected>>', mettre_a_jour_heures)
-        listbox.bind('<<ListboxSelect>>', mettre_a_jour_heures)
+        frame_recherche = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_recherche.pack(pady=5)
+        
+        btn_prochain = tk.Button(frame_recherche, text="🔎 Prochain créneau disponible",
+                                command=chercher_prochain_creneau, bg="white", font=("Arial", 10))
+        btn_prochain.pack(side=tk.LEFT, padx=5)
+        
+        btn_calendrier = tk.Button(frame_recherche, text="📅 Calendrier du médecin",
+                                  command=voir_calendrier, bg="white", font=("Arial", 10))
+        btn_calendrier.pack(side=tk.LEFT, padx=5)
         
         # Case urgence
         var_urgent = tk.BooleanVar()
@@ -713,46 +662,20 @@ class EspacePatient:
                 return
             
             # Construire la date
-            date_rdv = f"{int(jour):02d}/{int(mois):02d}/{annee}"
-            
-            # Valider la date
-            date_valide, date_obj_ou_message = self.valider_date(date_rdv)
-            if not date_valide:
-                messagebox.showerror("Erreur", date_obj_ou_message)
-                return
-            
-            # Valider l'heure
-            heure_valide, message_heure = self.valider_heure(heure_rdv)
-            if not heure_valide:
-                messagebox.showerror("Erreur", message_heure)
-                return
-            
-            # Vérifier que le créneau n'est pas occupé
-            medecin_id = medecins[selection[0]][0]
-            heures_occupees = self.obtenir_creneaux_occupes(medecin_id, date_rdv)
-            
-            if heure_rdv in heures_occupees:
-                messagebox.showerror("Erreur", "Ce créneau est déjà occupé")
-                return
-            
-            # Vérifier anticipation minimale (30 minutes)
-            try:
-                datetime_rdv = datetime.combine(date_obj_ou_message, datetime.strptime(heure_rdv, "%H:%M").time())
-                if datetime_rdv <= datetime.now() + timedelta(minutes=30):
-                    messagebox.showerror("Erreur", "Le rendez-vous doit être programmé au moins 30 minutes à l'avance")
-                    return
-            except Exception:
-                messagebox.showerror("Erreur", "Erreur de validation date/heure")
-                return
-            
+            date_rdv = date_iso(jour, mois, annee)
+            medecin_id = affiches[selection[0]][0]
             urgent = 1 if var_urgent.get() else 0
             
             try:
-                self.cursor.execute('''
-                    INSERT INTO rendez_vous (patient_id, medecin_id, date_rdv, heure_rdv, urgent)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (self.patient_connecte['id'], medecin_id, date_rdv, heure_rdv, urgent))
-                self.conn.commit()
+                # Validation (date, heure, anticipation) puis réservation atomique
+                reserve, resultat = booking.prendre_rendez_vous(
+                    self.conn, self.patient_connecte['id'], medecin_id, date_rdv, heure_rdv, urgent
+                )
+                if not reserve:
+                    messagebox.showerror("Erreur", str(resultat))
+                    if isinstance(resultat, booking.ConflitCreneau) or resultat == booking.CRENEAU_NON_PROPOSE:
+                        mettre_a_jour_heures(recharger=True)
+                    return
                 messagebox.showinfo("Succès", "Rendez-vous confirmé !")
                 fenetre_rdv.destroy()
             except Exception as e:
@@ -761,19 +684,15 @@ class EspacePatient:
         btn_confirmer = tk.Button(fenetre_rdv, text="Confirmer rendez-vous", 
                                  command=confirmer_rdv, bg="white", font=("Arial", 10))
         btn_confirmer.pack(pady=10)
-    
-    def voir_mes_rendez_vous(self):
-        # Récupérer les rendez-vous du patient avec l'ID
-        self.cursor.execute('''
-            SELECT rv.id, rv.date_rdv, rv.heure_rdv, m.nom_complet, m.specialite, rv.urgent, rv.statut, rv.medecin_id
-            FROM rendez_vous rv
-            JOIN medecins m ON rv.medecin_id = m.id
-            WHERE rv.patient_id = ?
-            ORDER BY rv.date_rdv, rv.heure_rdv
-        ''', (self.patient_connecte['id'],))
         
-        rendez_vous = self.cursor.fetchall()
+        # Bouton inactif tant que les heures affichées ne sont pas celles du médecin et de la date choisis
+        def etat_confirmation(*args):
+            btn_confirmer.config(state=tk.DISABLED if recherche_en_cours.get() else tk.NORMAL)
         
+        recherche_en_cours.trace_add("write", etat_confirmation)
+        etat_confirmation()
+    
+    def voir_mes_rendez_vous(self):
         # Fenêtre d'affichage
         fenetre_rdv = tk.Toplevel(self.root)
         fenetre_rdv.title("Mes rendez-vous")
@@ -783,110 +702,130 @@ class EspacePatient:
         tk.Label(fenetre_rdv, text="Mes rendez-vous", font=("Arial", 14, "bold"), 
                 fg="white", bg="#2c2c2c").pack(pady=10)
         
-        if not rendez_vous:
-            tk.Label(fenetre_rdv, text="Aucun rendez-vous programmé", 
-                    fg="white", bg="#2c2c2c").pack(pady=50)
-        else:
-            # Frame pour le treeview
-            frame_tree = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-            
-            # Treeview pour afficher les rendez-vous
-            columns = ("Date", "Heure", "Médecin", "Spécialité", "Urgent", "Statut")
-            tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=10)
-            
-            for col in columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=100, anchor="center")
-            
+        label_chargement = tk.Label(fenetre_rdv, text="Chargement...", fg="lightgray", bg="#2c2c2c")
+        label_chargement.pack(pady=5)
+        
+        # Frame pour le treeview
+        frame_tree = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        # Treeview pour afficher les rendez-vous ; l'identifiant de chaque ligne est l'id du rendez-vous
+        columns = ("Date", "Heure", "Médecin", "Spécialité", "Urgent", "Statut")
+        tree = ttk.Treeview(frame_tree, columns=columns, show="headings", height=10)
+        
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=100, anchor="center")
+        
+        tree.pack(fill=tk.BOTH, expand=True)
+        
+        def valeurs(date_rdv, heure_rdv, medecin, specialite, urgent, statut):
+            urgent_text = "OUI" if urgent else "NON"
+            return (date_affichage(date_rdv), heure_rdv, f"Dr. {medecin}", specialite, urgent_text, statut)
+        
+        def afficher(rendez_vous):
+            tree.delete(*tree.get_children())
             for rdv in rendez_vous:
-                urgent_text = "OUI" if rdv[5] else "NON"
-                # Stocker l'ID du rendez-vous dans les tags pour pouvoir le récupérer
-                item_id = tree.insert("", tk.END, values=(rdv[1], rdv[2], f"Dr. {rdv[3]}", rdv[4], urgent_text, rdv[6]), 
-                                    tags=(rdv[0],))
+                tree.insert("", tk.END, iid=str(rdv[0]), values=valeurs(*rdv[1:7]))
+            label_chargement.config(text="" if rendez_vous else "Aucun rendez-vous programmé")
+        
+        def charger():
+            label_chargement.config(text="Chargement...")
+            # Récupérer en arrière-plan les rendez-vous du patient avec l'ID
+            self.taches.soumettre(booking.rendez_vous_patient, self.patient_connecte['id'],
+                                  cle=(str(fenetre_rdv), "rdv"), succes=afficher)
+        
+        # Frame pour les boutons d'action
+        frame_actions = tk.Frame(fenetre_rdv, bg="#2c2c2c")
+        frame_actions.pack(pady=10)
+        
+        # Fonction pour annuler un rendez-vous
+        def annuler_rdv():
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
+                return
             
-            tree.pack(fill=tk.BOTH, expand=True)
+            rdv_id = int(selection[0])
+            rdv_values = tree.item(selection[0])['values']
             
-            # Frame pour les boutons d'action
-            frame_actions = tk.Frame(fenetre_rdv, bg="#2c2c2c")
-            frame_actions.pack(pady=10)
+            # Vérifier que le rendez-vous n'est pas déjà annulé
+            if rdv_values[5] == 'annulé':
+                messagebox.showwarning("Attention", "Ce rendez-vous est déjà annulé")
+                return
             
-            # Fonction pour annuler un rendez-vous
-            def annuler_rdv():
-                selection = tree.selection()
-                if not selection:
-                    messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
-                    return
-                
-                # Récupérer l'ID du rendez-vous depuis les tags
-                rdv_id = tree.item(selection[0])['tags'][0]
-                rdv_values = tree.item(selection[0])['values']
-                
-                # Vérifier que le rendez-vous n'est pas déjà annulé
-                if rdv_values[5] == 'annulé':
-                    messagebox.showwarning("Attention", "Ce rendez-vous est déjà annulé")
-                    return
-                
-                # Demander confirmation
-                if messagebox.askyesno("Confirmation", 
-                                     f"Êtes-vous sûr de vouloir annuler le rendez-vous du {rdv_values[0]} à {rdv_values[1]} avec {rdv_values[2]} ?"):
-                    try:
-                        self.cursor.execute("UPDATE rendez_vous SET statut = 'annulé' WHERE id = ?", (rdv_id,))
-                        self.conn.commit()
-                        messagebox.showinfo("Succès", "Rendez-vous annulé avec succès")
-                        fenetre_rdv.destroy()
-                        # Relancer la fenêtre pour voir la mise à jour
-                        self.voir_mes_rendez_vous()
-                    except Exception as e:
-                        messagebox.showerror("Erreur", f"Erreur lors de l'annulation: {str(e)}")
+            # Demander confirmation
+            if messagebox.askyesno("Confirmation", 
+                                 f"Êtes-vous sûr de vouloir annuler le rendez-vous du {rdv_values[0]} à {rdv_values[1]} avec {rdv_values[2]} ?"):
+                try:
+                    annule, resultat = booking.annuler_rendez_vous(self.conn, rdv_id)
+                    if not annule:
+                        messagebox.showwarning("Attention", resultat)
+                        return
+                    # Seule la ligne modifiée est mise à jour (rechargement complet : Actualiser)
+                    tree.set(selection[0], "Statut", resultat[6])
+                    messagebox.showinfo("Succès", "Rendez-vous annulé avec succès")
+                except Exception as e:
+                    messagebox.showerror("Erreur", f"Erreur lors de l'annulation: {str(e)}")
+        
+        # Fonction pour modifier un rendez-vous
+        def modifier_rdv():
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
+                return
             
-            # Fonction pour modifier un rendez-vous
-            def modifier_rdv():
-                selection = tree.selection()
-                if not selection:
-                    messagebox.showwarning("Attention", "Veuillez sélectionner un rendez-vous")
-                    return
-                
-                # Récupérer les informations du rendez-vous
-                rdv_id = tree.item(selection[0])['tags'][0]
-                rdv_values = tree.item(selection[0])['values']
-                
-                # Vérifier que le rendez-vous n'est pas annulé
-                if rdv_values[5] == 'annulé':
-                    messagebox.showwarning("Attention", "Impossible de modifier un rendez-vous annulé")
-                    return
-                
-                # Récupérer les détails complets du rendez-vous
-                self.cursor.execute('''
-                    SELECT medecin_id, date_rdv, heure_rdv, urgent 
-                    FROM rendez_vous 
-                    WHERE id = ?
-                ''', (rdv_id,))
-                rdv_details = self.cursor.fetchone()
-                
-                if rdv_details:
-                    self.modifier_rendez_vous(rdv_id, rdv_details[0], rdv_details[1], rdv_details[2], rdv_details[3])
-                    fenetre_rdv.destroy()
+            # Récupérer les informations du rendez-vous
+            iid = selection[0]
+            rdv_id = int(iid)
+            rdv_values = tree.item(iid)['values']
             
-            # Boutons d'action
-            btn_modifier = tk.Button(frame_actions, text="Modifier", 
-                                   command=modifier_rdv, bg="lightblue", font=("Arial", 10))
-            btn_modifier.pack(side=tk.LEFT, padx=10)
+            # Vérifier que le rendez-vous n'est pas annulé
+            if rdv_values[5] == 'annulé':
+                messagebox.showwarning("Attention", "Impossible de modifier un rendez-vous annulé")
+                return
             
-            btn_annuler = tk.Button(frame_actions, text="Annuler", 
-                                  command=annuler_rdv, bg="lightcoral", font=("Arial", 10))
-            btn_annuler.pack(side=tk.LEFT, padx=10)
+            # Récupérer les détails complets du rendez-vous
+            rdv_details = booking.obtenir_rendez_vous(self.conn, rdv_id)
             
-            # Note explicative
-            tk.Label(fenetre_rdv, text="Sélectionnez un rendez-vous puis cliquez sur 'Modifier' ou 'Annuler'", 
-                    font=("Arial", 9), fg="lightgray", bg="#2c2c2c").pack(pady=5)
+            # Le rendez-vous déplacé est reporté sur sa ligne, la liste reste ouverte
+            def apres_modification(ligne, medecin):
+                if tree.exists(iid):
+                    tree.item(iid, values=valeurs(ligne[3], ligne[4], medecin[1], medecin[2], ligne[5], ligne[6]))
+            
+            if rdv_details:
+                self.modifier_rendez_vous(rdv_id, rdv_details[0], rdv_details[1], rdv_details[2], rdv_details[3],
+                                          apres_modification)
+        
+        # Boutons d'action
+        btn_modifier = tk.Button(frame_actions, text="Modifier", 
+                               command=modifier_rdv, bg="lightblue", font=("Arial", 10))
+        btn_modifier.pack(side=tk.LEFT, padx=10)
+        
+        btn_annuler = tk.Button(frame_actions, text="Annuler", 
+                              command=annuler_rdv, bg="lightcoral", font=("Arial", 10))
+        btn_annuler.pack(side=tk.LEFT, padx=10)
+        
+        btn_actualiser = tk.Button(frame_actions, text="Actualiser", 
+                                 command=charger, bg="white", font=("Arial", 10))
+        btn_actualiser.pack(side=tk.LEFT, padx=10)
+        
+        # Note explicative
+        tk.Label(fenetre_rdv, text="Sélectionnez un rendez-vous puis cliquez sur 'Modifier' ou 'Annuler'", 
+                font=("Arial", 9), fg="lightgray", bg="#2c2c2c").pack(pady=5)
+        
+        charger()
     
-    def modifier_rendez_vous(self, rdv_id, medecin_id_actuel, date_actuelle, heure_actuelle, urgent_actuel):
-        """Interface de modification d'un rendez-vous existant"""
+    def modifier_rendez_vous(self, rdv_id, medecin_id_actuel, date_actuelle, heure_actuelle, urgent_actuel,
+                             apres_modification=None):
+        """Interface de modification d'un rendez-vous existant.
+        
+        apres_modification(ligne, medecin) est appelée avec la ligne modifiée
+        et le médecin choisi, pour mettre à jour la liste ouverte.
+        """
         
         # Récupérer la liste des médecins
-        self.cursor.execute("SELECT id, nom_complet, specialite FROM medecins")
-        medecins = self.cursor.fetchall()
+        medecins = booking.lister_medecins(self.conn)
         
         if not medecins:
             messagebox.showwarning("Attention", "Aucun médecin disponible")
@@ -895,7 +834,7 @@ class EspacePatient:
         # Fenêtre de modification
         fenetre_modif = tk.Toplevel(self.root)
         fenetre_modif.title("Modifier le rendez-vous")
-        fenetre_modif.geometry("500x450")
+        fenetre_modif.geometry("500x480")
         fenetre_modif.configure(bg="#2c2c2c")
         
         # Titre
@@ -906,23 +845,15 @@ class EspacePatient:
         info_frame = tk.Frame(fenetre_modif, bg="#2c2c2c")
         info_frame.pack(pady=10)
         
-        tk.Label(info_frame, text=f"Rendez-vous actuel : {date_actuelle} à {heure_actuelle}", 
+        tk.Label(info_frame, text=f"Rendez-vous actuel : {date_affichage(date_actuelle)} à {heure_actuelle}", 
                 font=("Arial", 10, "italic"), fg="lightgray", bg="#2c2c2c").pack()
         
         # Liste des médecins
         tk.Label(fenetre_modif, text="Médecin:", font=("Arial", 12, "bold"), 
                 fg="white", bg="#2c2c2c").pack(pady=(20,5))
         
-        frame_liste = tk.Frame(fenetre_modif, bg="#2c2c2c")
-        frame_liste.pack(pady=10)
-        
-        listbox = tk.Listbox(frame_liste, font=("Arial", 10), width=50, height=6)
-        for i, medecin in enumerate(medecins):
-            listbox.insert(tk.END, f"Dr. {medecin[1]} - {medecin[2]}")
-            # Présélectionner le médecin actuel
-            if medecin[0] == medecin_id_actuel:
-                listbox.selection_set(i)
-        listbox.pack()
+        # Recherche et liste des médecins, médecin actuel présélectionné
+        listbox, affiches, _selectionner = self.creer_liste_medecins(fenetre_modif, 6, medecin_id_actuel)
         
         # Sélection date
         frame_date = tk.Frame(fenetre_modif, bg="#2c2c2c")
@@ -932,10 +863,10 @@ class EspacePatient:
         
         # Sélecteurs pour jour, mois, année avec valeurs actuelles
         aujourd_hui = datetime.now()
-        date_parts = date_actuelle.split('/')
-        jour_actuel = int(date_parts[0])
-        mois_actuel = int(date_parts[1])
-        annee_actuelle = int(date_parts[2])
+        date_obj_actuelle = date_objet(date_actuelle)
+        jour_actuel = date_obj_actuelle.day
+        mois_actuel = date_obj_actuelle.month
+        annee_actuelle = date_obj_actuelle.year
         
         # Jour (1-31)
         combo_jour = ttk.Combobox(frame_date, width=3, state="readonly")
@@ -967,13 +898,18 @@ class EspacePatient:
         
         # Combobox pour les heures disponibles
         combo_heure = ttk.Combobox(frame_heure, width=8, state="readonly")
-        heures_initiales = self.generer_heures_disponibles()
+        heures_initiales = booking.generer_heures_disponibles()
         combo_heure['values'] = heures_initiales
         combo_heure.set(heure_actuelle)  # Définir l'heure actuelle
         combo_heure.pack(side=tk.LEFT, padx=5)
         
+        # Heures libres déjà consultées dans cette fenêtre, par (medecin_id, date)
+        cache_heures = {}
+        # Recherche d'heures en cours : la confirmation attend son résultat
+        recherche_en_cours = tk.BooleanVar(master=fenetre_modif, value=False)
+        
         # Fonction pour mettre à jour les heures disponibles
-        def mettre_a_jour_heures(*args):
+        def mettre_a_jour_heures(recharger=False):
             try:
                 selection = listbox.curselection()
                 if not selection:
@@ -986,25 +922,20 @@ class EspacePatient:
                 if not (jour and mois and annee):
                     return
                 
-                date_str = f"{int(jour):02d}/{int(mois):02d}/{annee}"
-                nouveau_medecin_id = medecins[selection[0]][0]
-                
-                # Obtenir les créneaux définis par le médecin
-                heures_medecin_disponibles = self.obtenir_creneaux_definis_medecin(nouveau_medecin_id, date_str)
-                
-                # Obtenir les créneaux occupés pour cette date et ce médecin
-                heures_occupees = self.obtenir_creneaux_occupes(nouveau_medecin_id, date_str)
+                date_str = date_iso(jour, mois, annee)
+                nouveau_medecin_id = affiches[selection[0]][0]
                 
-                # Si on reste sur le même médecin et la même date, permettre de garder l'heure actuelle
-                if nouveau_medecin_id == medecin_id_actuel and date_str == date_actuelle:
-                    # Retirer l'heure actuelle des heures occupées pour permettre sa modification
-                    if heure_actuelle in heures_occupees:
-                        heures_occupees.remove(heure_actuelle)
-                
-                # Filtrer les créneaux occupés
-                heures_disponibles = [h for h in heures_medecin_disponibles if h not in heures_occupees]
-                
-                # Mettre à jour la combobox
+            except (ValueError, IndexError):
+                return
+            
+            cle_cache = (nouveau_medecin_id, date_str)
+            if recharger:
+                cache_heures.pop(cle_cache, None)
+            
+            # Mettre à jour la combobox (seule la dernière recherche est appliquée)
+            def appliquer(heures_disponibles):
+                recherche_en_cours.set(False)
+                cache_heures[cle_cache] = heures_disponibles
                 combo_heure['values'] = heures_disponibles
                 if heure_actuelle in heures_disponibles:
                     combo_heure.set(heure_actuelle)
@@ -1012,15 +943,27 @@ class EspacePatient:
                     combo_heure.set(heures_disponibles[0])
                 else:
                     combo_heure.set("")
-                    
-            except (ValueError, IndexError):
-                pass
-        
-        # Lier les événements
-        combo_jour.bind('<<ComboboxSelected>>', mettre_a_jour_heures)
-        combo_mois.bind('<<ComboboxSelected>>', mettre_a_jour_heures)
-        combo_annee.bind('<<ComboboxSelected>>', mettre_a_jour_heures)
-        listbox.bind('<<ListboxSelect>>', mettre_a_jour_heures)
+            
+            if cle_cache in cache_heures:
+                self.taches.annuler((str(fenetre_modif), "heures"))
+                appliquer(cache_heures[cle_cache])
+                return
+            
+            def echec(exception):
+                recherche_en_cours.set(False)
+                messagebox.showerror("Erreur", f"Erreur d'accès à la base de données: {exception}")
+            
+            # Créneaux libres ; le rendez-vous modifié ne bloque pas son propre créneau
+            recherche_en_cours.set(True)
+            self.taches.soumettre(booking.obtenir_heures_libres, nouveau_medecin_id, date_str, rdv_id,
+                                  cle=(str(fenetre_modif), "heures"), succes=appliquer, erreur=echec)
+        
+        # Lier les événements (regroupés : une recherche par cycle)
+        demander_heures = regrouper(fenetre_modif, mettre_a_jour_heures)
+        combo_jour.bind('<<ComboboxSelected>>', demander_heures)
+        combo_mois.bind('<<ComboboxSelected>>', demander_heures)
+        combo_annee.bind('<<ComboboxSelected>>', demander_heures)
+        listbox.bind('<<ListboxSelect>>', demander_heures)
         
         # Mettre à jour une première fois pour charger les bonnes heures
         mettre_a_jour_heures()
@@ -1057,54 +1000,25 @@ class EspacePatient:
                 return
             
             # Construire la nouvelle date
-            nouvelle_date = f"{int(jour):02d}/{int(mois):02d}/{annee}"
-            nouveau_medecin_id = medecins[selection[0]][0]
-            
-            # Valider la nouvelle date
-            date_valide, date_obj_ou_message = self.valider_date(nouvelle_date)
-            if not date_valide:
-                messagebox.showerror("Erreur", date_obj_ou_message)
-                return
-            
-            # Valider l'heure
-            heure_valide, message_heure = self.valider_heure(nouvelle_heure)
-            if not heure_valide:
-                messagebox.showerror("Erreur", message_heure)
-                return
-            
-            # Vérifier que le créneau n'est pas occupé
-            heures_occupees = self.obtenir_creneaux_occupes(nouveau_medecin_id, nouvelle_date)
-            
-            # Si même médecin et même date, permettre de garder la même heure
-            if not (nouveau_medecin_id == medecin_id_actuel and nouvelle_date == date_actuelle and nouvelle_heure == heure_actuelle):
-                if nouvelle_heure in heures_occupees:
-                    messagebox.showerror("Erreur", "Ce créneau est déjà occupé")
-                    return
-            
-            # Vérifier anticipation minimale (30 minutes)
-            try:
-                datetime_rdv = datetime.combine(date_obj_ou_message, datetime.strptime(nouvelle_heure, "%H:%M").time())
-                if datetime_rdv <= datetime.now() + timedelta(minutes=30):
-                    messagebox.showerror("Erreur", "Le rendez-vous doit être programmé au moins 30 minutes à l'avance")
-                    return
-            except Exception:
-                messagebox.showerror("Erreur", "Erreur de validation date/heure")
-                return
-            
+            nouvelle_date = date_iso(jour, mois, annee)
+            nouveau_medecin_id = affiches[selection[0]][0]
             urgent = 1 if var_urgent.get() else 0
             
             try:
-                # Mettre à jour le rendez-vous
-                self.cursor.execute('''
-                    UPDATE rendez_vous 
-                    SET medecin_id = ?, date_rdv = ?, heure_rdv = ?, urgent = ?
-                    WHERE id = ?
-                ''', (nouveau_medecin_id, nouvelle_date, nouvelle_heure, urgent, rdv_id))
-                self.conn.commit()
+                # Validation puis déplacement atomique
+                # (garder son propre créneau n'est pas un conflit)
+                deplace, resultat = booking.modifier_rendez_vous(
+                    self.conn, rdv_id, nouveau_medecin_id, nouvelle_date, nouvelle_heure, urgent
+                )
+                if not deplace:
+                    messagebox.showerror("Erreur", str(resultat))
+                    if isinstance(resultat, booking.ConflitCreneau) or resultat == booking.CRENEAU_NON_PROPOSE:
+                        mettre_a_jour_heures(recharger=True)
+                    return
+                if apres_modification:
+                    apres_modification(resultat, affiches[selection[0]])
                 messagebox.showinfo("Succès", "Rendez-vous modifié avec succès !")
                 fenetre_modif.destroy()
-                # Relancer la fenêtre des rendez-vous pour voir la mise à jour
-                self.voir_mes_rendez_vous()
             except Exception as e:
                 messagebox.showerror("Erreur", f"Erreur lors de la modification: {str(e)}")
         
@@ -1112,6 +1026,13 @@ class EspacePatient:
                                  command=confirmer_modification, bg="lightgreen", font=("Arial", 10))
         btn_confirmer.pack(side=tk.LEFT, padx=10)
         
+        # Bouton inactif tant que les heures affichées ne sont pas celles du médecin et de la date choisis
+        def etat_confirmation(*args):
+            btn_confirmer.config(state=tk.DISABLED if recherche_en_cours.get() else tk.NORMAL)
+        
+        recherche_en_cours.trace_add("write", etat_confirmation)
+        etat_confirmation()
+        
         btn_annuler = tk.Button(frame_boutons, text="Annuler", 
                                command=fenetre_modif.destroy, bg="lightgray", font=("Arial", 10))
         btn_annuler.pack(side=tk.LEFT, padx=10)
@@ -1121,10 +1042,20 @@ class EspacePatient:
         self.creer_interface_connexion()
     
     def quitter(self):
-        self.conn.close()
+        self.taches.fermer()
+        
+        # Espace ouvert dans une fenêtre de main.py : seule cette fenêtre est fermée,
+        # les connexions partagées restent ouvertes pour les autres espaces
+        if not isinstance(self.root, tk.Tk):
+            self.root.destroy()
+            return
+        
+        database.fermer_connexions()
         self.root.quit()
         self.root.destroy()
 
-root = tk.Tk()
-app = EspacePatient(root)
-root.mainloop()
\ No newline at end of file
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = EspacePatient(root)
+    root.mainloop()
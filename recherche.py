@@ -0,0 +1,98 @@
+"""Recherche des médecins par nom ou spécialité, sans tenir compte des accents ni de la casse.
+
+L'index est construit une fois par liste de médecins (references le
+reconstruit quand la liste change) :
+- les mots normalisés, triés, pour trouver par bisection ceux qui commencent
+  par le texte saisi ;
+- les trigrammes de ces mots, pour un texte saisi au milieu d'un mot
+  ("ardio" trouve Cardiologie).
+Chaque mot saisi doit être trouvé ; un début de nom compte plus qu'un début
+de spécialité, qui compte plus qu'un texte trouvé au milieu d'un mot.
+"""
+import heapq
+import unicodedata
+from bisect import bisect_left
+
+# Poids d'un mot saisi selon l'endroit où il est trouvé
+POIDS_NOM = 3
+POIDS_SPECIALITE = 2
+POIDS_SOUS_CHAINE = 1
+
+
+def normaliser(texte):
+    """Minuscules sans accents ; la ponctuation devient une espace"""
+    decompose = unicodedata.normalize("NFKD", texte.casefold())
+    return "".join(c if c.isalnum() else " " for c in decompose if not unicodedata.combining(c))
+
+
+def trigrammes(mot):
+    """Ensemble des suites de trois caractères d'un mot"""
+    return {mot[i:i + 3] for i in range(len(mot) - 2)}
+
+
+class IndexMedecins:
+    """Index de recherche d'une liste de médecins (id, nom complet, spécialité, ...)"""
+    
+    def __init__(self, medecins):
+        self.medecins = medecins
+        self._textes = []
+        self._trigrammes = {}
+        entrees = []
+        for i, medecin in enumerate(medecins):
+            nom = normaliser(medecin[1])
+            specialite = normaliser(medecin[2])
+            self._textes.append(f"{nom} {specialite}")
+            for mots, poids in ((nom.split(), POIDS_NOM), (specialite.split(), POIDS_SPECIALITE)):
+                for mot in mots:
+                    entrees.append((mot, i, poids))
+                    for trigramme in trigrammes(mot):
+                        self._trigrammes.setdefault(trigramme, set()).add(i)
+        
+        entrees.sort()
+        self._mots = [mot for mot, _i, _poids in entrees]
+        self._indices = [i for _mot, i, _poids in entrees]
+        self._poids = [poids for _mot, _i, poids in entrees]
+        # Ordre affiché sans recherche : alphabétique
+        self._ordre = sorted(range(len(medecins)), key=self._textes.__getitem__)
+    
+    def _prefixe(self, mot):
+        """{indice du médecin: poids} des médecins dont un mot commence par mot"""
+        trouves = {}
+        for k in range(bisect_left(self._mots, mot), len(self._mots)):
+            if not self._mots[k].startswith(mot):
+                break
+            i = self._indices[k]
+            trouves[i] = max(trouves.get(i, 0), self._poids[k])
+        return trouves
+    
+    def _sous_chaine(self, mot):
+        """Indices des médecins dont un mot contient mot (3 caractères au moins)"""
+        ensembles = sorted((self._trigrammes.get(t, set()) for t in trigrammes(mot)), key=len)
+        if not ensembles or not ensembles[0]:
+            return set()
+        candidats = ensembles[0].intersection(*ensembles[1:])
+        return {i for i in candidats if mot in self._textes[i]}
+    
+    def rechercher(self, requete, limite=None):
+        """Médecins correspondant à tous les mots saisis, les plus pertinents d'abord"""
+        mots = normaliser(requete).split()
+        if not mots:
+            ordre = self._ordre[:limite] if limite else self._ordre
+            return [self.medecins[i] for i in ordre]
+        
+        scores = None
+        for mot in mots:
+            trouves = self._prefixe(mot)
+            if len(mot) >= 3:
+                for i in self._sous_chaine(mot):
+                    trouves.setdefault(i, POIDS_SOUS_CHAINE)
+            if scores is None:
+                scores = trouves
+            else:
+                scores = {i: score + trouves[i] for i, score in scores.items() if i in trouves}
+            if not scores:
+                return []
+        
+        cle = lambda i: (-scores[i], self._textes[i])
+        meilleurs = heapq.nsmallest(limite, scores, key=cle) if limite else sorted(scores, key=cle)
+        return [self.medecins[i] for i in meilleurs]
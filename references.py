@@ -0,0 +1,116 @@
+"""Données de référence (médecins et spécialités) gardées en mémoire.
+
+La liste des médecins change quelques fois par mois mais est lue à chaque
+ouverture des fenêtres de réservation. Elle est chargée une fois par base puis
+servie depuis la mémoire, avec ses index par id et par spécialité. Un trigger
+incrémente versions_donnees à chaque ajout, modification ou suppression de
+médecin, quel que soit le processus. Ce numéro n'est relu (une ligne lue par
+clé primaire) qu'après DUREE_VALIDITE secondes : les autres accès, recherche
+à chaque frappe comprise, ne touchent pas SQLite. Les écritures du processus
+appellent invalider() pour être vues aussitôt.
+"""
+import threading
+import time
+from recherche import IndexMedecins
+
+# Délai après lequel la version de la liste est vérifiée à nouveau (secondes)
+DUREE_VALIDITE = 2.0
+
+SQL_VERSION = "SELECT version FROM versions_donnees WHERE nom = 'medecins'"
+SQL_CHEMIN = "SELECT file FROM pragma_database_list WHERE name = 'main'"
+
+_instantanes = {}
+_verrou = threading.Lock()
+
+
+class _Instantane:
+    """Liste des médecins d'une base à une version donnée"""
+    
+    def __init__(self, version, lignes):
+        self.version = version
+        # Instant (time.monotonic) de la dernière vérification de la version
+        self.verifie_le = time.monotonic()
+        # (id, nom complet, spécialité, nom d'utilisateur), dans l'ordre des id
+        self.medecins = lignes
+        # Même liste au format de booking.lister_medecins : (id, nom complet, spécialité)
+        self.liste = [ligne[:3] for ligne in lignes]
+        self.par_id = {ligne[0]: ligne for ligne in lignes}
+        self.par_specialite = {}
+        for ligne in lignes:
+            self.par_specialite.setdefault(ligne[2], []).append(ligne)
+        self._index = None
+    
+    @property
+    def index(self):
+        """Index de recherche par nom et spécialité, construit à la première recherche"""
+        if self._index is None:
+            self._index = IndexMedecins(self.liste)
+        return self._index
+
+
+def _chemin(conn):
+    """Chemin de la base de conn (connexions de database.ouvrir_connexion : sans requête)"""
+    chemin = getattr(conn, "chemin", None)
+    if chemin is None:
+        chemin = conn.execute(SQL_CHEMIN).fetchone()[0]
+    return chemin
+
+
+def _instantane(conn):
+    """Instantané de la base de conn, dont la version est vérifiée au plus toutes les DUREE_VALIDITE s"""
+    chemin = _chemin(conn)
+    instantane = _instantanes.get(chemin)
+    maintenant = time.monotonic()
+    if instantane is not None and maintenant - instantane.verifie_le < DUREE_VALIDITE:
+        return instantane
+    
+    version = conn.execute(SQL_VERSION).fetchone()[0]
+    if instantane is not None and instantane.version == version:
+        instantane.verifie_le = maintenant
+        return instantane
+    
+    with _verrou:
+        instantane = _instantanes.get(chemin)
+        if instantane is None or instantane.version != version:
+            lignes = conn.execute('''
+                SELECT id, nom_complet, specialite, nom_utilisateur FROM medecins ORDER BY id
+            ''').fetchall()
+            instantane = _Instantane(version, lignes)
+            _instantanes[chemin] = instantane
+        return instantane
+
+
+def invalider(conn):
+    """Relire la liste au prochain accès (après une écriture sur medecins par ce processus)"""
+    with _verrou:
+        _instantanes.pop(_chemin(conn), None)
+
+
+def medecins(conn):
+    """Tous les médecins : (id, nom complet, spécialité, nom d'utilisateur)"""
+    return _instantane(conn).medecins
+
+
+def liste_medecins(conn):
+    """Tous les médecins : (id, nom complet, spécialité)"""
+    return _instantane(conn).liste
+
+
+def medecin(conn, medecin_id):
+    """Un médecin par son id, ou None"""
+    return _instantane(conn).par_id.get(medecin_id)
+
+
+def medecins_specialite(conn, specialite):
+    """Médecins d'une spécialité"""
+    return _instantane(conn).par_specialite.get(specialite, [])
+
+
+def specialites(conn):
+    """Spécialités ayant au moins un médecin, triées"""
+    return sorted(_instantane(conn).par_specialite)
+
+
+def rechercher_medecins(conn, requete, limite=None):
+    """Médecins (id, nom complet, spécialité) correspondant au texte saisi, les plus pertinents d'abord"""
+    return _instantane(conn).index.rechercher(requete, limite)
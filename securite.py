@@ -0,0 +1,163 @@
+"""Hachage des mots de passe et vérification des identifiants.
+
+Les mots de passe sont stockés salés et hachés par scrypt (ou PBKDF2-SHA256)
+sous la forme "algorithme$paramètres$sel$empreinte". Les comptes encore en
+clair sont acceptés puis re-hachés à leur première connexion réussie, de même
+que les empreintes calculées avec un ancien coût.
+"""
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Algorithme des nouvelles empreintes ("scrypt" ou "pbkdf2_sha256") et coût réglable
+ALGORITHME = "scrypt"
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+TAILLE_SEL = 16
+
+# Nombre de vérifications réussies gardées en mémoire (reconnexions sans recalcul)
+TAILLE_CACHE = 1024
+
+# Tables de comptes acceptées par authentifier
+TABLES_COMPTES = ("admin", "patients", "medecins")
+
+_cle_cache = os.urandom(32)
+_cache = OrderedDict()
+_verrou_cache = threading.Lock()
+_empreinte_factice = None
+_verrou_factice = threading.Lock()
+
+
+def _deriver(mot_de_passe, algorithme, parametres, sel):
+    """Calculer l'empreinte brute d'un mot de passe"""
+    if algorithme == "scrypt":
+        n, r, p = parametres
+        return hashlib.scrypt(mot_de_passe.encode(), salt=sel, n=n, r=r, p=p,
+                              maxmem=256 * n * r * p + 1024 * 1024)
+    if algorithme == "pbkdf2_sha256":
+        (iterations,) = parametres
+        return hashlib.pbkdf2_hmac("sha256", mot_de_passe.encode(), sel, iterations)
+    raise ValueError(f"Algorithme inconnu : {algorithme}")
+
+
+def _parametres_courants(algorithme):
+    if algorithme == "scrypt":
+        return (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return (PBKDF2_ITERATIONS,)
+
+
+def _decoder(empreinte):
+    """(algorithme, paramètres, sel, empreinte brute) ou None si la valeur n'est pas une empreinte"""
+    parties = empreinte.split("$") if isinstance(empreinte, str) else []
+    try:
+        if parties[0] == "scrypt" and len(parties) == 6:
+            return "scrypt", tuple(int(x) for x in parties[1:4]), bytes.fromhex(parties[4]), bytes.fromhex(parties[5])
+        if parties[0] == "pbkdf2_sha256" and len(parties) == 4:
+            return "pbkdf2_sha256", (int(parties[1]),), bytes.fromhex(parties[2]), bytes.fromhex(parties[3])
+    except (ValueError, IndexError):
+        pass
+    return None
+
+
+def hacher(mot_de_passe, algorithme=None):
+    """Empreinte salée d'un mot de passe, au format stocké en base"""
+    algorithme = algorithme or ALGORITHME
+    parametres = _parametres_courants(algorithme)
+    sel = os.urandom(TAILLE_SEL)
+    brute = _deriver(mot_de_passe, algorithme, parametres, sel)
+    return "$".join([algorithme, *(str(x) for x in parametres), sel.hex(), brute.hex()])
+
+
+def hacher_lot(mots_de_passe, nb_threads=None):
+    """Hacher une liste de mots de passe en parallèle (scrypt et PBKDF2 libèrent le GIL)"""
+    with ThreadPoolExecutor(max_workers=nb_threads or os.cpu_count() or 1) as executeur:
+        return list(executeur.map(hacher, mots_de_passe))
+
+
+def est_hache(valeur):
+    """La valeur stockée est-elle une empreinte (et non un mot de passe en clair) ?"""
+    return _decoder(valeur) is not None
+
+
+def doit_rehacher(empreinte):
+    """Mot de passe en clair, ou empreinte calculée avec un autre algorithme ou un autre coût"""
+    decode = _decoder(empreinte)
+    return decode is None or decode[0] != ALGORITHME or decode[1] != _parametres_courants(ALGORITHME)
+
+
+def _cle(mot_de_passe, empreinte):
+    """Clé du cache des vérifications réussies (HMAC avec une clé propre au processus)"""
+    return hmac.new(_cle_cache, f"{empreinte}\0{mot_de_passe}".encode(), hashlib.sha256).digest()
+
+
+def verifier(mot_de_passe, empreinte):
+    """Comparer un mot de passe à la valeur stockée (empreinte ou ancien mot de passe en clair).
+    
+    La comparaison est à temps constant ; une vérification réussie est gardée
+    en cache pour que les reconnexions ne recalculent pas l'empreinte.
+    """
+    decode = _decoder(empreinte)
+    if decode is None:
+        return hmac.compare_digest(mot_de_passe.encode(), str(empreinte).encode())
+    
+    cle = _cle(mot_de_passe, empreinte)
+    with _verrou_cache:
+        if cle in _cache:
+            _cache.move_to_end(cle)
+            return True
+    
+    algorithme, parametres, sel, attendue = decode
+    if not hmac.compare_digest(_deriver(mot_de_passe, algorithme, parametres, sel), attendue):
+        return False
+    
+    with _verrou_cache:
+        _cache[cle] = True
+        if len(_cache) > TAILLE_CACHE:
+            _cache.popitem(last=False)
+    return True
+
+
+def _verifier_factice(mot_de_passe):
+    """Vérification sur une empreinte factice : un compte inconnu coûte le même temps qu'un connu"""
+    global _empreinte_factice
+    with _verrou_factice:
+        if _empreinte_factice is None:
+            _empreinte_factice = hacher(os.urandom(16).hex())
+    verifier(mot_de_passe, _empreinte_factice)
+
+
+def authentifier(conn, table, nom_utilisateur, mot_de_passe, colonnes="id"):
+    """Vérifier les identifiants d'un compte : valeurs des colonnes demandées ou None.
+    
+    Un mot de passe stocké en clair ou avec un ancien coût est re-haché après
+    une connexion réussie.
+    """
+    if table not in TABLES_COMPTES:
+        raise ValueError(f"Table de comptes inconnue : {table}")
+    
+    ligne = conn.execute(f'''
+        SELECT mot_de_passe, {colonnes} FROM {table}
+        WHERE nom_utilisateur = ?
+    ''', (nom_utilisateur,)).fetchone()
+    if ligne is None:
+        _verifier_factice(mot_de_passe)
+        return None
+    
+    empreinte = ligne[0]
+    if not verifier(mot_de_passe, empreinte):
+        return None
+    
+    if doit_rehacher(empreinte):
+        # Ne remplace que la valeur lue (une autre session a pu re-hacher entre-temps)
+        conn.execute(f'''
+            UPDATE {table} SET mot_de_passe = ?
+            WHERE nom_utilisateur = ? AND mot_de_passe = ?
+        ''', (hacher(mot_de_passe), nom_utilisateur, empreinte))
+        conn.commit()
+    
+    return ligne[1:]
@@ -0,0 +1,129 @@
+"""Exécution des requêtes hors du thread Tk.
+
+Les fonctions soumises reçoivent une connexion empruntée au pool le temps de
+la tâche et s'exécutent en arrière-plan ; leurs résultats reviennent dans la
+boucle Tk par root.after. Une nouvelle tâche de même clé rend les précédentes
+caduques : seul le résultat de la dernière est appliqué.
+"""
+import queue
+import tkinter as tk
+from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+import database
+
+# Intervalle de relève des résultats par la boucle Tk (millisecondes)
+INTERVALLE_RELEVE = 20
+
+
+class ExecuteurTaches:
+    """Pool de threads de travail rattaché à une fenêtre Tk"""
+    
+    def __init__(self, root, nb_threads=2, chemin=database.CHEMIN_BD):
+        self.root = root
+        self.chemin = chemin
+        self._executeur = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix="taches")
+        self._resultats = queue.Queue()
+        self._generations = {}
+        self._en_cours = {}
+        self._nb_en_attente = 0
+        self._releve_prevue = False
+    
+    def soumettre(self, fonction, *args, cle=None, succes=None, erreur=None):
+        """Exécuter fonction(conn, *args) en arrière-plan.
+        
+        succes(resultat) ou erreur(exception) sont appelés dans le thread Tk,
+        sauf si une tâche plus récente de même clé a été soumise entre-temps.
+        """
+        generation = None
+        if cle is not None:
+            generation = self._generations.get(cle, 0) + 1
+            self._generations[cle] = generation
+            # Une tâche remplacée qui n'a pas encore démarré n'est pas exécutée
+            precedente = self._en_cours.pop(cle, None)
+            if precedente is not None and precedente.cancel():
+                self._nb_en_attente -= 1
+        
+        def executer():
+            try:
+                # Connexion rendue au pool après chaque tâche : les threads de
+                # travail, recréés à chaque ouverture d'espace, n'en gardent aucune
+                with database.pool(self.chemin).acquerir() as conn:
+                    resultat = fonction(conn, *args)
+            except Exception as e:
+                self._resultats.put((cle, generation, erreur or self._erreur_par_defaut, e))
+            else:
+                self._resultats.put((cle, generation, succes, resultat))
+        
+        future = self._executeur.submit(executer)
+        if cle is not None:
+            self._en_cours[cle] = future
+        self._nb_en_attente += 1
+        self._planifier_releve()
+        return future
+    
+    def annuler(self, cle):
+        """Ignorer le résultat de la tâche en cours pour cette clé"""
+        self._generations[cle] = self._generations.get(cle, 0) + 1
+        precedente = self._en_cours.pop(cle, None)
+        if precedente is not None and precedente.cancel():
+            self._nb_en_attente -= 1
+    
+    def _planifier_releve(self):
+        if not self._releve_prevue and self._nb_en_attente > 0:
+            self._releve_prevue = True
+            self.root.after(INTERVALLE_RELEVE, self._relever)
+    
+    def _relever(self):
+        """Appliquer dans le thread Tk les résultats arrivés depuis la dernière relève"""
+        self._releve_prevue = False
+        while True:
+            try:
+                cle, generation, rappel, valeur = self._resultats.get_nowait()
+            except queue.Empty:
+                break
+            
+            self._nb_en_attente -= 1
+            if cle is not None:
+                if generation != self._generations.get(cle):
+                    continue  # résultat périmé
+                self._en_cours.pop(cle, None)
+            
+            if rappel is not None:
+                try:
+                    rappel(valeur)
+                except tk.TclError:
+                    pass  # fenêtre fermée avant l'arrivée du résultat
+        
+        try:
+            self._planifier_releve()
+        except tk.TclError:
+            pass  # fenêtre détruite
+    
+    def _erreur_par_defaut(self, exception):
+        messagebox.showerror("Erreur", f"Erreur d'accès à la base de données: {exception}")
+    
+    def fermer(self):
+        """Arrêter les threads de travail (les tâches non démarrées sont abandonnées)"""
+        self._executeur.shutdown(wait=False, cancel_futures=True)
+
+
+def regrouper(widget, fonction):
+    """Déclencheur qui regroupe ses appels en un seul appel de fonction().
+    
+    Les événements reçus pendant un même cycle (changement de mois puis de
+    jour, etc.) ne produisent qu'un appel, au prochain passage inactif de Tk.
+    """
+    prevu = False
+    
+    def executer():
+        nonlocal prevu
+        prevu = False
+        fonction()
+    
+    def declencher(*args):
+        nonlocal prevu
+        if not prevu:
+            prevu = True
+            widget.after_idle(executer)
+    
+    return declencher
@@ -0,0 +1,54 @@
+"""Base temporaire migrée, avec deux médecins et deux patients, pour chaque test"""
+import sqlite3
+from datetime import datetime
+import pytest
+import database
+from migrations import MIGRATIONS, appliquer_migrations
+
+# Instant de référence des tests : les dates utilisées sont dans le futur
+MAINTENANT = datetime(2030, 1, 7, 7, 0)
+JOUR = "2030-01-08"
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = database.ouvrir_connexion(str(tmp_path / "hopital.db"))
+    appliquer_migrations(conn)
+    with conn:
+        conn.executemany('''
+            INSERT INTO medecins (id, nom_complet, specialite, nom_utilisateur, mot_de_passe)
+            VALUES (?, ?, ?, ?, 'x')
+        ''', [(1, "Hélène Martin", "Cardiologie", "hmartin"), (2, "Karim Roux", "Pédiatrie", "kroux")])
+        conn.executemany('''
+            INSERT INTO patients (id, nom_complet, nom_utilisateur, mot_de_passe)
+            VALUES (?, ?, ?, 'x')
+        ''', [(1, "Alice Durand", "adurand"), (2, "Bruno Petit", "bpetit")])
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def ancienne_base(tmp_path):
+    """Base de l'ancien système : tables d'origine, dates JJ/MM/AAAA et user_version 0"""
+    chemin = str(tmp_path / "ancienne.db")
+    conn = sqlite3.connect(chemin)
+    for instruction in MIGRATIONS[0][2]:
+        conn.execute(instruction)
+    conn.execute('''
+        INSERT INTO medecins (id, nom_complet, specialite, nom_utilisateur, mot_de_passe)
+        VALUES (1, 'Hélène Martin', 'Cardiologue', 'hmartin', 'x')
+    ''')
+    conn.execute('''
+        INSERT INTO patients (id, nom_complet, nom_utilisateur, mot_de_passe)
+        VALUES (1, 'Alice Durand', 'adurand', 'x')
+    ''')
+    conn.executemany('''
+        INSERT INTO rendez_vous (patient_id, medecin_id, date_rdv, heure_rdv) VALUES (1, 1, ?, ?)
+    ''', [("09/01/2030", "10:00"), ("2030-01-10", "09:00"), ("08/01/2030", "09:30")])
+    conn.execute('''
+        INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+        VALUES (1, '08/01/2030', '09:00', '10:00')
+    ''')
+    conn.commit()
+    conn.close()
+    return chemin
@@ -0,0 +1,153 @@
+"""Masques de disponibilite_jour et plages horaires des médecins"""
+from datetime import datetime
+import booking
+import validation
+from intervalles import Intervalles
+from conftest import MAINTENANT, JOUR
+
+
+def masques(conn, medecin_id=1, jour=JOUR):
+    return conn.execute('''
+        SELECT masque_defini, masque_occupe FROM disponibilite_jour
+        WHERE medecin_id = ? AND date_jour = ?
+    ''', (medecin_id, jour)).fetchone()
+
+
+def test_jour_sans_plage_grille_complete(conn):
+    assert masques(conn) is None
+    assert booking.obtenir_heures_libres(conn, 1, JOUR) == booking.GRILLE
+
+
+def test_plage_remplit_masque_defini(conn):
+    ok, _plage_id = booking.ajouter_creneau(conn, 1, JOUR, "09:00", "10:30", maintenant=MAINTENANT)
+    assert ok
+    assert masques(conn)[0] == booking.masque_depuis_heures(["09:00", "09:30", "10:00"])
+    assert booking.obtenir_heures_libres(conn, 1, JOUR) == ["09:00", "09:30", "10:00"]
+
+
+def test_plages_contigues_fusionnees(conn):
+    booking.ajouter_creneau(conn, 1, JOUR, "09:00", "10:00", maintenant=MAINTENANT)
+    booking.ajouter_creneau(conn, 1, JOUR, "10:00", "11:00", maintenant=MAINTENANT)
+    assert booking.lister_plages_medecin(conn, 1, JOUR) == [("09:00", "11:00", 1)]
+    assert booking.ajouter_creneau(conn, 1, JOUR, "09:30", "10:30", maintenant=MAINTENANT) == (
+        False, "Ce créneau existe déjà")
+
+
+def test_rendez_vous_occupe_puis_libere_le_creneau(conn):
+    ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    assert ok
+    assert masques(conn)[1] == booking.masque_depuis_heures(["09:00"])
+    assert "09:00" not in booking.obtenir_heures_libres(conn, 1, JOUR)
+    # Le créneau du rendez-vous modifié reste proposé
+    assert "09:00" in booking.obtenir_heures_libres(conn, 1, JOUR, exclure_rdv_id=rdv_id)
+    
+    booking.annuler_rendez_vous(conn, rdv_id)
+    assert masques(conn)[1] == 0
+    
+    booking.reactiver_rendez_vous(conn, rdv_id)
+    booking.deplacer_rendez_vous(conn, rdv_id, 1, JOUR, "10:00", 0)
+    assert masques(conn)[1] == booking.masque_depuis_heures(["10:00"])
+    
+    conn.execute("DELETE FROM rendez_vous WHERE id = ?", (rdv_id,))
+    assert masques(conn)[1] == 0
+
+
+def test_suppression_de_plage_recalcule_le_masque(conn):
+    booking.ajouter_creneau(conn, 1, JOUR, "09:00", "10:00", maintenant=MAINTENANT)
+    booking.ajouter_creneau(conn, 1, JOUR, "14:00", "15:00", maintenant=MAINTENANT)
+    booking.supprimer_creneau(conn, 1, JOUR, "09:00", "10:00")
+    assert booking.obtenir_heures_libres(conn, 1, JOUR) == ["14:00", "14:30"]
+
+
+def test_plages_mal_formees_refusees(conn):
+    for debut, fin in [("9", "17"), ("08:15", "10:00"), ("08:00", "10:15"), ("08:00", "17:30"), ("10:00", "09:00")]:
+        ok, _message = booking.ajouter_creneau(conn, 1, JOUR, debut, fin, maintenant=MAINTENANT)
+        assert not ok
+    ok, _message = booking.creneaux_recurrents(conn, 1, [1], "9", "17", JOUR, "2030-02-28", maintenant=MAINTENANT)
+    assert not ok
+    assert booking.lister_plages_medecin(conn, 1, JOUR) == []
+
+
+def test_plages_mal_formees_lues_de_la_meme_facon(conn):
+    plages = {"2030-02-01": ("9", "17"), "2030-02-02": ("08:15", "10:00"), "2030-02-03": ("9:00", "10:00")}
+    for jour, (debut, fin) in plages.items():
+        conn.execute('''
+            INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+            VALUES (1, ?, ?, ?)
+        ''', (jour, debut, fin))
+    for jour in plages:
+        assert booking.obtenir_creneaux_definis_medecin(conn, 1, jour) == booking.obtenir_heures_libres(conn, 1, jour)
+    assert booking.obtenir_heures_libres(conn, 1, "2030-02-01") == []
+    assert booking.obtenir_heures_libres(conn, 1, "2030-02-03") == ["09:00", "09:30"]
+
+
+def test_creneaux_recurrents(conn):
+    # Mardis de janvier 2030 à partir du 8
+    ok, nb_crees = booking.creneaux_recurrents(conn, 1, [1], "08:00", "09:00", JOUR, "2030-01-31",
+                                               maintenant=MAINTENANT)
+    assert (ok, nb_crees) == (True, 4)
+    ok, nb_crees = booking.creneaux_recurrents(conn, 1, [1], "08:00", "09:00", JOUR, "2030-01-31",
+                                               maintenant=MAINTENANT)
+    assert (ok, nb_crees) == (True, 0)
+
+
+def test_intervalles():
+    plages = Intervalles([("10:00", "11:00"), ("09:00", "10:00"), ("14:00", "15:00"), ("9", "17")])
+    assert list(plages) == [("09:00", "11:00"), ("14:00", "15:00")]
+    assert plages.contient("10:30", 30)
+    assert not plages.contient("10:30", 60)
+    assert plages.creneaux() == ["09:00", "09:30", "10:00", "10:30", "14:00", "14:30"]
+
+
+def test_prochains_creneaux_libres(conn):
+    booking.ajouter_creneau(conn, 1, JOUR, "09:00", "10:00", maintenant=MAINTENANT)
+    booking.reserver_creneau(conn, 2, 1, JOUR, "09:00")
+    # Le 7 à 7h, tous les créneaux de la journée sont réservables (grille complète sans plage)
+    creneaux = booking.prochains_creneaux_libres(conn, "Cardiologie", nombre=20, maintenant=MAINTENANT)
+    assert creneaux[0] == ("2030-01-07", "08:00", 1, "Hélène Martin")
+    assert [c[:2] for c in creneaux if c[0] == JOUR] == [(JOUR, "09:30")]
+
+
+
+def test_prochains_creneaux_a_partir_de(conn):
+    ok, debut = validation.valider_debut_recherche("08/01/2030", "14:00", maintenant=MAINTENANT)
+    assert ok and debut == datetime(2030, 1, 8, 14, 0)
+    assert booking.prochains_creneaux_libres(conn, "Pédiatrie", 2, debut, maintenant=MAINTENANT) == [
+        (JOUR, "14:00", 2, "Karim Roux"), (JOUR, "14:30", 2, "Karim Roux")]
+    
+    assert validation.valider_debut_recherche("8 janvier", "14:00", maintenant=MAINTENANT) == (
+        False, "Date invalide (JJ/MM/AAAA requis)")
+    assert not validation.valider_debut_recherche("06/01/2030", "14:00", maintenant=MAINTENANT)[0]
+    assert not validation.valider_debut_recherche("08/01/2030", "12:00", maintenant=MAINTENANT)[0]
+
+
+def test_disponibilites_mois(conn):
+    booking.ajouter_creneau(conn, 1, JOUR, "09:00", "10:30", maintenant=MAINTENANT)
+    booking.reserver_creneau(conn, 2, 1, JOUR, "09:30")
+    mois = booking.disponibilites_mois(conn, 1, 2030, 1, maintenant=MAINTENANT)
+    assert len(mois) == 31
+    # Jours passés fermés ; le 7 à 7h, toute la journée reste réservable
+    assert mois["2030-01-06"] == 0
+    assert mois["2030-01-07"] == mois["2030-01-31"] == len(booking.GRILLE)
+    assert mois[JOUR] == 2
+    
+    # Le 7 à 10h, seuls les créneaux après 10h30 restent
+    mois = booking.disponibilites_mois(conn, 1, 2030, 1, maintenant=datetime(2030, 1, 7, 10, 0))
+    assert mois["2030-01-07"] == 10
+
+
+def test_plage_mal_formee_ignoree_par_la_fusion(conn):
+    conn.execute('''
+        INSERT INTO creneaux_disponibles (medecin_id, date_creneau, heure_debut, heure_fin)
+        VALUES (1, ?, '08:00', '9')
+    ''', (JOUR,))
+    conn.commit()
+    
+    ok, plage_id = booking.ajouter_creneau(conn, 1, JOUR, "10:00", "11:00", maintenant=MAINTENANT)
+    assert ok
+    assert booking.lister_plages_medecin(conn, 1, JOUR) == [("08:00", "9", 1), ("10:00", "11:00", 1)]
+    assert conn.execute("SELECT heure_debut FROM creneaux_disponibles WHERE id = ?", (plage_id,)).fetchone() == ("10:00",)
+    assert booking.obtenir_heures_libres(conn, 1, JOUR) == ["10:00", "10:30"]
+    
+    ok, nb_crees = booking.creneaux_recurrents(conn, 1, [1], "08:30", "09:00", JOUR, JOUR, maintenant=MAINTENANT)
+    assert (ok, nb_crees) == (True, 1)
@@ -0,0 +1,52 @@
+"""Export des rendez-vous (exportation.py)"""
+import csv
+import io
+import json
+import booking
+import database
+import exportation
+from migrations import VERSION_SCHEMA, version_schema
+from conftest import JOUR
+
+
+def reserver(conn):
+    booking.reserver_creneau(conn, 1, 1, JOUR, "09:00", urgent=1)
+    _ok, rdv_id = booking.reserver_creneau(conn, 2, 2, "2030-01-09", "10:00")
+    booking.annuler_rendez_vous(conn, rdv_id)
+    booking.reserver_creneau(conn, 2, 1, "2030-01-09", "08:00")
+
+
+def test_exporter_csv(conn):
+    reserver(conn)
+    sortie = io.StringIO()
+    assert exportation.exporter(conn, sortie, "csv", taille_lot=2) == 3
+    
+    lignes = list(csv.reader(io.StringIO(sortie.getvalue())))
+    assert lignes[0] == list(exportation.COLONNES)
+    assert [ligne[1:5] for ligne in lignes[1:]] == [
+        [JOUR, "09:00", "Alice Durand", "Hélène Martin"],
+        ["2030-01-09", "08:00", "Bruno Petit", "Hélène Martin"],
+        ["2030-01-09", "10:00", "Bruno Petit", "Karim Roux"],
+    ]
+
+
+def test_exporter_jsonl_filtre(conn):
+    reserver(conn)
+    sortie = io.StringIO()
+    assert exportation.exporter(conn, sortie, "jsonl", date_debut="2030-01-09", statut="confirmé") == 1
+    
+    ligne = json.loads(sortie.getvalue())
+    assert (ligne["date"], ligne["heure"], ligne["patient"], ligne["statut"]) == (
+        "2030-01-09", "08:00", "Bruno Petit", "confirmé")
+    assert exportation.exporter(conn, io.StringIO(), "jsonl", medecin_id=2, urgent=True) == 0
+
+
+def test_main_migre_une_ancienne_base(ancienne_base, tmp_path):
+    sortie = tmp_path / "export.jsonl"
+    assert exportation.main(["--base", ancienne_base, "--sortie", str(sortie), "--du", "09/01/2030"]) == 0
+    
+    lignes = [json.loads(texte) for texte in sortie.read_text(encoding="utf-8").splitlines()]
+    assert [(ligne["date"], ligne["heure"]) for ligne in lignes] == [("2030-01-09", "10:00"), ("2030-01-10", "09:00")]
+    conn = database.ouvrir_connexion(ancienne_base)
+    assert version_schema(conn) == VERSION_SCHEMA
+    conn.close()
@@ -0,0 +1,88 @@
+"""Import en masse (importation.py)"""
+import importation
+import securite
+from conftest import JOUR
+
+
+def test_importer_medecins_rejets_et_doublons(conn):
+    lignes = [
+        (2, {"nom_complet": "Léa Simon", "specialite": "Dentiste", "nom_utilisateur": "LSimon",
+             "mot_de_passe": "secret"}),
+        (3, {"nom_complet": "Léa Simon", "specialite": "Dentiste", "nom_utilisateur": "lsimon",
+             "mot_de_passe": "secret"}),
+        (4, {"nom_complet": "Paul Leroy", "specialite": "Astrologie", "nom_utilisateur": "pleroy",
+             "mot_de_passe": "secret"}),
+        (5, {"nom_complet": "Hélène Martin", "specialite": "Cardiologue", "nom_utilisateur": "hmartin",
+             "mot_de_passe": "secret"}),
+        (6, None),
+    ]
+    erreurs = []
+    rapport = importation.importer(conn, "medecins", lignes, taille_lot=2,
+                                   signaler_erreur=lambda numero, message: erreurs.append(numero))
+    
+    assert (rapport["lues"], rapport["importees"], rapport["rejetees"]) == (5, 1, 4)
+    assert [numero for numero, _message in rapport["erreurs"]] == erreurs == [3, 4, 5, 6]
+    assert rapport["erreurs"][0] == (3, "nom_utilisateur: Ce nom d'utilisateur existe déjà")
+    assert rapport["erreurs"][3] == (6, "Ligne illisible")
+    assert conn.execute("SELECT nom_complet, specialite FROM medecins WHERE nom_utilisateur = 'lsimon'"
+                        ).fetchall() == [("Léa Simon", "Dentiste")]
+
+
+def test_importer_rendez_vous(conn):
+    lignes = [
+        (2, {"patient": "adurand", "medecin": "HMARTIN", "date": "08/01/2030", "heure": "9:00", "urgent": "oui"}),
+        (3, {"patient": "bpetit", "medecin": "hmartin", "date": JOUR, "heure": "09:00"}),
+        (4, {"patient": "bpetit", "medecin": "hmartin", "date": JOUR, "heure": "09:00", "statut": "annulé"}),
+        (5, {"patient": "inconnu", "medecin": "kroux", "date": JOUR, "heure": "09:00"}),
+        (6, {"patient": "bpetit", "medecin": "kroux", "date": "31/02/2030", "heure": "12:00"}),
+    ]
+    rapport = importation.importer(conn, "rendez_vous", lignes)
+    
+    assert (rapport["importees"], rapport["rejetees"]) == (2, 3)
+    erreurs = dict(rapport["erreurs"])
+    assert erreurs[3] == "Ce créneau est déjà réservé"
+    assert erreurs[5] == "patient: inconnu introuvable"
+    assert erreurs[6].startswith("date: ") and "heure: " in erreurs[6]
+    assert conn.execute('''
+        SELECT patient_id, medecin_id, date_rdv, heure_rdv, urgent, statut FROM rendez_vous ORDER BY id
+    ''').fetchall() == [(1, 1, JOUR, "09:00", 1, "confirmé"), (2, 1, JOUR, "09:00", 0, "annulé")]
+
+
+def test_importer_fichiers_csv_et_jsonl(conn, tmp_path):
+    fichier_csv = tmp_path / "patients.csv"
+    fichier_csv.write_text("nom_complet,nom_utilisateur,mot_de_passe,telephone,age,adresse\n"
+                           "Emma Garcia,egarcia,secret1,0612345678,34,3 rue de la Paix\n", encoding="utf-8")
+    fichier_jsonl = tmp_path / "patients.jsonl"
+    fichier_jsonl.write_text('{"nom_complet": "Nora Simon", "nom_utilisateur": "nsimon", "mot_de_passe": "secret2", '
+                             '"telephone": "0698765432", "age": 51, "adresse": "8 avenue Foch"}\n'
+                             '\n'
+                             'pas du JSON\n', encoding="utf-8")
+    
+    assert importation.importer_fichier(conn, "patients", str(fichier_csv))["importees"] == 1
+    rapport = importation.importer_fichier(conn, "patients", str(fichier_jsonl))
+    assert (rapport["lues"], rapport["importees"], rapport["erreurs"]) == (2, 1, [(3, "Ligne illisible")])
+    assert conn.execute('''
+        SELECT nom_utilisateur, telephone, age FROM patients WHERE id > 2 ORDER BY id
+    ''').fetchall() == [("egarcia", "06 12 34 56 78", 34), ("nsimon", "06 98 76 54 32", 51)]
+
+
+def test_mots_de_passe_haches_hors_transaction(conn, monkeypatch):
+    hacher_lot = securite.hacher_lot
+    en_transaction = []
+    
+    def espion(mots_de_passe, nb_threads=None):
+        en_transaction.append(conn.in_transaction)
+        return hacher_lot(mots_de_passe, nb_threads)
+    
+    monkeypatch.setattr(securite, "hacher_lot", espion)
+    lignes = [
+        (2, {"nom_complet": "Emma Garcia", "nom_utilisateur": "egarcia", "mot_de_passe": "secret1",
+             "telephone": "06 12 34 56 78", "age": "34", "adresse": "3 rue de la Paix"}),
+        (3, {"nom_complet": "Nora Simon", "nom_utilisateur": "nsimon", "mot_de_passe": "secret2",
+             "telephone": "06 98 76 54 32", "age": "51", "adresse": "8 avenue Foch"}),
+    ]
+    rapport = importation.importer(conn, "patients", lignes)
+    
+    assert rapport["importees"] == 2
+    assert en_transaction == [False]
+    assert securite.authentifier(conn, "patients", "nsimon", "secret2") is not None
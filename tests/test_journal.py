@@ -0,0 +1,54 @@
+"""Journal des modifications (journal_modifications) et son élagage"""
+import booking
+from conftest import MAINTENANT, JOUR
+
+
+def test_ecritures_consignees(conn):
+    depuis = booking.derniere_modification(conn)
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    _ok, plage_id = booking.ajouter_creneau(conn, 2, JOUR, "09:00", "10:00", maintenant=MAINTENANT)
+    
+    dernier, modifications = booking.modifications_depuis(conn, depuis)
+    assert dernier == booking.derniere_modification(conn)
+    assert modifications == [("rendez_vous", rdv_id, 1, JOUR), ("creneaux_disponibles", plage_id, 2, JOUR)]
+    assert booking.modifications_depuis(conn, dernier) == (dernier, [])
+
+
+def test_deplacement_signale_ancien_et_nouvel_agenda(conn):
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    depuis = booking.derniere_modification(conn)
+    booking.deplacer_rendez_vous(conn, rdv_id, 2, "2030-01-09", "09:00", 0)
+    
+    _dernier, modifications = booking.modifications_depuis(conn, depuis)
+    assert modifications == [("rendez_vous", rdv_id, 1, JOUR), ("rendez_vous", rdv_id, 2, "2030-01-09")]
+
+
+def test_trop_de_modifications_rechargement(conn):
+    depuis = booking.derniere_modification(conn)
+    for heure in ("09:00", "09:30", "10:00"):
+        booking.reserver_creneau(conn, 1, 1, JOUR, heure)
+    
+    dernier, modifications = booking.modifications_depuis(conn, depuis, limite=2)
+    assert modifications is None
+    assert dernier == booking.derniere_modification(conn)
+
+
+def test_entrees_elaguees_rechargement(conn):
+    for heure in ("09:00", "09:30"):
+        booking.reserver_creneau(conn, 1, 1, JOUR, heure)
+    conn.execute("DELETE FROM journal_modifications WHERE id = (SELECT MIN(id) FROM journal_modifications)")
+    
+    assert booking.modifications_depuis(conn, 0)[1] is None
+
+
+def test_elagage_automatique(conn):
+    conn.executemany('''
+        INSERT INTO journal_modifications (table_modifiee, ligne_id, medecin_id, date_jour)
+        VALUES ('rendez_vous', ?, 1, ?)
+    ''', ((i, JOUR) for i in range(12_500)))
+    conn.commit()
+    
+    # Élagage toutes les 1 000 entrées : 10 000 gardées, plus celles ajoutées depuis
+    nombre, premier, dernier = conn.execute(
+        "SELECT COUNT(*), MIN(id), MAX(id) FROM journal_modifications").fetchone()
+    assert (nombre, premier, dernier) == (10_500, 2_001, 12_500)
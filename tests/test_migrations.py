@@ -0,0 +1,21 @@
+"""Migrations du schéma sur une base de l'ancien système"""
+import booking
+import database
+from migrations import VERSION_SCHEMA, appliquer_migrations, version_schema
+
+
+def test_dates_converties_au_format_iso(ancienne_base):
+    conn = database.ouvrir_connexion(ancienne_base)
+    assert version_schema(conn) == 0
+    assert appliquer_migrations(conn) == VERSION_SCHEMA
+    
+    assert conn.execute("SELECT date_rdv FROM rendez_vous ORDER BY id").fetchall() == [
+        ("2030-01-09",), ("2030-01-10",), ("2030-01-08",)]
+    assert conn.execute("SELECT date_creneau FROM creneaux_disponibles").fetchall() == [("2030-01-08",)]
+    # Les dates ISO se trient et se filtrent comme du texte
+    assert [rdv[1] for rdv in booking.rendez_vous_patient(conn, 1)] == ["2030-01-08", "2030-01-09", "2030-01-10"]
+    
+    # Seconde ouverture : rien à refaire
+    assert appliquer_migrations(conn) == VERSION_SCHEMA
+    assert conn.execute("SELECT COUNT(*) FROM rendez_vous WHERE date_rdv GLOB '*/*'").fetchone() == (0,)
+    conn.close()
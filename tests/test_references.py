@@ -0,0 +1,77 @@
+"""Cache des médecins (versions_donnees) et recherche par nom ou spécialité"""
+import booking
+import references
+from recherche import IndexMedecins
+
+
+def version(conn):
+    return conn.execute("SELECT version FROM versions_donnees WHERE nom = 'medecins'").fetchone()[0]
+
+
+def test_version_incrementee_par_les_medecins(conn):
+    depart = version(conn)
+    conn.execute('''
+        INSERT INTO medecins (nom_complet, specialite, nom_utilisateur, mot_de_passe)
+        VALUES ('Léa Simon', 'Dermatologie', 'lsimon', 'x')
+    ''')
+    assert version(conn) == depart + 1
+    conn.execute("UPDATE medecins SET specialite = 'Neurologie' WHERE nom_utilisateur = 'lsimon'")
+    assert version(conn) == depart + 2
+    conn.execute("DELETE FROM medecins WHERE nom_utilisateur = 'lsimon'")
+    assert version(conn) == depart + 3
+
+
+def test_mot_de_passe_sans_effet_sur_la_version(conn):
+    depart = version(conn)
+    conn.execute("UPDATE medecins SET mot_de_passe = 'y' WHERE id = 1")
+    assert version(conn) == depart
+
+
+def test_cache_recharge_apres_invalidation(conn):
+    assert booking.lister_medecins(conn) == [(1, "Hélène Martin", "Cardiologie"), (2, "Karim Roux", "Pédiatrie")]
+    assert references.specialites(conn) == ["Cardiologie", "Pédiatrie"]
+    
+    conn.execute("UPDATE medecins SET specialite = 'Neurologie' WHERE id = 2")
+    conn.commit()
+    # Servi depuis la mémoire jusqu'à l'invalidation (ou l'expiration du délai)
+    assert references.medecin(conn, 2)[2] == "Pédiatrie"
+    references.invalider(conn)
+    assert references.medecin(conn, 2) == (2, "Karim Roux", "Neurologie", "kroux")
+    assert references.specialites(conn) == ["Cardiologie", "Neurologie"]
+    assert references.medecins_specialite(conn, "Pédiatrie") == []
+
+
+def test_version_verifiee_apres_le_delai(conn, monkeypatch):
+    references.medecins(conn)
+    requetes = []
+    conn.set_trace_callback(requetes.append)
+    for texte in ("h", "he", "hel"):
+        references.rechercher_medecins(conn, texte)
+    assert requetes == []
+    
+    # Écriture d'un autre processus : vue après DUREE_VALIDITE
+    conn.execute("UPDATE medecins SET nom_complet = 'Karim Leroy' WHERE id = 2")
+    conn.commit()
+    monkeypatch.setattr(references, "DUREE_VALIDITE", 0)
+    assert references.medecin(conn, 2)[1] == "Karim Leroy"
+
+
+def test_rechercher_medecins(conn):
+    assert references.rechercher_medecins(conn, "") == booking.lister_medecins(conn)
+    assert references.rechercher_medecins(conn, "helene") == [(1, "Hélène Martin", "Cardiologie")]
+    assert references.rechercher_medecins(conn, "PÉDIA") == [(2, "Karim Roux", "Pédiatrie")]
+    assert references.rechercher_medecins(conn, "ardio") == [(1, "Hélène Martin", "Cardiologie")]
+    assert references.rechercher_medecins(conn, "martin pediatrie") == []
+
+
+def test_index_ordre_de_pertinence():
+    index = IndexMedecins([
+        (1, "Paul Dupont", "Cardiologie"),
+        (2, "Carla Roux", "Pédiatrie"),
+        (3, "Marc Petit", "Dermatologie"),
+    ])
+    # Début de nom, puis début de spécialité, puis texte au milieu d'un mot
+    assert [m[0] for m in index.rechercher("car")] == [2, 1]
+    assert [m[0] for m in index.rechercher("atol")] == [3]
+    assert [m[0] for m in index.rechercher("", limite=2)] == [2, 3]
+    assert len(index.rechercher("r", limite=1)) == 1
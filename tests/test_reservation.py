@@ -0,0 +1,90 @@
+"""Réservation, déplacement et réactivation : conflits de créneau"""
+import booking
+from booking import ConflitCreneau
+from conftest import MAINTENANT, JOUR
+
+
+def test_reserver_creneau_deja_pris(conn):
+    ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    assert ok
+    ok, conflit = booking.reserver_creneau(conn, 2, 1, JOUR, "09:00")
+    assert not ok
+    assert isinstance(conflit, ConflitCreneau)
+    assert conflit.rdv_existant_id == rdv_id
+    # Autre médecin, même heure : pas de conflit
+    assert booking.reserver_creneau(conn, 2, 2, JOUR, "09:00")[0]
+
+
+def test_index_unique_sans_verification_prealable(conn, monkeypatch):
+    booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    # Créneau pris entre la vérification et l'insertion : l'index ux_rdv_actif refuse
+    monkeypatch.setattr(booking, "_refus_creneau", lambda *args, **kwargs: None)
+    ok, conflit = booking.reserver_creneau(conn, 2, 1, JOUR, "09:00")
+    assert not ok
+    assert isinstance(conflit, ConflitCreneau)
+    assert not conn.in_transaction
+
+
+def test_creneau_annule_reservable(conn):
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    booking.annuler_rendez_vous(conn, rdv_id)
+    assert booking.reserver_creneau(conn, 2, 1, JOUR, "09:00")[0]
+
+
+def test_prendre_rendez_vous_valide_le_creneau(conn):
+    ok, message = booking.prendre_rendez_vous(conn, 1, 1, JOUR, "12:00", maintenant=MAINTENANT)
+    assert not ok and message == "Heures d'ouverture : 8h-12h et 13h-16h30"
+    assert booking.prendre_rendez_vous(conn, 1, 1, JOUR, "09:00", maintenant=MAINTENANT)[0]
+
+
+def test_deplacer_vers_creneau_pris(conn):
+    _ok, premier = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    _ok, second = booking.reserver_creneau(conn, 2, 1, JOUR, "10:00")
+    ok, conflit = booking.deplacer_rendez_vous(conn, second, 1, JOUR, "09:00", 0)
+    assert not ok
+    assert conflit.rdv_existant_id == premier
+    assert booking.obtenir_rendez_vous(conn, second)[2] == "10:00"
+
+
+def test_deplacer_sur_son_propre_creneau(conn):
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    ok, ligne = booking.deplacer_rendez_vous(conn, rdv_id, 1, JOUR, "09:00", 1)
+    assert ok
+    assert ligne == (rdv_id, 1, 1, JOUR, "09:00", 1, "confirmé")
+
+
+def test_deplacer_rendez_vous_introuvable(conn):
+    assert booking.deplacer_rendez_vous(conn, 999, 1, JOUR, "09:00", 0) == (False, "Rendez-vous introuvable")
+
+
+def test_reactiver_creneau_repris(conn):
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    booking.annuler_rendez_vous(conn, rdv_id)
+    _ok, autre = booking.reserver_creneau(conn, 2, 1, JOUR, "09:00")
+    ok, conflit = booking.reactiver_rendez_vous(conn, rdv_id)
+    assert not ok
+    assert conflit.rdv_existant_id == autre
+    
+    booking.annuler_rendez_vous(conn, autre)
+    ok, ligne = booking.reactiver_rendez_vous(conn, rdv_id)
+    assert ok and ligne[6] == "confirmé"
+    assert booking.reactiver_rendez_vous(conn, rdv_id) == (False, "Ce rendez-vous n'est pas annulé")
+
+
+def test_annuler_deux_fois(conn):
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    assert booking.annuler_rendez_vous(conn, rdv_id)[0]
+    assert booking.annuler_rendez_vous(conn, rdv_id) == (False, "Ce rendez-vous est déjà annulé")
+
+
+def test_creneau_hors_des_plages_refuse(conn):
+    booking.ajouter_creneau(conn, 1, JOUR, "09:00", "10:00", maintenant=MAINTENANT)
+    assert booking.reserver_creneau(conn, 1, 1, JOUR, "14:00") == (False, booking.CRENEAU_NON_PROPOSE)
+    assert booking.reserver_creneau(conn, 1, 1, JOUR, "12:00") == (False, booking.CRENEAU_NON_PROPOSE)
+    
+    ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:30")
+    assert ok
+    assert booking.deplacer_rendez_vous(conn, rdv_id, 1, JOUR, "10:00", 0) == (False, booking.CRENEAU_NON_PROPOSE)
+    # Son propre créneau reste accessible (changement d'urgence)
+    assert booking.deplacer_rendez_vous(conn, rdv_id, 1, JOUR, "09:30", 1)[0]
+    assert booking.deplacer_rendez_vous(conn, rdv_id, 1, JOUR, "09:00", 1)[0]
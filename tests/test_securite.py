@@ -0,0 +1,49 @@
+"""Empreintes des mots de passe et re-hachage à la connexion"""
+import pytest
+import securite
+
+
+def mot_de_passe(conn, nom_utilisateur):
+    return conn.execute("SELECT mot_de_passe FROM patients WHERE nom_utilisateur = ?",
+                        (nom_utilisateur,)).fetchone()[0]
+
+
+def test_hacher_et_verifier():
+    empreinte = securite.hacher("secret")
+    assert securite.est_hache(empreinte)
+    assert securite.verifier("secret", empreinte)
+    assert not securite.verifier("autre", empreinte)
+    assert not securite.doit_rehacher(empreinte)
+    assert securite.verifier("secret", securite.hacher("secret", "pbkdf2_sha256"))
+
+
+def test_mot_de_passe_en_clair_rehache(conn):
+    conn.execute("UPDATE patients SET mot_de_passe = '1234' WHERE id = 1")
+    conn.commit()
+    
+    assert securite.authentifier(conn, "patients", "adurand", "mauvais") is None
+    assert mot_de_passe(conn, "adurand") == "1234"
+    
+    assert securite.authentifier(conn, "patients", "adurand", "1234", "id, nom_complet") == (1, "Alice Durand")
+    empreinte = mot_de_passe(conn, "adurand")
+    assert securite.est_hache(empreinte) and not securite.doit_rehacher(empreinte)
+    assert securite.authentifier(conn, "patients", "adurand", "1234") == (1,)
+
+
+def test_ancien_cout_rehache(conn, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(securite, "SCRYPT_N", 2 ** 10)
+        ancienne = securite.hacher("1234")
+    conn.execute("UPDATE patients SET mot_de_passe = ? WHERE id = 1", (ancienne,))
+    conn.commit()
+    assert securite.doit_rehacher(ancienne)
+    
+    assert securite.authentifier(conn, "patients", "adurand", "1234") == (1,)
+    nouvelle = mot_de_passe(conn, "adurand")
+    assert nouvelle != ancienne and not securite.doit_rehacher(nouvelle)
+
+
+def test_compte_inconnu_ou_table_refusee(conn):
+    assert securite.authentifier(conn, "patients", "inconnu", "1234") is None
+    with pytest.raises(ValueError):
+        securite.authentifier(conn, "rendez_vous", "adurand", "1234")
@@ -0,0 +1,93 @@
+"""resume_quotidien, statistiques administrateur et pagination de la liste"""
+import booking
+from conftest import JOUR
+
+
+def resume(conn):
+    return conn.execute('''
+        SELECT date_rdv, medecin_id, statut, urgent, nb FROM resume_quotidien
+        WHERE nb > 0 ORDER BY date_rdv, medecin_id, statut, urgent
+    ''').fetchall()
+
+
+def toutes_les_pages(conn, taille=2, **filtres):
+    lignes, apres = [], None
+    while True:
+        page = booking.page_rendez_vous(conn, apres=apres, taille=taille, **filtres)
+        if not page:
+            return lignes
+        lignes.extend(page)
+        apres = booking.cle_page(page[-1])
+
+
+def test_resume_suit_les_ecritures(conn):
+    _ok, rdv_id = booking.reserver_creneau(conn, 1, 1, JOUR, "09:00", urgent=1)
+    assert resume(conn) == [(JOUR, 1, "confirmé", 1, 1)]
+    
+    booking.annuler_rendez_vous(conn, rdv_id)
+    assert resume(conn) == [(JOUR, 1, "annulé", 1, 1)]
+    
+    booking.reactiver_rendez_vous(conn, rdv_id)
+    booking.deplacer_rendez_vous(conn, rdv_id, 2, "2030-01-09", "10:00", 0)
+    assert resume(conn) == [("2030-01-09", 2, "confirmé", 0, 1)]
+    
+    conn.execute("DELETE FROM rendez_vous WHERE id = ?", (rdv_id,))
+    assert resume(conn) == []
+
+
+def test_statistiques_et_tableau_de_bord(conn):
+    booking.reserver_creneau(conn, 1, 1, JOUR, "09:00", urgent=1)
+    _ok, rdv_id = booking.reserver_creneau(conn, 2, 1, JOUR, "09:30")
+    booking.annuler_rendez_vous(conn, rdv_id)
+    booking.reserver_creneau(conn, 1, 2, "2030-01-09", "09:00")
+    
+    assert booking.statistiques_rendez_vous(conn) == {"total": 3, "confirmes": 2, "annules": 1, "urgents": 1}
+    assert booking.statistiques_rendez_vous(conn, medecin_id=1, statut="annulé")["total"] == 1
+    assert booking.tableau_de_bord(conn, "medecin") == [
+        ("Dr. Hélène Martin", 2, 1, 1, 1, 50.0),
+        ("Dr. Karim Roux", 1, 1, 0, 0, 0.0),
+    ]
+
+
+def test_suppression_medecin_statistiques_egales_a_la_liste(conn):
+    booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    booking.reserver_creneau(conn, 2, 2, JOUR, "09:00")
+    
+    conn.execute("DELETE FROM medecins WHERE id = 2")
+    conn.commit()
+    
+    assert booking.statistiques_rendez_vous(conn)["total"] == len(toutes_les_pages(conn)) == 1
+    assert [ligne[0] for ligne in booking.tableau_de_bord(conn, "specialite")] == ["Cardiologie"]
+    # Les rendez-vous du médecin supprimé sont conservés
+    assert conn.execute("SELECT COUNT(*) FROM rendez_vous WHERE medecin_id = 2").fetchone()[0] == 1
+
+
+def test_suppression_patient_statistiques_egales_a_la_liste(conn):
+    booking.reserver_creneau(conn, 1, 1, JOUR, "09:00")
+    booking.reserver_creneau(conn, 2, 1, JOUR, "09:30")
+    _ok, rdv_id = booking.reserver_creneau(conn, 2, 1, JOUR, "10:00")
+    booking.annuler_rendez_vous(conn, rdv_id)
+    conn.execute("DELETE FROM patients WHERE id = 2")
+    conn.commit()
+    
+    assert booking.statistiques_rendez_vous(conn) == {"total": 1, "confirmes": 1, "annules": 0, "urgents": 0}
+    assert len(toutes_les_pages(conn)) == 1
+    assert conn.execute("SELECT COUNT(*) FROM rendez_vous WHERE patient_id = 2").fetchone()[0] == 2
+    
+    # Les rendez-vous restants du patient supprimé ne sont plus comptés, même modifiés
+    booking.reactiver_rendez_vous(conn, rdv_id)
+    conn.execute("DELETE FROM rendez_vous WHERE patient_id = 2 AND heure_rdv = '09:30'")
+    conn.commit()
+    assert booking.statistiques_rendez_vous(conn)["total"] == 1
+
+
+def test_pagination_par_cle(conn):
+    for heure in ("09:00", "09:30", "10:00"):
+        booking.reserver_creneau(conn, 1, 1, JOUR, heure)
+        booking.reserver_creneau(conn, 2, 2, JOUR, heure)
+    
+    lignes = toutes_les_pages(conn, taille=4)
+    assert len(lignes) == 6
+    assert [booking.cle_page(ligne) for ligne in lignes] == sorted(booking.cle_page(ligne) for ligne in lignes)
+    assert lignes == list(booking.iterer_rendez_vous(conn, taille_lot=4))
+    assert len(toutes_les_pages(conn, medecin_id=2)) == 3
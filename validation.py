@@ -0,0 +1,197 @@
+"""Validation des données saisies ou importées (patients et médecins).
+
+Chaque validateur retourne (True, valeur nettoyée) ou (False, message) ; ils
+sont partagés par les formulaires des espaces et par l'import en masse.
+"""
+import re
+from datetime import datetime
+from booking import SPECIALITES, valider_date, valider_heure
+from dates import date_depuis_affichage
+
+
+def valider_nom_complet(nom):
+    """Valider le nom complet (lettres, espaces, tirets uniquement)"""
+    if not nom or not nom.strip():
+        return False, "Le nom complet ne peut pas être vide"
+    
+    nom = nom.strip()
+    if len(nom) < 2:
+        return False, "Le nom complet doit contenir au moins 2 caractères"
+    
+    if len(nom) > 50:
+        return False, "Le nom complet ne peut pas dépasser 50 caractères"
+    
+    # Seules lettres, espaces, tirets et apostrophes autorisés
+    if not re.match(r"^[a-zA-ZÀ-ÿ\s\-']+$", nom):
+        return False, "Le nom ne peut contenir que des lettres, espaces, tirets et apostrophes"
+    
+    return True, nom
+
+
+def valider_nom_utilisateur(username):
+    """Valider le nom d'utilisateur (lettres et chiffres uniquement)"""
+    if not username or not username.strip():
+        return False, "Le nom d'utilisateur ne peut pas être vide"
+    
+    username = username.strip()
+    if len(username) < 3:
+        return False, "Le nom d'utilisateur doit contenir au moins 3 caractères"
+    
+    if len(username) > 20:
+        return False, "Le nom d'utilisateur ne peut pas dépasser 20 caractères"
+    
+    # Seules lettres et chiffres autorisés
+    if not re.match(r"^[a-zA-Z0-9]+$", username):
+        return False, "Le nom d'utilisateur ne peut contenir que des lettres et chiffres"
+    
+    return True, username.lower()
+
+
+def valider_mot_de_passe(password):
+    """Valider le mot de passe (minimum 4 caractères)"""
+    if not password:
+        return False, "Le mot de passe ne peut pas être vide"
+    
+    if len(password) < 4:
+        return False, "Le mot de passe doit contenir au moins 4 caractères"
+    
+    if len(password) > 30:
+        return False, "Le mot de passe ne peut pas dépasser 30 caractères"
+    
+    return True, password
+
+
+def valider_telephone(telephone):
+    """Valider le numéro de téléphone (format français)"""
+    if not telephone or not telephone.strip():
+        return False, "Le numéro de téléphone ne peut pas être vide"
+    
+    telephone = telephone.strip().replace(" ", "").replace("-", "").replace(".", "")
+    
+    # Format français : 10 chiffres commençant par 0
+    if not re.match(r"^0[1-9]\d{8}$", telephone):
+        return False, "Format de téléphone invalide (ex: 0123456789)"
+    
+    # Formater le numéro
+    formatted = f"{telephone[:2]} {telephone[2:4]} {telephone[4:6]} {telephone[6:8]} {telephone[8:]}"
+    return True, formatted
+
+
+def valider_age(age_str):
+    """Valider l'âge (nombre entre 1 et 120)"""
+    if not age_str or not age_str.strip():
+        return False, "L'âge ne peut pas être vide"
+    
+    try:
+        age = int(age_str.strip())
+        if age < 1:
+            return False, "L'âge doit être supérieur à 0"
+        if age > 120:
+            return False, "L'âge doit être inférieur à 120 ans"
+        return True, age
+    except ValueError:
+        return False, "L'âge doit être un nombre entier"
+
+
+def valider_adresse(adresse):
+    """Valider l'adresse"""
+    if not adresse or not adresse.strip():
+        return False, "L'adresse ne peut pas être vide"
+    
+    adresse = adresse.strip()
+    if len(adresse) < 5:
+        return False, "L'adresse doit contenir au moins 5 caractères"
+    
+    if len(adresse) > 100:
+        return False, "L'adresse ne peut pas dépasser 100 caractères"
+    
+    return True, adresse
+
+
+def valider_formulaire_patient(nom, username, password, telephone=None, age=None, adresse=None):
+    """Valider un formulaire patient complet"""
+    erreurs = []
+    
+    valid_nom, msg_nom = valider_nom_complet(nom)
+    if not valid_nom:
+        erreurs.append(f"Nom: {msg_nom}")
+    
+    valid_user, msg_user = valider_nom_utilisateur(username)
+    if not valid_user:
+        erreurs.append(f"Utilisateur: {msg_user}")
+    
+    valid_pass, msg_pass = valider_mot_de_passe(password)
+    if not valid_pass:
+        erreurs.append(f"Mot de passe: {msg_pass}")
+    
+    # Tous les champs sont maintenant obligatoires
+    valid_tel, msg_tel = valider_telephone(telephone)
+    if not valid_tel:
+        erreurs.append(f"Téléphone: {msg_tel}")
+    
+    valid_age, msg_age = valider_age(age)
+    if not valid_age:
+        erreurs.append(f"Âge: {msg_age}")
+    
+    valid_addr, msg_addr = valider_adresse(adresse)
+    if not valid_addr:
+        erreurs.append(f"Adresse: {msg_addr}")
+    
+    if erreurs:
+        return False, "\\n".join(erreurs)
+    
+    return True, "Validation réussie"
+
+
+def valider_specialite(specialite):
+    """Valider la spécialité médicale"""
+    specialites_valides = SPECIALITES
+    
+    if specialite not in specialites_valides:
+        return False, f"Spécialité non valide. Options: {', '.join(specialites_valides)}"
+    
+    return True, specialite
+
+
+def valider_formulaire_medecin(nom, specialite, username, password):
+    """Valider un formulaire médecin complet"""
+    erreurs = []
+    
+    valid_nom, msg_nom = valider_nom_complet(nom)
+    if not valid_nom:
+        erreurs.append(f"Nom: {msg_nom}")
+    
+    valid_spec, msg_spec = valider_specialite(specialite)
+    if not valid_spec:
+        erreurs.append(f"Spécialité: {msg_spec}")
+    
+    valid_user, msg_user = valider_nom_utilisateur(username)
+    if not valid_user:
+        erreurs.append(f"Utilisateur: {msg_user}")
+    
+    valid_pass, msg_pass = valider_mot_de_passe(password)
+    if not valid_pass:
+        erreurs.append(f"Mot de passe: {msg_pass}")
+    
+    if erreurs:
+        return False, "\\n".join(erreurs)
+    
+    return True, "Validation réussie"
+
+
+def valider_debut_recherche(date_texte, heure_str, maintenant=None):
+    """Valider le point de départ JJ/MM/AAAA et HH:MM d'une recherche de créneaux"""
+    try:
+        date_str = date_depuis_affichage(date_texte)
+    except (ValueError, AttributeError):
+        return False, "Date invalide (JJ/MM/AAAA requis)"
+    
+    date_valide, date_obj_ou_message = valider_date(date_str, maintenant)
+    if not date_valide:
+        return False, date_obj_ou_message
+    
+    heure_valide, message_heure = valider_heure(heure_str)
+    if not heure_valide:
+        return False, message_heure
+    
+    return True, datetime.combine(date_obj_ou_message, datetime.strptime(heure_str, "%H:%M").time())